@@ -0,0 +1,83 @@
+from .beta import beta_correlation, correlation_matrix, price_beta_correlation, rolling_beta
+from .covariance import CovarianceCache, CovarianceModel, covariance_cache, ledoit_wolf
+from .returns import normalize_weights, portfolio_returns, price_moments, simple_returns
+from .rolling import rolling_drawdown, rolling_max, rolling_metrics, rolling_volatility
+from .sharding import (
+    DEFAULT_BLOCK_CELLS,
+    DEFAULT_MIN_CELLS,
+    SharedArray,
+    ShardPool,
+    column_blocks,
+    file_source,
+    merge_shards,
+    read_columns,
+    shard_bounds,
+    shard_pool,
+    stream_columns,
+)
+from .stress import (
+    EPISODES,
+    date_rows,
+    forward_filled,
+    historical_shocks,
+    hypothetical_shocks,
+    scenario_pnl,
+    window_shocks,
+    worst_scenarios,
+)
+from .streaming import (
+    MarketMetricsState,
+    PortfolioRiskState,
+    RollingDrawdown,
+    RollingMoments,
+    RunningDrawdown,
+    RunningMoments,
+)
+from .var import scenario_model, scenario_var, var_cvar
+
+__all__ = [
+    "CovarianceCache",
+    "CovarianceModel",
+    "DEFAULT_BLOCK_CELLS",
+    "DEFAULT_MIN_CELLS",
+    "EPISODES",
+    "MarketMetricsState",
+    "PortfolioRiskState",
+    "RollingDrawdown",
+    "RollingMoments",
+    "RunningDrawdown",
+    "RunningMoments",
+    "ShardPool",
+    "SharedArray",
+    "beta_correlation",
+    "column_blocks",
+    "correlation_matrix",
+    "covariance_cache",
+    "date_rows",
+    "file_source",
+    "forward_filled",
+    "historical_shocks",
+    "hypothetical_shocks",
+    "ledoit_wolf",
+    "merge_shards",
+    "normalize_weights",
+    "portfolio_returns",
+    "price_beta_correlation",
+    "price_moments",
+    "read_columns",
+    "rolling_beta",
+    "rolling_drawdown",
+    "rolling_max",
+    "rolling_metrics",
+    "rolling_volatility",
+    "scenario_model",
+    "scenario_pnl",
+    "scenario_var",
+    "shard_bounds",
+    "shard_pool",
+    "simple_returns",
+    "stream_columns",
+    "var_cvar",
+    "window_shocks",
+    "worst_scenarios",
+]
@@ -0,0 +1,126 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .returns import simple_returns
+
+
+def _centered(rets: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Masked values shifted by their column mean; shifting leaves (co)variances unchanged
+    and keeps the running sums small."""
+    count = np.maximum(valid.sum(axis=0), 1)
+    mean = np.where(valid, rets, 0.0).sum(axis=0) / count
+    return np.where(valid, rets - mean, 0.0)
+
+
+def prefix_sums(a: np.ndarray) -> np.ndarray:
+    """Cumulative sums down the rows with a leading row of zeros, so that every
+    trailing-window sum is one subtraction (see window_sums)."""
+    out = np.zeros((len(a) + 1,) + a.shape[1:])
+    np.cumsum(a, axis=0, out=out[1:])
+    return out
+
+
+def window_sums(prefix: np.ndarray, window: int) -> np.ndarray:
+    """Sums over every trailing window of `window` rows from prefix_sums output.
+    Row i of the result covers rows i..i+window-1 of the original input."""
+    return prefix[window:] - prefix[:-window]
+
+
+def beta_correlation(rets: np.ndarray, bench: np.ndarray,
+                     min_obs: int = 3) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Beta and correlation of every column of a (dates x tickers) returns matrix vs a benchmark.
+
+    Series are aligned by date: each ticker uses the dates where both it and the
+    benchmark have a return. Moments are population moments over those dates.
+    Returns (beta, corr, n_obs); beta/corr are NaN below min_obs observations or
+    when a variance is zero.
+    """
+    mask = ~np.isnan(rets) & ~np.isnan(bench)[:, None]
+    n = mask.sum(axis=0)
+    safe_n = np.maximum(n, 1)
+    x = np.where(mask, rets, 0.0)
+    y = np.where(mask, bench[:, None], 0.0)
+    mu_x = x.sum(axis=0) / safe_n
+    mu_y = y.sum(axis=0) / safe_n
+    dx = np.where(mask, x - mu_x, 0.0)
+    dy = np.where(mask, y - mu_y, 0.0)
+    cov = (dx * dy).sum(axis=0) / safe_n
+    var_x = (dx * dx).sum(axis=0) / safe_n
+    var_y = (dy * dy).sum(axis=0) / safe_n
+    enough = n >= min_obs
+    with np.errstate(invalid="ignore", divide="ignore"):
+        beta = np.where(enough & (var_y > 0), cov / var_y, np.nan)
+        corr = np.where(enough & (var_x > 0) & (var_y > 0), cov / np.sqrt(var_x * var_y), np.nan)
+    return beta, corr, n
+
+
+def correlation_matrix(rets: np.ndarray, min_obs: int = 3) -> np.ndarray:
+    """Full N x N correlation matrix using pairwise-complete dates, via masked matrix products."""
+    valid = ~np.isnan(rets)
+    v = valid.astype(np.float64)
+    z = _centered(rets, valid)
+    n = v.T @ v
+    sx = z.T @ v
+    sy = sx.T
+    sxy = z.T @ z
+    sxx = (z * z).T @ v
+    syy = sxx.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(n < min_obs) | ~(var_x > 0) | ~(var_y > 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def beta_prefixes(rets: np.ndarray, bench: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Prefix sums of paired counts, x, y, xy and yy behind rolling_beta; computed once
+    and shared by every window length."""
+    mask = ~np.isnan(rets) & ~np.isnan(bench)[:, None]
+    x = _centered(np.where(mask, rets, np.nan), mask)
+    y = _centered(np.where(mask, bench[:, None], np.nan), mask)
+    return tuple(prefix_sums(a) for a in (mask.astype(np.float64), x, y, x * y, y * y))
+
+
+def window_beta(prefixes: Tuple[np.ndarray, ...], window: int, min_obs: Optional[int] = None) -> np.ndarray:
+    """rolling_beta for one window length from beta_prefixes output."""
+    if window < 2:
+        raise ValueError("window must be >= 2.")
+    min_obs = max(2, window // 2) if min_obs is None else min_obs
+    n, sx, sy, sxy, syy = (window_sums(c, window) for c in prefixes)
+    out = np.full((len(prefixes[0]) - 1,) + prefixes[0].shape[1:], np.nan)
+    if len(n) == 0:
+        return out
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_y = syy - sy * sy / n
+        beta = np.where((n >= min_obs) & (var_y > 1e-12 * syy), cov / var_y, np.nan)
+    out[window - 1:] = beta
+    return out
+
+
+def rolling_beta(rets: np.ndarray, bench: np.ndarray, window: int,
+                 min_obs: Optional[int] = None) -> np.ndarray:
+    """Rolling beta of every column vs the benchmark over trailing `window` dates.
+
+    Computed for all windows at once from cumulative sums, so the cost does not
+    depend on the window length. Row i covers dates i-window+1..i; rows before
+    the first full window, and windows with fewer than min_obs paired
+    observations (default: window // 2), are NaN.
+    """
+    if window < 2:
+        raise ValueError("window must be >= 2.")
+    return window_beta(beta_prefixes(rets, bench), window, min_obs)
+
+
+def price_beta_correlation(prices: np.ndarray, bench_rets: np.ndarray, rolling_window: int = 0,
+                           min_obs: int = 3) -> Tuple[np.ndarray, ...]:
+    """beta_correlation of every column of a (dates x tickers) price matrix vs benchmark returns,
+    plus rolling_beta when rolling_window > 0. A per-ticker kernel, so it can run on shards."""
+    rets = simple_returns(prices)
+    beta, corr, n = beta_correlation(rets, bench_rets, min_obs)
+    if rolling_window > 0:
+        return beta, corr, n, rolling_beta(rets, bench_rets, rolling_window)
+    return beta, corr, n
@@ -0,0 +1,162 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+METHODS = ("sample", "ledoit_wolf", "ewma")
+EWMA_LAMBDA = 0.94
+TRADING_DAYS = 252.0
+
+
+def ledoit_wolf(x: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Ledoit-Wolf (2004) shrinkage of the covariance of centered (dates x tickers) data
+    towards a scaled identity; returns (covariance, shrinkage intensity)."""
+    n, p = x.shape
+    emp = x.T @ x / n
+    mu = np.trace(emp) / p
+    target = mu * np.eye(p)
+    delta = ((emp - target) ** 2).sum() / p
+    if delta == 0:
+        return emp, 0.0
+    x2 = x * x
+    beta = min(((x2.T @ x2) / n - emp ** 2).sum() / (p * n), delta)
+    shrinkage = beta / delta
+    return (1.0 - shrinkage) * emp + shrinkage * target, float(shrinkage)
+
+
+def ewma_weights(n: int, lam: float) -> np.ndarray:
+    """RiskMetrics-style weights lam**age for n dates (oldest first), normalized to sum to 1."""
+    if not 0.0 < lam < 1.0:
+        raise ValueError("EWMA lambda must be between 0 and 1.")
+    w = lam ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    return w / w.sum()
+
+
+class CovarianceModel:
+    """Asset covariance matrix built once from a (dates x tickers) returns matrix.
+
+    A missing return counts as 0.0 for that ticker alone, whereas
+    build_portfolio_returns zeroes the whole portfolio return on a day where any
+    leg is missing; so the sample-estimator volatility equals the one from
+    compute_portfolio_risk_metrics only on panels without gaps. The Cholesky
+    factor is computed on first use and kept. Every query accepts
+    one weight vector (N,) or a matrix of candidate vectors (P, N) and costs
+    O(N^2) per vector; no return series is rebuilt.
+    """
+
+    def __init__(self, cov: np.ndarray, mean: np.ndarray, tickers: Optional[Sequence[str]] = None,
+                 method: str = "sample", n_obs: int = 0, shrinkage: Optional[float] = None):
+        self.cov = np.atleast_2d(np.asarray(cov, dtype=np.float64))
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.tickers = list(tickers) if tickers is not None else None
+        self.method = method
+        self.n_obs = n_obs
+        self.shrinkage = shrinkage
+        self._chol: Optional[np.ndarray] = None
+
+    @classmethod
+    def fit(cls, rets: np.ndarray, method: str = "sample", tickers: Optional[Sequence[str]] = None,
+            ewma_lambda: float = EWMA_LAMBDA) -> "CovarianceModel":
+        """sample: unbiased sample covariance; ledoit_wolf: shrunk towards a scaled identity;
+        ewma: exponentially weighted with decay ewma_lambda (0.94 as in RiskMetrics)."""
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}'; expected one of {', '.join(METHODS)}.")
+        filled = np.nan_to_num(np.atleast_2d(np.asarray(rets, dtype=np.float64)))
+        n = len(filled)
+        if n < 2:
+            raise ValueError("At least two return dates are needed.")
+        shrinkage = None
+        if method == "ewma":
+            w = ewma_weights(n, ewma_lambda)
+            mean = w @ filled
+            x = filled - mean
+            cov = (x * w[:, None]).T @ x
+        else:
+            mean = filled.mean(axis=0)
+            x = filled - mean
+            if method == "ledoit_wolf":
+                cov, shrinkage = ledoit_wolf(x)
+            else:
+                cov = x.T @ x / (n - 1)
+        return cls(cov, mean, tickers, method, n, shrinkage)
+
+    @property
+    def n_assets(self) -> int:
+        return self.cov.shape[0]
+
+    @property
+    def cholesky(self) -> np.ndarray:
+        """Lower factor L with L @ L.T == cov. A matrix that is only positive
+        semi-definite is factored through its eigen-decomposition instead."""
+        if self._chol is None:
+            try:
+                self._chol = np.linalg.cholesky(self.cov)
+            except np.linalg.LinAlgError:
+                vals, vecs = np.linalg.eigh(self.cov)
+                self._chol = vecs * np.sqrt(np.clip(vals, 0.0, None))
+        return self._chol
+
+    def variance(self, weights: np.ndarray) -> np.ndarray:
+        w = np.asarray(weights, dtype=np.float64)
+        return ((w @ self.cov) * w).sum(axis=-1)
+
+    def volatility(self, weights: np.ndarray, annualize: bool = False) -> np.ndarray:
+        vol = np.sqrt(np.maximum(self.variance(weights), 0.0))
+        return vol * np.sqrt(TRADING_DAYS) if annualize else vol
+
+    def marginal_contributions(self, weights: np.ndarray) -> np.ndarray:
+        """d(vol)/d(w_i) = (cov @ w)_i / vol; zero where the portfolio volatility is zero."""
+        w = np.asarray(weights, dtype=np.float64)
+        vol = self.volatility(w)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(np.expand_dims(vol, -1) > 0, (w @ self.cov) / np.expand_dims(vol, -1), 0.0)
+
+    def component_contributions(self, weights: np.ndarray) -> np.ndarray:
+        """w_i * marginal_i; the components of each portfolio sum to its volatility."""
+        w = np.asarray(weights, dtype=np.float64)
+        return w * self.marginal_contributions(w)
+
+    def percent_contributions(self, weights: np.ndarray) -> np.ndarray:
+        """Component contributions as fractions of volatility (each portfolio sums to 1)."""
+        w = np.asarray(weights, dtype=np.float64)
+        vol = np.expand_dims(self.volatility(w), -1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(vol > 0, self.component_contributions(w) / vol, 0.0)
+
+    def expected_return(self, weights: np.ndarray) -> np.ndarray:
+        return np.asarray(weights, dtype=np.float64) @ self.mean
+
+
+class CovarianceCache:
+    """Thread-safe LRU of fitted models keyed by whatever identifies their input
+    (for price panels: the panel's content key, tickers, method and parameters)."""
+
+    def __init__(self, max_models: int = 32):
+        self.max_models = max_models
+        self._models: "OrderedDict[Hashable, CovarianceModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_fit(self, key: Hashable, fit: Callable[[], CovarianceModel]) -> CovarianceModel:
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+        model = fit()
+        with self._lock:
+            self._models[key] = model
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return model
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+
+covariance_cache = CovarianceCache()
@@ -0,0 +1,87 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+WEIGHT_SUM_TOLERANCE = (0.98, 1.02)
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """Day-over-day simple returns of a (dates x tickers) price matrix.
+
+    The result has one row fewer than the input. A return is NaN when either
+    price is missing or the previous price is zero.
+    """
+    p0 = prices[:-1]
+    p1 = prices[1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets = (p1 - p0) / p0
+    rets[p0 == 0] = np.nan
+    return rets
+
+
+def price_moments(prices: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Per-column price and return statistics of a (dates x tickers) price matrix with at least one date.
+
+    Returns are taken between consecutive available prices, skipping missing
+    dates, and only when the previous price is positive. Returns (last_price,
+    n_prices, n_rets, mean_ret, std_ret) with the sample (ddof=1) std; last_price
+    is NaN for an empty column, mean_ret NaN without returns and std_ret 0.0
+    with a single return.
+    """
+    valid = ~np.isnan(prices)
+    # Row of the latest available price at or before each date (-1 before the first one).
+    idx = np.where(valid, np.arange(len(prices), dtype=np.int32)[:, None], np.int32(-1))
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    last = np.where(idx[-1] >= 0, prices[np.maximum(idx[-1], 0), np.arange(prices.shape[1])], np.nan)
+    ok = valid[1:] & (idx[:-1] >= 0)
+    np.maximum(idx, 0, out=idx)
+    prev = np.take_along_axis(prices, idx[:-1], axis=0)
+    del idx
+    with np.errstate(invalid="ignore"):
+        ok &= prev > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets = np.subtract(prices[1:], prev)
+        rets /= prev
+    del prev
+    np.copyto(rets, 0.0, where=~ok)
+    n_rets = ok.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(n_rets > 0, rets.sum(axis=0) / n_rets, np.nan)
+        rets -= mean
+        np.copyto(rets, 0.0, where=~ok)
+        rets *= rets
+        std = np.where(n_rets > 1, np.sqrt(rets.sum(axis=0) / (n_rets - 1)), 0.0)
+    return last, valid.sum(axis=0), n_rets, mean, std
+
+
+def normalize_weights(weights: np.ndarray, tolerance: Tuple[float, float] = WEIGHT_SUM_TOLERANCE) -> np.ndarray:
+    """Rescale weights to sum to 1.0 unless their sum is already within tolerance.
+
+    Works on a single weight vector (N,) or a weight matrix (P, N) row by row.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    wsum = weights.sum(axis=-1, keepdims=True)
+    lo, hi = tolerance
+    scale = np.where((wsum >= lo) & (wsum <= hi), 1.0, wsum)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return weights / scale
+
+
+def portfolio_returns(rets: np.ndarray, weights: np.ndarray,
+                      legs: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Weighted portfolio returns and cumulative curve from a (dates x tickers) returns matrix.
+
+    weights is either one vector (N,) or a matrix (P, N) of P portfolios, in which
+    case the outputs are (dates x P). A day where any leg has a missing return
+    counts as a 0.0 return for that portfolio. legs marks which tickers count as
+    legs (same shape as weights); by default every ticker does.
+    """
+    missing = np.isnan(rets)
+    filled = np.where(missing, 0.0, rets)
+    if legs is None:
+        legs = np.ones(weights.shape, dtype=bool)
+    port = filled @ weights.T
+    broken = missing @ legs.T
+    port[broken] = 0.0
+    curve = np.cumprod(1.0 + port, axis=0)
+    return port, curve
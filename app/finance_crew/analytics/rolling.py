@@ -0,0 +1,107 @@
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .beta import _centered, beta_prefixes, prefix_sums, window_beta, window_sums
+
+TRADING_DAYS = 252.0
+DEFAULT_WINDOWS = (21, 63, 252)
+
+
+def volatility_prefixes(rets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Prefix sums of observation counts, centered returns and their squares behind
+    rolling_volatility; computed once and shared by every window length."""
+    valid = ~np.isnan(rets)
+    x = _centered(rets, valid)
+    return prefix_sums(valid.astype(np.float64)), prefix_sums(x), prefix_sums(x * x)
+
+
+def window_volatility(prefixes: Tuple[np.ndarray, np.ndarray, np.ndarray], window: int,
+                      min_obs: Optional[int] = None, annualize: bool = True) -> np.ndarray:
+    """rolling_volatility for one window length from volatility_prefixes output."""
+    if window < 2:
+        raise ValueError("window must be >= 2.")
+    min_obs = max(2, window // 2) if min_obs is None else max(2, min_obs)
+    out = np.full((len(prefixes[0]) - 1,) + prefixes[0].shape[1:], np.nan)
+    if len(out) < window:
+        return out
+    n, s, ss = (window_sums(c, window) for c in prefixes)
+    # In place: (ss - s*s/n) / (n-1) would allocate a temporary per operation.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vol = s * s
+        vol /= n
+        np.subtract(ss, vol, out=vol)
+        vol /= n - 1
+        np.sqrt(np.maximum(vol, 0.0, out=vol), out=vol)
+    if annualize:
+        vol *= np.sqrt(TRADING_DAYS)
+    vol[n < min_obs] = np.nan
+    out[window - 1:] = vol
+    return out
+
+
+def rolling_volatility(rets: np.ndarray, window: int, min_obs: Optional[int] = None,
+                       annualize: bool = True) -> np.ndarray:
+    """Rolling standard deviation (ddof=1) of every column over trailing `window` rows.
+
+    All windows come from three cumulative sums, so the cost does not depend
+    on the window length. Missing returns are skipped; windows with fewer than
+    min_obs observations (default: window // 2) and rows before the first full
+    window are NaN.
+    """
+    return window_volatility(volatility_prefixes(rets), window, min_obs, annualize)
+
+
+def rolling_max(a: np.ndarray, window: int) -> np.ndarray:
+    """Trailing-window maximum of every column (NaN ignored), in O(rows) whatever the window.
+
+    Van Herk / Gil-Werman: rows are cut into blocks of `window` (a reshaped
+    view), a prefix maximum runs forward and a suffix maximum backward inside
+    each block, and every window is covered by one suffix and one prefix.
+    Rows before the first full window hold the running maximum so far.
+    """
+    if window < 1:
+        raise ValueError("window must be >= 1.")
+    n = len(a)
+    if n == 0:
+        return a.astype(np.float64, copy=True)
+    pad = (-n) % window
+    padded = np.concatenate([a.astype(np.float64), np.full((pad,) + a.shape[1:], np.nan)])
+    blocks = padded.reshape((-1, window) + a.shape[1:])
+    prefix = np.fmax.accumulate(blocks, axis=1).reshape(padded.shape)
+    suffix = np.fmax.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+    out = np.empty(a.shape, dtype=np.float64)
+    head = min(window - 1, n)
+    out[:head] = np.fmax.accumulate(padded[:head], axis=0)
+    if n >= window:
+        out[window - 1:] = np.fmax(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+def rolling_drawdown(levels: np.ndarray, window: int) -> np.ndarray:
+    """Drawdown of every column from its peak over the trailing `window` rows,
+    as RollingDrawdown computes bar by bar; NaN where the level is missing."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.minimum(levels / rolling_max(levels, window) - 1.0, 0.0)
+
+
+def rolling_metrics(rets: np.ndarray, windows: Sequence[int] = DEFAULT_WINDOWS,
+                    bench: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Rolling annualized volatility, drawdown and (with a benchmark) beta of every
+    column of a (dates x series) returns matrix, for every window.
+
+    Returns {"vol_<w>", "drawdown_<w>", "beta_<w>": dates x series matrix}.
+    Drawdowns are measured on the compounded return curve (missing returns
+    count as 0.0), so tickers and portfolios share one scale. The cumulative
+    sums are built once; each extra window costs a few subtractions.
+    """
+    levels = np.cumprod(1.0 + np.nan_to_num(rets), axis=0)
+    vol_prefixes = volatility_prefixes(rets)
+    bench_prefixes = beta_prefixes(rets, bench) if bench is not None else None
+    out: Dict[str, np.ndarray] = {}
+    for w in windows:
+        out[f"vol_{w}"] = window_volatility(vol_prefixes, w)
+        out[f"drawdown_{w}"] = rolling_drawdown(levels, w)
+        if bench_prefixes is not None:
+            out[f"beta_{w}"] = window_beta(bench_prefixes, w)
+    return out
@@ -0,0 +1,293 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+# Below this many cells a panel is computed in-process: shipping it to workers costs more than it saves.
+DEFAULT_MIN_CELLS = 2_000_000
+# Kernels see at most this many cells at a time, which bounds their temporaries (and, for a panel
+# file, the resident part of the panel) whatever the size of the universe.
+DEFAULT_BLOCK_CELLS = 1_000_000
+
+
+class SharedArray:
+    """A float64 (dates x tickers) matrix copied once into a shared memory block.
+
+    The block is column-major, so every ticker shard is one contiguous range
+    that workers map without copying. The creating process owns the block and
+    unlinks it on close().
+    """
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2:
+            raise ValueError("SharedArray needs a 2-D (dates x tickers) matrix.")
+        self.shape = values.shape
+        self._shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self._shm.buf, order="F")
+        self.array[...] = values
+
+    @property
+    def spec(self) -> tuple:
+        """What a worker needs to attach: ("shm", block name, shape)."""
+        return "shm", self._shm.name, self.shape
+
+    def close(self) -> None:
+        if self._shm is not None:
+            del self.array
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Shard results at least this large come back through shared memory rather than the result pipe.
+_SHARED_RESULT_BYTES = 1 << 20
+
+
+class _SharedResult:
+    """A worker's result array left in a shared memory block for the parent to copy out and unlink."""
+
+    def __init__(self, array: np.ndarray):
+        self.shape, self.dtype = array.shape, array.dtype
+        shm = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)[...] = array
+        self.name = shm.name
+        shm.close()
+
+    def copy_to(self, out: np.ndarray) -> None:
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            out[...] = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+        finally:
+            shm.close()
+            shm.unlink()
+            self.name = None
+
+    def discard(self) -> None:
+        """Unlink the block without copying it out (a no-op once copied)."""
+        if self.name is None:
+            return
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            pass
+        else:
+            shm.close()
+            shm.unlink()
+        self.name = None
+
+
+def _discard(result: Any) -> None:
+    if isinstance(result, tuple):
+        for r in result:
+            _discard(r)
+    elif isinstance(result, dict):
+        for r in result.values():
+            _discard(r)
+    elif isinstance(result, _SharedResult):
+        result.discard()
+
+
+def _export(result: Any) -> Any:
+    if isinstance(result, tuple):
+        return tuple(_export(r) for r in result)
+    if isinstance(result, dict):
+        return {k: _export(v) for k, v in result.items()}
+    return _SharedResult(result) if result.nbytes >= _SHARED_RESULT_BYTES else result
+
+
+def file_source(values: np.ndarray) -> Optional[Tuple[str, int, Tuple[int, int]]]:
+    """(path, byte offset, shape) when `values` is a whole column-major float64 np.memmap
+    (e.g. a panel file), so its columns can be read from disk; None otherwise."""
+    base = values
+    # .base ends at whatever owns the buffer: None, or e.g. the bytes behind np.frombuffer.
+    while isinstance(base, np.ndarray) and not isinstance(base, np.memmap):
+        base = base.base
+    if not isinstance(base, np.memmap) or base.filename is None or values.ndim != 2 or values.dtype != np.float64:
+        return None
+    whole = values.shape == base.shape and values.ctypes.data == base.ctypes.data
+    if not whole or not values.flags.f_contiguous:
+        return None
+    return base.filename, base.offset, values.shape
+
+
+def read_columns(source: Tuple[str, int, Tuple[int, int]], start: int, stop: int) -> np.ndarray:
+    """Columns [start, stop) of a file_source, read into memory (one contiguous range of the file)."""
+    path, offset, (rows, _) = source
+    count = rows * (stop - start)
+    block = np.fromfile(path, dtype=np.float64, count=count, offset=offset + rows * start * 8)
+    return block.reshape((rows, stop - start), order="F")
+
+
+def column_blocks(start: int, stop: int, rows: int, block_cells: int = DEFAULT_BLOCK_CELLS) -> List[Tuple[int, int]]:
+    """Consecutive [start, stop) column ranges of at most block_cells cells (and at least one column)."""
+    width = max(1, block_cells // max(rows, 1))
+    return [(a, min(a + width, stop)) for a in range(start, stop, width)]
+
+
+def stream_columns(fn: Callable[..., Any], values: Optional[np.ndarray], args: tuple, start: int, stop: int,
+                   block_cells: int = DEFAULT_BLOCK_CELLS,
+                   source: Optional[Tuple[str, int, Tuple[int, int]]] = None) -> Any:
+    """fn over columns [start, stop) of `values` one column block at a time, merged in order.
+
+    With a file source the blocks are read from disk (values may then be None),
+    so only one block of the panel is resident at a time.
+    """
+    rows = source[2][0] if source else values.shape[0]
+    parts = []
+    for a, b in column_blocks(start, stop, rows, block_cells) or [(start, stop)]:
+        parts.append(fn(read_columns(source, a, b) if source else values[:, a:b], *args))
+    return parts[0] if len(parts) == 1 else merge_shards(parts)
+
+
+def _run_shard(spec: tuple, start: int, stop: int, fn: Callable, args: tuple, block_cells: int) -> Any:
+    if spec[0] == "file":
+        return _export(stream_columns(fn, None, args, start, stop, block_cells, spec[1:]))
+    _, name, shape = spec
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf, order="F")
+        result = stream_columns(fn, block, args, start, stop, block_cells)
+        del block
+        return _export(result)
+    finally:
+        shm.close()
+
+
+def shard_bounds(n: int, shards: int) -> List[Tuple[int, int]]:
+    """Contiguous [start, stop) column ranges splitting n columns into `shards` near-equal parts."""
+    shards = max(1, min(shards, n))
+    edges = [n * i // shards for i in range(shards + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def merge_shards(parts: List[Any]) -> Any:
+    """Concatenate per-shard results along their last (ticker) axis, in shard order.
+
+    A result is an array, or a tuple / dict of arrays; every array's last axis
+    runs over the shard's tickers. Large arrays arrive as shared memory blocks
+    and are copied straight into the merged output.
+    """
+    first = parts[0]
+    if isinstance(first, tuple):
+        return tuple(merge_shards([p[i] for p in parts]) for i in range(len(first)))
+    if isinstance(first, dict):
+        return {k: merge_shards([p[k] for p in parts]) for k in first}
+    out = np.empty(first.shape[:-1] + (sum(p.shape[-1] for p in parts),), dtype=np.result_type(*(p.dtype for p in parts)))
+    at = 0
+    for part in parts:
+        k = part.shape[-1]
+        if isinstance(part, _SharedResult):
+            part.copy_to(out[..., at:at + k])
+        else:
+            out[..., at:at + k] = part
+        at += k
+    return out
+
+
+def _collect(futures: list) -> Any:
+    """Merge shard results in order. However that ends (a failed shard, a broken pool, an error
+    while copying), no worker's shared memory result block outlives the call."""
+    try:
+        return merge_shards([f.result() for f in futures])
+    finally:
+        for f in futures:
+            f.cancel()
+        wait(futures)
+        for f in futures:
+            if not f.cancelled() and f.exception() is None:
+                _discard(f.result())
+
+
+class ShardPool:
+    """Runs a per-ticker kernel over column shards of a matrix on a process pool.
+
+    `map(fn, values, *args)` is `fn(values, *args)` for kernels whose output
+    for a ticker depends only on that ticker's column (and on `args`, which
+    are sent to every worker) and that return new arrays, not views of their
+    input. The matrix is placed in one shared memory block (a panel file is
+    read by the workers directly); each task gets a column range, never a
+    pickled copy, and feeds it to the kernel in column blocks of at most
+    block_cells cells. Results come back in shard order
+    whatever order the workers finish in, so a given (matrix, workers) always
+    merges to the same bits.
+
+    Sharding is opt-in: the default pool has one worker, and small matrices or
+    a pool of one worker run in-process. The pool starts
+    on first use and is kept for the life of the process; workers are started
+    with forkserver, so scripts using it need the usual __main__ guard.
+    """
+
+    def __init__(self, workers: int = 1, min_cells: int = DEFAULT_MIN_CELLS,
+                 block_cells: int = DEFAULT_BLOCK_CELLS):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.min_cells = min_cells
+        self.block_cells = block_cells
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ShardPool":
+        """Workers from FINANCE_CREW_SHARD_WORKERS (default 1, i.e. no sharding; 0 uses all cores),
+        threshold from FINANCE_CREW_SHARD_MIN_CELLS and block size from FINANCE_CREW_SHARD_BLOCK_CELLS."""
+        workers = os.getenv("FINANCE_CREW_SHARD_WORKERS", "1")
+        min_cells = int(os.getenv("FINANCE_CREW_SHARD_MIN_CELLS", str(DEFAULT_MIN_CELLS)))
+        block_cells = int(os.getenv("FINANCE_CREW_SHARD_BLOCK_CELLS", str(DEFAULT_BLOCK_CELLS)))
+        return cls(workers=int(workers), min_cells=min_cells, block_cells=block_cells)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # forkserver: callers may hold threads (crew, worker service), which fork does not survive.
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method))
+            return self._executor
+
+    def parallel(self, values: np.ndarray) -> bool:
+        """Whether map() would shard this matrix rather than run in-process."""
+        return self.workers > 1 and values.ndim == 2 and values.shape[1] > 1 and values.size >= self.min_cells
+
+    def map(self, fn: Callable[..., Any], values: np.ndarray, *args: Any) -> Any:
+        source = file_source(values)
+        n = values.shape[1]
+        if not self.parallel(values):
+            return stream_columns(fn, values, args, 0, n, self.block_cells, source)
+        bounds = shard_bounds(n, self.workers)
+        pool = self._pool()
+        try:
+            if source is not None:
+                futures = [pool.submit(_run_shard, ("file",) + source, start, stop, fn, args, self.block_cells)
+                           for start, stop in bounds]
+                return _collect(futures)
+            with SharedArray(values) as shared:
+                futures = [pool.submit(_run_shard, shared.spec, start, stop, fn, args, self.block_cells)
+                           for start, stop in bounds]
+                return _collect(futures)
+        except BrokenProcessPool:
+            # Workers died or could not start (e.g. a __main__ script without the
+            # `if __name__ == "__main__"` guard): stop sharding and compute in-process.
+            self.shutdown()
+            self.workers = 1
+            return stream_columns(fn, values, args, 0, n, self.block_cells, source)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+shard_pool = ShardPool.from_env()
+atexit.register(shard_pool.shutdown)
@@ -0,0 +1,367 @@
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+TRADING_DAYS = 252.0
+
+
+def _arr(values) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _list(values: np.ndarray) -> List[Optional[float]]:
+    return [None if v != v else v for v in values.tolist()]
+
+
+class RunningMoments:
+    """Welford running count/mean/M2 for k series at once; NaN observations are skipped."""
+
+    def __init__(self, k: int):
+        self.count = np.zeros(k, dtype=np.int64)
+        self.mean = np.zeros(k, dtype=np.float64)
+        self.m2 = np.zeros(k, dtype=np.float64)
+
+    def update(self, x: np.ndarray) -> None:
+        """Add one observation per series (O(1) per series)."""
+        ok = ~np.isnan(x)
+        self.count = self.count + ok
+        n = np.maximum(self.count, 1)
+        delta = np.where(ok, x - self.mean, 0.0)
+        self.mean = self.mean + delta / n
+        self.m2 = self.m2 + np.where(ok, delta * (x - self.mean), 0.0)
+
+    def update_block(self, block: np.ndarray) -> None:
+        """Add a (bars x k) block of observations, merged with Chan's parallel formula."""
+        ok = ~np.isnan(block)
+        nb = ok.sum(axis=0)
+        filled = np.where(ok, block, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(nb > 0, filled.sum(axis=0) / np.maximum(nb, 1), 0.0)
+        m2_b = np.where(ok, (block - mean_b) ** 2, 0.0).sum(axis=0)
+        na = self.count
+        n = na + nb
+        safe_n = np.maximum(n, 1)
+        delta = mean_b - self.mean
+        self.mean = np.where(nb > 0, self.mean + delta * nb / safe_n, self.mean)
+        self.m2 = np.where(nb > 0, self.m2 + m2_b + delta ** 2 * na * nb / safe_n, self.m2)
+        self.count = n
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        return np.sqrt(np.maximum(self.variance(ddof), 0.0))
+
+    def to_dict(self) -> dict:
+        return {"count": self.count.tolist(), "mean": self.mean.tolist(), "m2": self.m2.tolist()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RunningMoments":
+        state = cls(len(d["count"]))
+        state.count = np.array(d["count"], dtype=np.int64)
+        state.mean = np.array(d["mean"], dtype=np.float64)
+        state.m2 = np.array(d["m2"], dtype=np.float64)
+        return state
+
+
+class RollingMoments:
+    """Mean/variance over the last `window` bars of k series, O(1) per bar.
+
+    Keeps a ring buffer of the window; each new bar adds its observation with
+    Welford's update and removes the evicted one with the inverse update.
+    """
+
+    def __init__(self, k: int, window: int):
+        if window < 2:
+            raise ValueError("window must be >= 2.")
+        self.window = window
+        self.ring = np.full((window, k), np.nan)
+        self.pos = 0
+        self.count = np.zeros(k, dtype=np.int64)
+        self.mean = np.zeros(k, dtype=np.float64)
+        self.m2 = np.zeros(k, dtype=np.float64)
+
+    def update(self, x: np.ndarray) -> None:
+        old = self.ring[self.pos]
+        drop = ~np.isnan(old)
+        n = self.count - drop
+        safe_n = np.maximum(n, 1)
+        delta = np.where(drop, old - self.mean, 0.0)
+        mean = np.where(n > 0, self.mean - delta / safe_n, 0.0)
+        m2 = np.where(n > 0, self.m2 - np.where(drop, delta * (old - mean), 0.0), 0.0)
+
+        add = ~np.isnan(x)
+        n = n + add
+        delta = np.where(add, x - mean, 0.0)
+        mean = mean + delta / np.maximum(n, 1)
+        m2 = m2 + np.where(add, delta * (x - mean), 0.0)
+
+        self.count, self.mean, self.m2 = n, mean, np.maximum(m2, 0.0)
+        self.ring[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        return np.sqrt(self.variance(ddof))
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "ring": [_list(row) for row in self.ring], "pos": self.pos,
+                "count": self.count.tolist(), "mean": self.mean.tolist(), "m2": self.m2.tolist()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RollingMoments":
+        state = cls(len(d["count"]), d["window"])
+        state.ring = np.array([_arr(row) for row in d["ring"]], dtype=np.float64)
+        state.pos = d["pos"]
+        state.count = np.array(d["count"], dtype=np.int64)
+        state.mean = np.array(d["mean"], dtype=np.float64)
+        state.m2 = np.array(d["m2"], dtype=np.float64)
+        return state
+
+
+class RunningDrawdown:
+    """Running peak and maximum drawdown of k equity curves."""
+
+    def __init__(self, k: int):
+        self.level = np.ones(k, dtype=np.float64)
+        self.peak = np.full(k, -1e18)
+        self.max_drawdown = np.zeros(k, dtype=np.float64)
+
+    def update_level(self, level: np.ndarray) -> None:
+        self.level = level
+        self.peak = np.maximum(self.peak, level)
+        self.max_drawdown = np.minimum(self.max_drawdown, level / self.peak - 1.0)
+
+    def update_return(self, r: np.ndarray) -> None:
+        self.update_level(self.level * (1.0 + r))
+
+    def update_levels(self, levels: np.ndarray) -> None:
+        """Consume a (bars x k) block of curve levels."""
+        if not len(levels):
+            return
+        peaks = np.maximum.accumulate(np.vstack([self.peak, levels]), axis=0)[1:]
+        self.max_drawdown = np.minimum(self.max_drawdown, (levels / peaks - 1.0).min(axis=0))
+        self.peak = peaks[-1]
+        self.level = levels[-1]
+
+    def to_dict(self) -> dict:
+        return {"level": self.level.tolist(), "peak": self.peak.tolist(),
+                "max_drawdown": self.max_drawdown.tolist()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RunningDrawdown":
+        state = cls(len(d["level"]))
+        state.level = np.array(d["level"], dtype=np.float64)
+        state.peak = np.array(d["peak"], dtype=np.float64)
+        state.max_drawdown = np.array(d["max_drawdown"], dtype=np.float64)
+        return state
+
+
+class RollingDrawdown:
+    """Drawdown of k equity curves from their peak over the last `window` bars,
+    bar by bar as rolling_drawdown computes it in batch.
+
+    Uses one monotonic deque per series, so each bar costs amortized O(1).
+    Missing (NaN) levels are skipped and report a NaN drawdown.
+    """
+
+    def __init__(self, k: int, window: int):
+        self.window = window
+        self.seq = 0
+        self.queues: List[deque] = [deque() for _ in range(k)]
+        self.drawdown = np.zeros(k, dtype=np.float64)
+
+    def update_level(self, level: np.ndarray) -> None:
+        for j, v in enumerate(level.tolist()):
+            q = self.queues[j]
+            if v != v:
+                self.drawdown[j] = np.nan
+                continue
+            while q and q[-1][1] <= v:
+                q.pop()
+            q.append((self.seq, v))
+            while q[0][0] <= self.seq - self.window:
+                q.popleft()
+            self.drawdown[j] = v / q[0][1] - 1.0
+        self.seq += 1
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "seq": self.seq, "queues": [list(q) for q in self.queues],
+                "drawdown": _list(self.drawdown)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RollingDrawdown":
+        state = cls(len(d["queues"]), d["window"])
+        state.seq = d["seq"]
+        state.queues = [deque(tuple(item) for item in q) for q in d["queues"]]
+        state.drawdown = _arr(d["drawdown"])
+        return state
+
+
+class MarketMetricsState:
+    """Checkpointable per-ticker state behind compute_market_metrics.
+
+    Returns are taken between consecutive available prices and only when the
+    previous price is positive, exactly like the batch computation.
+    """
+
+    def __init__(self, tickers: Sequence[str]):
+        self.tickers = list(tickers)
+        self.last_date: Optional[str] = None
+        self.last_price = np.full(len(self.tickers), np.nan)
+        self.n_prices = np.zeros(len(self.tickers), dtype=np.int64)
+        self.moments = RunningMoments(len(self.tickers))
+
+    def align(self, tickers: Sequence[str]) -> "MarketMetricsState":
+        """Reorder to the given tickers; tickers not seen before start empty."""
+        if list(tickers) == self.tickers:
+            return self
+        out = MarketMetricsState(tickers)
+        pos = {t: j for j, t in enumerate(self.tickers)}
+        for i, t in enumerate(out.tickers):
+            j = pos.get(t)
+            if j is not None:
+                out.last_price[i] = self.last_price[j]
+                out.n_prices[i] = self.n_prices[j]
+                out.moments.count[i] = self.moments.count[j]
+                out.moments.mean[i] = self.moments.mean[j]
+                out.moments.m2[i] = self.moments.m2[j]
+        out.last_date = self.last_date
+        return out
+
+    def update(self, prices: np.ndarray, dates: Sequence[str]) -> None:
+        """Consume a (bars x tickers) block of prices for the given (new) dates."""
+        if not len(prices):
+            return
+        block = np.vstack([self.last_price, prices])
+        valid = ~np.isnan(block)
+        idx = np.where(valid, np.arange(len(block))[:, None], 0)
+        np.maximum.accumulate(idx, axis=0, out=idx)
+        prev = np.take_along_axis(block, idx, axis=0)[:-1]
+        prev_valid = np.take_along_axis(valid, idx, axis=0)[:-1]
+        cur = block[1:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rets = np.where(valid[1:] & prev_valid & (prev > 0), (cur - prev) / prev, np.nan)
+        self.moments.update_block(rets)
+        self.n_prices += valid[1:].sum(axis=0)
+        self.last_price = np.take_along_axis(block, idx[-1:], axis=0)[0]
+        self.last_date = dates[-1]
+
+    def metrics(self) -> Dict[str, dict]:
+        result = {}
+        std = self.moments.std(ddof=1)
+        for j, t in enumerate(self.tickers):
+            last = None if np.isnan(self.last_price[j]) else float(self.last_price[j])
+            n = int(self.moments.count[j])
+            if n == 0:
+                result[t] = {"last_price": last, "mean_ret": None, "ann_vol": None}
+                continue
+            sd = float(std[j]) if n > 1 else 0.0
+            result[t] = {
+                "last_price": round(last, 6),
+                "mean_ret": round(float(self.moments.mean[j]), 8),
+                "ann_vol": round(sd * float(np.sqrt(TRADING_DAYS)), 6),
+            }
+        return result
+
+    def to_dict(self) -> dict:
+        return {"tickers": self.tickers, "last_date": self.last_date,
+                "last_price": _list(self.last_price), "n_prices": self.n_prices.tolist(),
+                "moments": self.moments.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "MarketMetricsState":
+        state = cls(d["tickers"])
+        state.last_date = d.get("last_date")
+        state.last_price = _arr(d["last_price"])
+        state.n_prices = np.array(d["n_prices"], dtype=np.int64)
+        state.moments = RunningMoments.from_dict(d["moments"])
+        return state
+
+
+class PortfolioRiskState:
+    """Checkpointable state behind compute_portfolio_risk_metrics: return moments and drawdown,
+    plus rolling volatility and drawdown over each of `windows` trailing bars."""
+
+    def __init__(self, windows: Sequence[int] = ()):
+        self.last_date: Optional[str] = None
+        self.moments = RunningMoments(1)
+        self.drawdown = RunningDrawdown(1)
+        self.rolling_moments = [RollingMoments(1, w) for w in windows]
+        self.rolling_drawdowns = [RollingDrawdown(1, w) for w in windows]
+
+    @property
+    def windows(self) -> List[int]:
+        return [m.window for m in self.rolling_moments]
+
+    @property
+    def count(self) -> int:
+        return int(self.moments.count[0])
+
+    def update(self, rets: np.ndarray, curve: Optional[np.ndarray] = None,
+               dates: Optional[Sequence[str]] = None, curve_base: float = 1.0) -> None:
+        """Consume new returns and, when available, the matching curve levels.
+
+        curve_base is the payload's curve level just before the new bars (1.0 when
+        the payload starts with them). The levels are rebased from it onto the
+        checkpointed level, so payloads whose curves start on different dates
+        (e.g. a refetched rolling '1y' window) join up.
+        """
+        if not len(rets):
+            return
+        self.moments.update_block(rets[:, None])
+        if curve is None:
+            curve = self.drawdown.level[0] * np.cumprod(1.0 + rets)
+        else:
+            curve = curve * (self.drawdown.level[0] / curve_base)
+        self.drawdown.update_levels(curve[:, None])
+        for r, level in zip(rets[:, None], curve[:, None]):
+            for moments, drawdown in zip(self.rolling_moments, self.rolling_drawdowns):
+                moments.update(r)
+                drawdown.update_level(level)
+        if dates:
+            self.last_date = dates[-1]
+
+    def mean(self) -> float:
+        return float(self.moments.mean[0])
+
+    def std(self) -> float:
+        return float(self.moments.std(ddof=1)[0]) if self.count > 1 else 0.0
+
+    def max_drawdown(self) -> float:
+        return float(self.drawdown.max_drawdown[0])
+
+    def rolling(self) -> Dict[str, Optional[float]]:
+        """Annualized volatility and drawdown over each window at the last bar, as
+        rolling_metrics reports them: volatility is None until a full window with at
+        least window // 2 returns has been seen."""
+        result = {}
+        for moments, drawdown in zip(self.rolling_moments, self.rolling_drawdowns):
+            w = moments.window
+            full = drawdown.seq >= w and moments.count[0] >= max(2, w // 2)
+            vol = float(moments.std(ddof=1)[0]) * float(np.sqrt(TRADING_DAYS)) if full else np.nan
+            dd = float(drawdown.drawdown[0]) if drawdown.seq else np.nan
+            result[f"vol_{w}"] = None if vol != vol else vol
+            result[f"drawdown_{w}"] = None if dd != dd else dd
+        return result
+
+    def to_dict(self) -> dict:
+        return {"last_date": self.last_date, "moments": self.moments.to_dict(),
+                "drawdown": self.drawdown.to_dict(),
+                "rolling_moments": [m.to_dict() for m in self.rolling_moments],
+                "rolling_drawdowns": [d.to_dict() for d in self.rolling_drawdowns]}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PortfolioRiskState":
+        state = cls()
+        state.last_date = d.get("last_date")
+        state.moments = RunningMoments.from_dict(d["moments"])
+        state.drawdown = RunningDrawdown.from_dict(d["drawdown"])
+        state.rolling_moments = [RollingMoments.from_dict(m) for m in d.get("rolling_moments", [])]
+        state.rolling_drawdowns = [RollingDrawdown.from_dict(x) for x in d.get("rolling_drawdowns", [])]
+        return state
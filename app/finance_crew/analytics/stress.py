@@ -0,0 +1,117 @@
+from typing import Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Named market episodes (peak to trough of the S&P 500) available as historical scenarios.
+EPISODES = {
+    "gfc_2008": ("2008-09-01", "2009-03-09"),
+    "euro_crisis_2011": ("2011-07-22", "2011-10-03"),
+    "volmageddon_2018": ("2018-01-26", "2018-02-08"),
+    "q4_2018": ("2018-09-20", "2018-12-24"),
+    "covid_2020": ("2020-02-19", "2020-03-23"),
+    "rates_2022": ("2022-01-03", "2022-10-12"),
+}
+
+
+def forward_filled(prices: np.ndarray) -> np.ndarray:
+    """Every missing price replaced by the last earlier price of its column (NaN before the first one)."""
+    valid = ~np.isnan(prices)
+    rows = np.where(valid, np.arange(len(prices))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = prices[rows, np.arange(prices.shape[1])]
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+    return filled
+
+
+def date_rows(dates: Sequence[str], start: str, end: str) -> Tuple[int, int]:
+    """Rows of the first date on/after start and the last date on/before end (ISO dates, sorted).
+    Raises ValueError unless the prices reach back to start and forward to end, so a window
+    is never silently cut short."""
+    d = np.asarray(dates)
+    if len(d) and start < d[0]:
+        raise ValueError(f"Prices start on {d[0]}, after the window start {start}.")
+    if len(d) and d[-1] < end:
+        raise ValueError(f"Prices end on {d[-1]}, before the window end {end}.")
+    i = int(np.searchsorted(d, start, side="left"))
+    j = int(np.searchsorted(d, end, side="right")) - 1
+    if i >= len(d) or j < 0 or j <= i:
+        raise ValueError(f"No price history between {start} and {end}.")
+    return i, j
+
+
+def historical_shocks(prices: np.ndarray, dates: Sequence[str],
+                      windows: Sequence[Tuple[str, str]]) -> np.ndarray:
+    """(scenarios x tickers) total return of every ticker over each (start, end) date window.
+
+    Prices are forward-filled, so a ticker without a quote on a window's
+    first or last date uses its last earlier one; tickers with no price
+    before the window start get NaN.
+    """
+    filled = forward_filled(prices)
+    rows = np.array([date_rows(dates, start, end) for start, end in windows], dtype=np.intp).reshape(-1, 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return filled[rows[:, 1]] / filled[rows[:, 0]] - 1.0
+
+
+def window_shocks(prices: np.ndarray, length: int) -> np.ndarray:
+    """Total return of every ticker over every window of `length` rows, one scenario per
+    start row: ((dates - length) x tickers), computed as a single shifted division."""
+    if length < 1:
+        raise ValueError("length must be >= 1.")
+    filled = forward_filled(prices)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return filled[length:] / filled[:-length] - 1.0
+
+
+def hypothetical_shocks(tickers: Sequence[str], specs: Sequence[Mapping],
+                        asset_map: Optional[Mapping[str, str]] = None) -> np.ndarray:
+    """(scenarios x tickers) shocks from specs like
+    {"shocks": {ticker: r}, "asset_class_shocks": {asset_class: r}}.
+
+    A ticker shock overrides its asset class shock; anything unmentioned is 0.0.
+    """
+    asset_map = asset_map or {}
+    classes = sorted({c for spec in specs for c in spec.get("asset_class_shocks", {})})
+    member = np.array([[asset_map.get(t) == c for c in classes] for t in tickers], dtype=np.float64) \
+        .reshape(len(tickers), len(classes))
+    by_class = np.array([[float(spec.get("asset_class_shocks", {}).get(c, 0.0)) for c in classes] for spec in specs],
+                        dtype=np.float64).reshape(len(specs), len(classes))
+    shocks = by_class @ member.T
+    pos = {t: i for i, t in enumerate(tickers)}
+    for s, spec in enumerate(specs):
+        for t, r in spec.get("shocks", {}).items():
+            if t in pos:
+                shocks[s, pos[t]] = float(r)
+    return shocks
+
+
+def scenario_pnl(weights: np.ndarray, shocks: np.ndarray,
+                 values: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """P&L of P portfolios under S scenarios in one matrix product.
+
+    weights is (P, N) or (N,), shocks (S, N). A NaN shock (no price history)
+    counts as 0.0 and is reported through the coverage matrix: the share of
+    each portfolio's gross weight that had a shock in each scenario. Returns
+    (pnl, coverage), both (P, S); pnl is a return, or money when the
+    portfolios' values (P,) are given.
+    """
+    w = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    known = ~np.isnan(shocks)
+    pnl = w @ np.where(known, shocks, 0.0).T
+    gross = np.abs(w)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        coverage = (gross @ known.T) / gross.sum(axis=1, keepdims=True)
+    if values is not None:
+        pnl = pnl * np.asarray(values, dtype=np.float64).reshape(-1, 1)
+    return pnl, coverage
+
+
+def worst_scenarios(pnl: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of each row's k lowest P&L values, worst first, via partial sort."""
+    k = min(k, pnl.shape[1])
+    if k <= 0:
+        return np.empty((pnl.shape[0], 0), dtype=np.intp)
+    idx = np.argpartition(pnl, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(pnl, idx, axis=1), axis=1)
+    return np.take_along_axis(idx, order, axis=1)
+
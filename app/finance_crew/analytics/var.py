@@ -0,0 +1,111 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .covariance import CovarianceModel
+from .returns import portfolio_returns
+
+METHODS = ("historical", "normal", "bootstrap")
+
+
+def tail_size(n: int, conf: float) -> int:
+    """Number of worst outcomes in the (1 - conf) tail of n scenarios (at least 1)."""
+    if not 0.0 < conf < 1.0:
+        raise ValueError("conf must be between 0 and 1.")
+    return max(1, int(np.ceil(round((1.0 - conf) * n, 9))))
+
+
+def _merge_tail(tail: Optional[np.ndarray], pnl: np.ndarray, k: int) -> np.ndarray:
+    """The k smallest values per row of tail and pnl side by side, unordered.
+
+    Works on (portfolios x scenarios) so each partition runs over contiguous memory.
+    """
+    both = pnl if tail is None else np.hstack([tail, pnl])
+    if both.shape[1] <= k:
+        return both
+    return np.partition(both, k - 1, axis=1)[:, :k]
+
+
+def _tail_stats(tail: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return tail.max(axis=1), tail.mean(axis=1)
+
+
+def var_cvar(pnl: np.ndarray, conf: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """VaR and CVaR (expected shortfall) of every column of a (scenarios x portfolios) return matrix.
+
+    Both are returns, so losses are negative: VaR is the k-th worst scenario
+    with k = ceil((1 - conf) * n) and CVaR the mean of the k worst. A 1-D
+    input gives 0-d results.
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    if len(pnl) == 0:
+        raise ValueError("No scenarios.")
+    tail = _merge_tail(None, np.ascontiguousarray(np.atleast_2d(pnl.T)), tail_size(len(pnl), conf))
+    var, cvar = _tail_stats(tail)
+    return (var[0], cvar[0]) if pnl.ndim == 1 else (var, cvar)
+
+
+def scenario_model(rets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean vector and Cholesky factor of the sample covariance of a (dates x tickers)
+    returns matrix (see CovarianceModel; missing returns count as 0.0)."""
+    model = CovarianceModel.fit(rets)
+    return model.mean, model.cholesky
+
+
+def scenario_var(rets: np.ndarray, weights: np.ndarray, conf: float = 0.95, method: str = "historical",
+                 n_scenarios: int = 10_000, seed: Optional[int] = None,
+                 chunk_size: int = 10_000) -> Tuple[np.ndarray, np.ndarray, int]:
+    """VaR and CVaR for one or many portfolios over the same ticker universe.
+
+    rets is (dates x tickers), weights (tickers,) or (portfolios x tickers);
+    returns (var, cvar, n_scenarios) with one value per portfolio.
+
+    - historical: the observed portfolio returns are the scenarios, built with
+      portfolio_returns (a day with a missing return on a held ticker is 0.0).
+    - normal: Monte Carlo draws from a multivariate normal fitted to rets.
+    - bootstrap: Monte Carlo draws of whole historical dates, with replacement.
+
+    Monte Carlo scenarios are generated `chunk_size` at a time and only the
+    running (1 - conf) tail is kept per portfolio, so memory is bounded by
+    (chunk_size + tail) x portfolios whatever n_scenarios is. The draws come
+    from one seeded generator in a fixed order, so results depend on the seed
+    but not on chunk_size.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'; expected one of {', '.join(METHODS)}.")
+    rets = np.asarray(rets, dtype=np.float64)
+    w = np.asarray(weights, dtype=np.float64)
+    single = w.ndim == 1
+    w = np.atleast_2d(w)
+
+    if method == "historical":
+        hist, _ = portfolio_returns(rets, w, w != 0)
+        var, cvar = var_cvar(hist, conf)
+        n = len(hist)
+    else:
+        if n_scenarios < 1 or chunk_size < 1:
+            raise ValueError("n_scenarios and chunk_size must be >= 1.")
+        rng = np.random.default_rng(seed)
+        k = tail_size(n_scenarios, conf)
+        if method == "normal":
+            mean, chol = scenario_model(rets)
+            loc = (w @ mean)[:, None]
+            load = w @ chol
+        else:
+            hist, _ = portfolio_returns(rets, w, w != 0)
+            if len(hist) == 0:
+                raise ValueError("No return dates to bootstrap.")
+            hist = np.ascontiguousarray(hist.T)
+        tail = None
+        for lo in range(0, n_scenarios, chunk_size):
+            size = min(chunk_size, n_scenarios - lo)
+            if method == "normal":
+                pnl = loc + load @ rng.standard_normal((size, chol.shape[1])).T
+            else:
+                pnl = hist[:, rng.integers(0, hist.shape[1], size)]
+            tail = _merge_tail(tail, pnl, k)
+        var, cvar = _tail_stats(tail)
+        n = n_scenarios
+    if single:
+        return var[0], cvar[0], n
+    return var, cvar, n
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from typing import List
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task, tool
@@ -5,65 +7,101 @@ from crewai.agents.agent_builder.base_agent import BaseAgent
 from dotenv import load_dotenv
 
 from crewai import LLM
-from app.finance_crew.tools.researcher_agent import (
-    ReadPortfolioTickersTool,
-    FetchYFinancePricesTool,
-    ComputeMarketMetricsTool,
-)
-from app.finance_crew.tools.risk_analyst import (
-    BuildPortfolioReturnsTool,
-    PortfolioRiskMetricsTool,
-    ExposuresVsTargetTool,
-    ConcentrationMetricsTool,
-    BetaCorrelationTool,
-    DataQualityCheckTool,
-)
+from app.finance_crew.service.client import WorkerClient, remote
+# Tool packages load each tool (and its numeric stack) on first use, so importing the crew stays cheap.
+from app.finance_crew.tools import rebalancer as rebalancer_tools
+from app.finance_crew.tools import researcher_agent as researcher_tools
+from app.finance_crew.tools import risk_analyst as risk_tools
 
 load_dotenv()
 
 OPENROUTER_MODEL = "openrouter/mistralai/mistral-7b-instruct"
 OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
 
+# With FINANCE_CREW_WORKER_URL set, every tool call runs on that resident worker (see `serve`).
+WORKER = WorkerClient.from_env()
+
 @CrewBase
 class FinAssistCrew:
     agents: List[BaseAgent]
     tasks: List[Task]
 
     @tool
-    def read_portfolio_tickers_tool(self) -> ReadPortfolioTickersTool:
-        return ReadPortfolioTickersTool()
+    def read_portfolio_tickers_tool(self) -> researcher_tools.ReadPortfolioTickersTool:
+        return remote("read_portfolio_tickers", lambda: researcher_tools.ReadPortfolioTickersTool(), WORKER)
+
+    @tool
+    def fetch_yfinance_prices_tool(self) -> researcher_tools.FetchYFinancePricesTool:
+        def build():
+            from app.finance_crew.market_data import PriceCache, default_downloader
+
+            downloader = default_downloader()
+            return researcher_tools.FetchYFinancePricesTool(
+                downloader=downloader,
+                price_cache=PriceCache.from_env(downloader),
+            )
+
+        return remote("fetch_yfinance_prices", build, WORKER)
+
+    @tool
+    def compute_market_metrics_tool(self) -> researcher_tools.ComputeMarketMetricsTool:
+        return remote("compute_market_metrics", lambda: researcher_tools.ComputeMarketMetricsTool(), WORKER)
+
+    @tool
+    def holdings_weights_tool(self) -> researcher_tools.HoldingsWeightsTool:
+        return remote("compute_holdings_weights", lambda: researcher_tools.HoldingsWeightsTool(), WORKER)
+
+    @tool
+    def align_price_panel_tool(self) -> researcher_tools.AlignPricePanelTool:
+        return remote("align_price_panel", lambda: researcher_tools.AlignPricePanelTool(), WORKER)
+
+    @tool
+    def build_portfolio_returns_tool(self) -> risk_tools.BuildPortfolioReturnsTool:
+        return remote("build_portfolio_returns", lambda: risk_tools.BuildPortfolioReturnsTool(), WORKER)
+
+    @tool
+    def portfolio_risk_metrics_tool(self) -> risk_tools.PortfolioRiskMetricsTool:
+        return remote("compute_portfolio_risk_metrics", lambda: risk_tools.PortfolioRiskMetricsTool(), WORKER)
 
     @tool
-    def fetch_yfinance_prices_tool(self) -> FetchYFinancePricesTool:
-        return FetchYFinancePricesTool()
+    def exposures_vs_target_tool(self) -> risk_tools.ExposuresVsTargetTool:
+        return remote("compute_exposures_vs_target", lambda: risk_tools.ExposuresVsTargetTool(), WORKER)
 
     @tool
-    def compute_market_metrics_tool(self) -> ComputeMarketMetricsTool:
-        return ComputeMarketMetricsTool()
+    def concentration_metrics_tool(self) -> risk_tools.ConcentrationMetricsTool:
+        return remote("compute_concentration_metrics", lambda: risk_tools.ConcentrationMetricsTool(), WORKER)
 
     @tool
-    def build_portfolio_returns_tool(self) -> BuildPortfolioReturnsTool:
-        return BuildPortfolioReturnsTool()
+    def beta_correlation_tool(self) -> risk_tools.BetaCorrelationTool:
+        return remote("compute_beta_and_correlations", lambda: risk_tools.BetaCorrelationTool(), WORKER)
 
     @tool
-    def portfolio_risk_metrics_tool(self) -> PortfolioRiskMetricsTool:
-        return PortfolioRiskMetricsTool()
+    def data_quality_check_tool(self) -> risk_tools.DataQualityCheckTool:
+        return remote("validate_portfolio_data_quality", lambda: risk_tools.DataQualityCheckTool(), WORKER)
 
     @tool
-    def exposures_vs_target_tool(self) -> ExposuresVsTargetTool:
-        return ExposuresVsTargetTool()
+    def scenario_var_tool(self) -> risk_tools.ScenarioVarTool:
+        return remote("compute_scenario_var", lambda: risk_tools.ScenarioVarTool(), WORKER)
 
     @tool
-    def concentration_metrics_tool(self) -> ConcentrationMetricsTool:
-        return ConcentrationMetricsTool()
+    def covariance_risk_tool(self) -> risk_tools.CovarianceRiskTool:
+        return remote("compute_covariance_risk", lambda: risk_tools.CovarianceRiskTool(), WORKER)
 
     @tool
-    def beta_correlation_tool(self) -> BetaCorrelationTool:
-        return BetaCorrelationTool()
+    def rolling_risk_tool(self) -> risk_tools.RollingRiskTool:
+        return remote("compute_rolling_risk", lambda: risk_tools.RollingRiskTool(), WORKER)
 
     @tool
-    def data_quality_check_tool(self) -> DataQualityCheckTool:
-        return DataQualityCheckTool()
+    def stress_test_tool(self) -> risk_tools.StressTestTool:
+        return remote("run_stress_test", lambda: risk_tools.StressTestTool(), WORKER)
+
+    @tool
+    def risk_suite_tool(self) -> risk_tools.RiskSuiteTool:
+        return remote("run_risk_suite", lambda: risk_tools.RiskSuiteTool(), WORKER)
+
+    @tool
+    def rebalance_portfolio_tool(self) -> rebalancer_tools.RebalancePortfolioTool:
+        return remote("optimize_rebalance", lambda: rebalancer_tools.RebalancePortfolioTool(), WORKER)
 
     @agent
     def researcher(self) -> Agent:
@@ -74,6 +112,8 @@ class FinAssistCrew:
                 self.read_portfolio_tickers_tool(),
                 self.fetch_yfinance_prices_tool(),
                 self.compute_market_metrics_tool(),
+                self.holdings_weights_tool(),
+                self.align_price_panel_tool(),
             ],
             llm=LLM(
                 model=OPENROUTER_MODEL,
@@ -95,6 +135,11 @@ class FinAssistCrew:
                 self.concentration_metrics_tool(),
                 self.beta_correlation_tool(),
                 self.data_quality_check_tool(),
+                self.scenario_var_tool(),
+                self.covariance_risk_tool(),
+                self.rolling_risk_tool(),
+                self.stress_test_tool(),
+                self.risk_suite_tool(),
             ],
             llm=LLM(
                 model=OPENROUTER_MODEL,
@@ -109,7 +154,9 @@ class FinAssistCrew:
         return Agent(
             config=self.agents_config['rebalancer'],  # type: ignore[index]
             verbose=True,
-            tools=[],
+            tools=[
+                self.rebalance_portfolio_tool(),
+            ],
             llm=LLM(
                 model=OPENROUTER_MODEL,
                 temperature=0.6,
@@ -137,6 +184,13 @@ class FinAssistCrew:
             output_file='output/report.md',
         )
 
+    def quant_reporting_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['quant_reporting_task'],  # type: ignore[index]
+            agent=self.rebalancer(),
+            output_file='output/report.md',
+        )
+
     @crew
     def crew(self) -> Crew:
         return Crew(
@@ -145,3 +199,13 @@ class FinAssistCrew:
             process=Process.sequential,
             verbose=True,
         )
+
+    def fast_crew(self) -> Crew:
+        """Reporting-only crew for metrics computed by pipeline.run_quant_pipeline
+        (passed in the 'quant_metrics' input)."""
+        return Crew(
+            agents=[self.rebalancer()],
+            tasks=[self.quant_reporting_task()],
+            process=Process.sequential,
+            verbose=True,
+        )
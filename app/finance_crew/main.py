@@ -1,10 +1,11 @@
+import json
 import sys
 import warnings
 from datetime import datetime
 from dotenv import load_dotenv
 load_dotenv()
 
-from app.finance_crew.crew import FinAssistCrew
+from app.finance_crew.profiling import trace_run
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -13,6 +14,34 @@ def run():
     """
     Run the FinAssist crew.
     """
+    from app.finance_crew.crew import FinAssistCrew
+
+    inputs = {
+        "topic": "Portfolio Management",
+        "current_year": str(datetime.now().year),
+        "dataset_path": "data/portfolio_large.csv",
+    }
+
+    try:
+        with trace_run("run") as trace_path:
+            FinAssistCrew().crew().kickoff(inputs=inputs)
+        if trace_path:
+            print(f"Trace written to {trace_path}", file=sys.stderr)
+    except Exception as e:
+        raise Exception(f"An error occurred while running the crew: {e}")
+
+
+def run_fast():
+    """
+    Run the quantitative stages as a deterministic pipeline, then let the rebalancer
+    agent turn the finished metrics into trades and the report. With
+    FINANCE_CREW_WORKER_URL set the pipeline runs on that worker, against its warm caches.
+    """
+    from app.finance_crew.crew import FinAssistCrew
+    from app.finance_crew.market_data import PriceCache, default_downloader
+    from app.finance_crew.pipeline import run_quant_pipeline
+    from app.finance_crew.service import WorkerClient
+
     inputs = {
         "topic": "Portfolio Management",
         "current_year": str(datetime.now().year),
@@ -20,7 +49,18 @@ def run():
     }
 
     try:
-        FinAssistCrew().crew().kickoff(inputs=inputs)
+        with trace_run("run_fast") as trace_path:
+            worker = WorkerClient.from_env()
+            if worker is not None:
+                metrics = worker.quant_pipeline(inputs["dataset_path"])
+            else:
+                downloader = default_downloader()
+                metrics = run_quant_pipeline(inputs["dataset_path"], downloader=downloader,
+                                             price_cache=PriceCache.from_env(downloader))
+            inputs["quant_metrics"] = json.dumps(metrics)
+            FinAssistCrew().fast_crew().kickoff(inputs=inputs)
+        if trace_path:
+            print(f"Trace written to {trace_path}", file=sys.stderr)
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
 
@@ -29,6 +69,8 @@ def train():
     """
     Train the FinAssist crew for a given number of iterations.
     """
+    from app.finance_crew.crew import FinAssistCrew
+
     inputs = {
         "topic": "Risk Analysis",
         "current_year": str(datetime.now().year)
@@ -42,10 +84,137 @@ def train():
         raise Exception(f"An error occurred while training the crew: {e}")
 
 
+def batch():
+    """
+    Run the numeric risk pipeline for many portfolios at once, without the LLM agents.
+    Usage: batch <portfolio_book.csv> <output.csv> [benchmark] [period]
+    The book is a long CSV with portfolio_id, ticker, weight and optionally
+    asset_class and target_weight columns.
+    """
+    from app.finance_crew.market_data import PriceCache, default_downloader, fetch_price_panel
+    from app.finance_crew.pipeline import asset_map_from, pivot_weights, read_portfolio_book, run_batch
+
+    book_path, output_path = sys.argv[1], sys.argv[2]
+    benchmark = sys.argv[3] if len(sys.argv) > 3 else "SPY"
+    period = sys.argv[4] if len(sys.argv) > 4 else "1y"
+
+    try:
+        book = read_portfolio_book(book_path)
+        weights = pivot_weights(book)
+        targets = pivot_weights(book, "target_weight") if "target_weight" in book.columns else None
+        asset_map = asset_map_from(book) if "asset_class" in book.columns else None
+        downloader = default_downloader()
+        fetched = fetch_price_panel(sorted(set(weights.columns) | {benchmark}), period=period,
+                                    downloader=downloader, price_cache=PriceCache.from_env(downloader))
+        result = run_batch(weights, fetched.panel, asset_map=asset_map, targets=targets, benchmark=benchmark)
+        result.to_csv(output_path)
+        if fetched.failed:
+            print(f"No prices for: {', '.join(sorted(fetched.failed))}", file=sys.stderr)
+    except Exception as e:
+        raise Exception(f"An error occurred while running the batch: {e}")
+
+
+def rebalance_batch():
+    """
+    Compute whole-share rebalancing trades for many accounts at once, without the LLM agents.
+    Usage: rebalance_batch <holdings_book.csv> <output.csv> [period]
+    The book is a long CSV with account, ticker, quantity, asset_class and target_weight columns.
+    """
+    import pandas as pd
+    from app.finance_crew.market_data import PriceCache, default_downloader, fetch_price_panel
+    from app.finance_crew.portfolio import CASH_CLASS, rebalance_accounts
+
+    book_path, output_path = sys.argv[1], sys.argv[2]
+    period = sys.argv[3] if len(sys.argv) > 3 else "1y"
+
+    try:
+        book = pd.read_csv(book_path, dtype={"account": str, "ticker": str, "asset_class": str})
+        tickers = sorted(set(book.loc[book["asset_class"] != CASH_CLASS, "ticker"].str.strip()))
+        downloader = default_downloader()
+        fetched = fetch_price_panel(tickers, period=period, downloader=downloader,
+                                    price_cache=PriceCache.from_env(downloader))
+        rebalance_accounts(book, fetched.panel).to_csv(output_path, index=False)
+        if fetched.failed:
+            print(f"No prices for: {', '.join(sorted(fetched.failed))}", file=sys.stderr)
+    except Exception as e:
+        raise Exception(f"An error occurred while rebalancing the batch: {e}")
+
+
+def ingest_panel():
+    """
+    Download prices for a large universe into a memory-mapped panel file, chunk by chunk.
+    Usage: ingest_panel <tickers.txt|book.csv> <panel_path> [period] [interval]
+    The ticker list is one ticker per line, or any CSV with a ticker column. Tools
+    read the panel through fetch_yfinance_prices' 'path' descriptor or open_panel_file.
+    """
+    import pandas as pd
+    from app.finance_crew.market_data import PriceCache, default_downloader, fetch_panel_file
+
+    tickers_path, panel_path = sys.argv[1], sys.argv[2]
+    period = sys.argv[3] if len(sys.argv) > 3 else "1y"
+    interval = sys.argv[4] if len(sys.argv) > 4 else "1d"
+
+    try:
+        if tickers_path.endswith(".csv"):
+            tickers = pd.read_csv(tickers_path, dtype={"ticker": str})["ticker"].str.strip().tolist()
+        else:
+            with open(tickers_path, encoding="utf-8") as f:
+                tickers = [line.strip() for line in f if line.strip()]
+        downloader = default_downloader()
+        fetched = fetch_panel_file(tickers, panel_path, period=period, interval=interval, downloader=downloader,
+                                   price_cache=PriceCache.from_env(downloader))
+        panel = fetched.panel
+        print(f"{panel.n_tickers} tickers x {panel.n_dates} dates written to {panel_path}")
+        if fetched.failed:
+            print(f"No prices for: {', '.join(sorted(fetched.failed))}", file=sys.stderr)
+    except Exception as e:
+        raise Exception(f"An error occurred while ingesting the panel: {e}")
+
+
+def trace_summary():
+    """
+    Print the hottest stages of a traced run (set FINANCE_CREW_TRACE_DIR to trace run / run_fast).
+    Usage: trace_summary <trace.jsonl|trace.json> [top_n]
+    """
+    from app.finance_crew.profiling import format_summary, load_trace, summarize
+
+    path = sys.argv[1]
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    try:
+        events = load_trace(path)
+        runs = [e for e in events if e.get("cat") == "run"]
+        if runs:
+            print(f"{runs[0]['name']}: {runs[0]['dur'] / 1e6:.2f} s wall")
+        print(format_summary(summarize(events, top)))
+    except Exception as e:
+        raise Exception(f"An error occurred while summarizing the trace: {e}")
+
+
+def serve():
+    """
+    Run a resident tool worker that keeps prices and computed metrics warm across runs.
+    Usage: serve [port] [host]
+    Point run / run_fast at it with FINANCE_CREW_WORKER_URL=http://host:port.
+    """
+    from app.finance_crew.service import serve as serve_worker
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    host = sys.argv[2] if len(sys.argv) > 2 else None
+
+    try:
+        serve_worker(host=host, port=port)
+    except Exception as e:
+        raise Exception(f"An error occurred while running the worker: {e}")
+
+
 def replay():
     """
     Replay the FinAssist crew execution from a specific task.
+    Every agent and tool is built up front (the later tasks re-run), so this starts as slowly as `run`.
     """
+    from app.finance_crew.crew import FinAssistCrew
+
     try:
         FinAssistCrew().crew().replay(task_id=sys.argv[1])
     except Exception as e:
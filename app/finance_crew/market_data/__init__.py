@@ -0,0 +1,65 @@
+from .alignment import (
+    AlignedPanel,
+    AlignmentCache,
+    AlignmentConfig,
+    QualityStats,
+    align_panel,
+    alignment_cache,
+    fill_gaps,
+    load_aligned_panel,
+    quality_stats,
+)
+from .batch_download import BatchDownloader, BatchResult, TokenBucket
+from .downloaders import InMemoryDownloader, PriceDownloader, StubDownloader, YFinanceDownloader
+from .panel_file import PANEL_FORMAT, PanelFileWriter, open_panel_file, panel_paths
+from .price_cache import CacheResult, PriceCache
+from .sources import FetchResult, default_downloader, fetch_panel_file, fetch_price_panel
+from .price_store import (
+    PricePanel,
+    PriceStore,
+    PricesPayloadError,
+    handle_payload,
+    load_price_panel,
+    price_store,
+)
+from .wire import BINARY_FORMAT, decode_array, encode_array, load_returns, returns_payload
+
+__all__ = [
+    "AlignedPanel",
+    "AlignmentCache",
+    "AlignmentConfig",
+    "QualityStats",
+    "align_panel",
+    "alignment_cache",
+    "fill_gaps",
+    "load_aligned_panel",
+    "quality_stats",
+    "BINARY_FORMAT",
+    "BatchDownloader",
+    "BatchResult",
+    "CacheResult",
+    "FetchResult",
+    "InMemoryDownloader",
+    "PriceCache",
+    "PriceDownloader",
+    "StubDownloader",
+    "TokenBucket",
+    "YFinanceDownloader",
+    "default_downloader",
+    "fetch_panel_file",
+    "fetch_price_panel",
+    "PANEL_FORMAT",
+    "PanelFileWriter",
+    "open_panel_file",
+    "panel_paths",
+    "PricePanel",
+    "PriceStore",
+    "PricesPayloadError",
+    "handle_payload",
+    "load_price_panel",
+    "price_store",
+    "decode_array",
+    "encode_array",
+    "load_returns",
+    "returns_payload",
+]
@@ -0,0 +1,298 @@
+import threading
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .price_store import PricePanel, load_price_panel
+
+FILL_POLICIES = ("ffill", "interpolate", "drop", "none")
+CALENDARS = ("union", "common", "business")
+
+
+@dataclass(frozen=True)
+class AlignmentConfig:
+    """How a raw panel is put on one calendar and its gaps filled.
+
+    calendar: 'union' keeps every date any ticker traded; 'common' keeps the
+    dates on which every listed ticker traded (exchange holidays drop out);
+    'business' reindexes to every weekday, so weekday holidays become gaps;
+    any ticker symbol uses that ticker's trading days (e.g. the benchmark's exchange).
+    fill: 'ffill' carries the last price forward over at most `limit` bars;
+    'interpolate' fills gaps of at most `limit` bars linearly; 'drop' removes
+    dates on which any listed ticker is missing; 'none' leaves gaps. limit 0 is unlimited.
+    Gaps before a ticker's first price are never filled.
+    """
+    fill: str = "ffill"
+    limit: int = 5
+    calendar: str = "union"
+    stale_run: int = 5
+    outlier_z: float = 8.0
+
+    def __post_init__(self):
+        if self.fill not in FILL_POLICIES:
+            raise ValueError(f"Unknown fill '{self.fill}'; expected one of {', '.join(FILL_POLICIES)}.")
+        if self.limit < 0 or self.stale_run < 2:
+            raise ValueError("limit must be >= 0 and stale_run >= 2.")
+
+
+def run_lengths(flags: np.ndarray) -> np.ndarray:
+    """Length of the run of True ending at each row of every column (0 where False)."""
+    count = np.cumsum(flags, axis=0)
+    reset = np.where(flags, 0, count)
+    np.maximum.accumulate(reset, axis=0, out=reset)
+    return count - reset
+
+
+def _last_valid_rows(valid: np.ndarray) -> np.ndarray:
+    """Row of the last valid value at or before each row (-1 before the first one)."""
+    rows = np.where(valid, np.arange(len(valid))[:, None], -1)
+    return np.maximum.accumulate(rows, axis=0)
+
+
+def _next_valid_rows(valid: np.ndarray) -> np.ndarray:
+    """Row of the next valid value at or after each row (len(valid) after the last one)."""
+    n = len(valid)
+    rows = np.where(valid, np.arange(n)[:, None], n)
+    return np.minimum.accumulate(rows[::-1], axis=0)[::-1]
+
+
+def fill_gaps(values: np.ndarray, fill: str, limit: int = 0) -> np.ndarray:
+    """Copy of a (dates x tickers) price matrix with gaps filled by 'ffill' or 'interpolate'."""
+    out = np.array(values, dtype=np.float64)
+    valid = ~np.isnan(out)
+    if fill not in ("ffill", "interpolate") or valid.all():
+        return out
+    rows = np.arange(len(out))[:, None]
+    cols = np.arange(out.shape[1])
+    prev = _last_valid_rows(valid)
+    if fill == "ffill":
+        take = ~valid & (prev >= 0)
+        if limit:
+            take &= rows - prev <= limit
+        out[take] = out[np.maximum(prev, 0), cols][take]
+        return out
+    nxt = _next_valid_rows(valid)
+    take = ~valid & (prev >= 0) & (nxt < len(out))
+    if limit:
+        take &= nxt - prev - 1 <= limit
+    p0 = out[np.maximum(prev, 0), cols]
+    p1 = out[np.minimum(nxt, len(out) - 1), cols]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = (rows - prev) / (nxt - prev)
+    out[take] = (p0 + (p1 - p0) * frac)[take]
+    return out
+
+
+def _listed(valid: np.ndarray) -> np.ndarray:
+    """True from a ticker's first to its last price."""
+    return np.maximum.accumulate(valid, axis=0) & np.maximum.accumulate(valid[::-1], axis=0)[::-1]
+
+
+def _calendar_rows(panel: PricePanel, calendar: str) -> Tuple[np.ndarray, List[str]]:
+    """(values, dates) of the panel on the requested calendar."""
+    if calendar == "union" or panel.n_dates == 0:
+        return panel.values, list(panel.dates)
+    if calendar == "business":
+        days = pd.bdate_range(panel.dates[0], panel.dates[-1]).strftime("%Y-%m-%d")
+        pos = pd.Index(panel.dates).get_indexer(days)
+        values = np.where((pos >= 0)[:, None], panel.values[np.maximum(pos, 0)], np.nan)
+        return values, list(days)
+    valid = ~np.isnan(panel.values)
+    if calendar == "common":
+        keep = (valid | ~_listed(valid)).all(axis=1)
+    elif calendar in panel:
+        keep = valid[:, panel.position(calendar)]
+    else:
+        raise ValueError(f"Unknown calendar '{calendar}'; expected one of {', '.join(CALENDARS)} or a ticker.")
+    return panel.values[keep], [d for d, k in zip(panel.dates, keep) if k]
+
+
+_COUNT_FIELDS = ("observations", "missing", "leading", "trailing", "max_gap", "filled",
+                 "stale_runs", "max_stale", "outliers")
+
+
+@dataclass
+class QualityStats:
+    """Per-ticker data quality of a panel on its aligned calendar, before filling.
+
+    missing counts gaps between a ticker's first and last price (leading and
+    trailing rows are reported separately); a stale run is stale_run or more
+    identical consecutive prices; an outlier is a log return more than
+    outlier_z robust standard deviations (1.4826 x MAD) from the median.
+    """
+    tickers: Tuple[str, ...]
+    observations: np.ndarray
+    missing: np.ndarray
+    leading: np.ndarray
+    trailing: np.ndarray
+    max_gap: np.ndarray
+    filled: np.ndarray
+    stale_runs: np.ndarray
+    max_stale: np.ndarray
+    outliers: np.ndarray
+    max_abs_return: np.ndarray
+    dropped_dates: int = 0
+
+    def ticker(self, t: str) -> dict:
+        j = self.tickers.index(t)
+        stats = {name: int(getattr(self, name)[j]) for name in _COUNT_FIELDS}
+        r = float(self.max_abs_return[j])
+        stats["max_abs_return"] = None if r != r else round(r, 6)
+        return stats
+
+    def flagged(self) -> List[str]:
+        bad = (self.missing > 0) | (self.stale_runs > 0) | (self.outliers > 0) | (self.observations < 2)
+        return [t for t, b in zip(self.tickers, bad) if b]
+
+    def issues(self) -> List[str]:
+        out = []
+        for t in self.flagged():
+            j = self.tickers.index(t)
+            if self.observations[j] < 2:
+                out.append(f"{t}: fewer than 2 prices")
+            if self.missing[j]:
+                out.append(f"{t}: {int(self.missing[j])} missing price points (longest gap {int(self.max_gap[j])})")
+            if self.stale_runs[j]:
+                out.append(f"{t}: {int(self.stale_runs[j])} stale runs (longest {int(self.max_stale[j])} bars)")
+            if self.outliers[j]:
+                out.append(f"{t}: {int(self.outliers[j])} outlier jumps (max |return| "
+                           f"{float(self.max_abs_return[j]):.2%})")
+        return out
+
+    def summary(self) -> dict:
+        return {
+            "tickers": len(self.tickers),
+            "tickers_with_gaps": int((self.missing > 0).sum()),
+            "tickers_with_stale_runs": int((self.stale_runs > 0).sum()),
+            "tickers_with_outliers": int((self.outliers > 0).sum()),
+            "filled_points": int(self.filled.sum()),
+            "dropped_dates": self.dropped_dates,
+        }
+
+
+def quality_stats(values: np.ndarray, tickers, stale_run: int = 5, outlier_z: float = 8.0) -> QualityStats:
+    """Gap, stale-run and outlier statistics of every column, in a few passes over the matrix."""
+    n, k = values.shape
+    valid = ~np.isnan(values)
+    listed = _listed(valid)
+    observations = valid.sum(axis=0)
+    gaps = listed & ~valid
+    first = np.where(observations > 0, np.argmax(valid, axis=0), n)
+    last = np.where(observations > 0, n - 1 - np.argmax(valid[::-1], axis=0), n - 1)
+
+    same = valid[1:] & valid[:-1] & (values[1:] == values[:-1])
+    stale = run_lengths(same) if n > 1 else np.zeros((0, k), dtype=np.int64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        prev = values[np.maximum(_last_valid_rows(valid)[:-1], 0), np.arange(k)] if n > 1 else np.empty((0, k))
+        logret = np.where(valid[1:] & (prev > 0) & (values[1:] > 0), np.log(values[1:] / prev), np.nan)
+    if n > 1 and np.isfinite(logret).any():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            med = np.nanmedian(logret, axis=0)
+            mad = 1.4826 * np.nanmedian(np.abs(logret - med), axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = np.abs(logret - med) / mad
+        outliers = ((z > outlier_z) & (mad > 0)).sum(axis=0)
+        max_abs = np.nanmax(np.where(np.isnan(logret), -np.inf, np.abs(np.expm1(logret))), axis=0)
+        max_abs = np.where(np.isfinite(max_abs), max_abs, np.nan)
+    else:
+        outliers = np.zeros(k, dtype=np.int64)
+        max_abs = np.full(k, np.nan)
+    return QualityStats(
+        tickers=tuple(tickers),
+        observations=observations,
+        missing=gaps.sum(axis=0),
+        leading=np.minimum(first, n),
+        trailing=np.where(observations > 0, n - 1 - last, 0),
+        max_gap=run_lengths(gaps).max(axis=0) if n else np.zeros(k, dtype=np.int64),
+        filled=np.zeros(k, dtype=np.int64),
+        stale_runs=(stale == stale_run - 1).sum(axis=0),
+        max_stale=np.where(stale.max(axis=0) > 0, stale.max(axis=0) + 1, 0) if n > 1 else np.zeros(k, np.int64),
+        outliers=outliers,
+        max_abs_return=max_abs,
+    )
+
+
+@dataclass
+class AlignedPanel:
+    """A panel on one calendar with its gaps filled, plus the quality stats of the raw data."""
+    panel: PricePanel
+    quality: QualityStats
+    config: AlignmentConfig
+    source_key: str
+
+
+def align_panel(panel: PricePanel, config: AlignmentConfig = AlignmentConfig()) -> AlignedPanel:
+    """Put the panel on config.calendar, measure its quality, then apply config.fill."""
+    values, dates = _calendar_rows(panel, config.calendar)
+    quality = quality_stats(values, panel.tickers, config.stale_run, config.outlier_z)
+    if config.fill == "drop":
+        valid = ~np.isnan(values)
+        keep = (valid | ~_listed(valid)).all(axis=1)
+        quality.dropped_dates = int((~keep).sum())
+        values, dates = values[keep], [d for d, k in zip(dates, keep) if k]
+    else:
+        filled = fill_gaps(values, config.fill, config.limit)
+        quality.filled = (np.isnan(values) & ~np.isnan(filled)).sum(axis=0)
+        values = filled
+    return AlignedPanel(PricePanel(values, dates, panel.tickers), quality, config, panel.key)
+
+
+class AlignmentCache:
+    """Thread-safe LRU of aligned panels, so each (panel, config) is aligned and scanned once.
+
+    Entries are found by source panel key and config, and by the aligned
+    panel's own key and the same config, so a tool handed an aligned panel
+    still gets the quality stats of the raw data it came from.
+    """
+
+    def __init__(self, max_panels: int = 32):
+        self.max_panels = max_panels
+        self._entries: "OrderedDict[Tuple[str, AlignmentConfig], AlignedPanel]" = OrderedDict()
+        self._by_result: Dict[Tuple[str, AlignmentConfig], Tuple[str, AlignmentConfig]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_align(self, panel: PricePanel, config: AlignmentConfig = AlignmentConfig()) -> AlignedPanel:
+        key = (panel.key, config)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None and key in self._by_result:
+                hit = self._entries.get(self._by_result[key])
+            if hit is not None:
+                self._entries.move_to_end((hit.source_key, hit.config))
+                return hit
+        aligned = align_panel(panel, config)
+        with self._lock:
+            self._entries[key] = aligned
+            self._by_result[(aligned.panel.key, config)] = key
+            while len(self._entries) > self.max_panels:
+                dropped_key, dropped = self._entries.popitem(last=False)
+                result_key = (dropped.panel.key, dropped.config)
+                if self._by_result.get(result_key) == dropped_key:
+                    del self._by_result[result_key]
+        return aligned
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_result.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+alignment_cache = AlignmentCache()
+
+
+def load_aligned_panel(prices_json: str, fill: str = "none") -> PricePanel:
+    """load_price_panel, then with any fill but 'none' the panel aligned through alignment_cache
+    (union calendar, default limit), so tools asking for the same policy share one alignment."""
+    panel = load_price_panel(prices_json)
+    if fill == "none":
+        return panel
+    return alignment_cache.get_or_align(panel, AlignmentConfig(fill=fill)).panel
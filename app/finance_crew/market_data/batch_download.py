@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .downloaders import PriceDownloader
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        if self.capacity <= 0:
+            raise ValueError("capacity must be positive.")
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}.")
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self.sleep(wait)
+
+
+@dataclass
+class BatchResult:
+    """Merged price panel of all chunks plus the tickers that never returned data."""
+    prices: pd.DataFrame
+    failed: Dict[str, str] = field(default_factory=dict)
+    attempts: int = 0
+
+
+class BatchDownloader(PriceDownloader):
+    """Splits a ticker universe into chunks fetched concurrently by a thread pool.
+
+    Each chunk is retried with exponential backoff; after a partial success only
+    the tickers that came back empty are retried. Every request (including
+    retries) first takes a token from the optional rate limiter. Chunk results
+    are merged on a date-aligned outer join in the requested ticker order, and
+    tickers still empty after the last attempt are reported in `failed`.
+    """
+
+    def __init__(self, downloader: PriceDownloader, chunk_size: int = 100, max_workers: int = 4,
+                 max_retries: int = 3, backoff: float = 1.0, max_backoff: float = 30.0,
+                 rate_limit: Optional[float] = None, burst: Optional[float] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        if chunk_size < 1 or max_workers < 1 or max_retries < 0:
+            raise ValueError("chunk_size and max_workers must be >= 1, max_retries >= 0.")
+        if burst is not None and burst < 1:
+            raise ValueError("burst must be >= 1, every request takes one token.")
+        self.downloader = downloader
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+        self.bucket = TokenBucket(rate_limit, burst, sleep=sleep) if rate_limit else None
+
+    @classmethod
+    def from_env(cls, downloader: PriceDownloader) -> Optional["BatchDownloader"]:
+        """Build from FINANCE_CREW_FETCH_CHUNK_SIZE, _WORKERS, _RETRIES and _RATE_LIMIT;
+        returns None when no chunk size is configured."""
+        chunk_size = os.getenv("FINANCE_CREW_FETCH_CHUNK_SIZE")
+        if not chunk_size:
+            return None
+        rate_limit = os.getenv("FINANCE_CREW_FETCH_RATE_LIMIT")
+        return cls(
+            downloader,
+            chunk_size=int(chunk_size),
+            max_workers=int(os.getenv("FINANCE_CREW_FETCH_WORKERS", "4")),
+            max_retries=int(os.getenv("FINANCE_CREW_FETCH_RETRIES", "3")),
+            rate_limit=float(rate_limit) if rate_limit else None,
+        )
+
+    def download(self, tickers: List[str], interval: str = "1d", period: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """PriceDownloader interface; failures are attached as prices.attrs['failed']."""
+        result = self.download_batch(tickers, interval=interval, period=period, start=start, end=end)
+        result.prices.attrs["failed"] = result.failed
+        return result.prices
+
+    def download_batch(self, tickers: List[str], interval: str = "1d", period: Optional[str] = None,
+                       start: Optional[str] = None, end: Optional[str] = None) -> BatchResult:
+        kwargs = {"interval": interval, "period": period, "start": start, "end": end}
+        tickers = list(dict.fromkeys(tickers))
+        chunks = [tickers[i:i + self.chunk_size] for i in range(0, len(tickers), self.chunk_size)]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(chunks)))) as pool:
+            outcomes = list(pool.map(lambda chunk: self._fetch_chunk(chunk, kwargs), chunks))
+
+        frames = [frame for frame, _, _ in outcomes if frame is not None and len(frame.columns)]
+        failed: Dict[str, str] = {}
+        attempts = 0
+        for _, chunk_failed, chunk_attempts in outcomes:
+            failed.update(chunk_failed)
+            attempts += chunk_attempts
+        if frames:
+            prices = pd.concat(frames, axis=1, join="outer").sort_index()
+            prices = prices[[t for t in tickers if t in prices.columns]]
+        else:
+            prices = pd.DataFrame(columns=[], dtype="float64")
+        return BatchResult(prices, {t: failed[t] for t in tickers if t in failed}, attempts)
+
+    def _fetch_chunk(self, chunk: List[str], kwargs: dict) -> Tuple[Optional[pd.DataFrame], Dict[str, str], int]:
+        pending = list(chunk)
+        parts: List[pd.DataFrame] = []
+        errors: Dict[str, str] = {}
+        attempt = 0
+        while pending and attempt <= self.max_retries:
+            if attempt:
+                self.sleep(min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+            attempt += 1
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                frame = self.downloader.download(pending, **kwargs)
+            except Exception as e:
+                errors = {t: f"{type(e).__name__}: {e}" for t in pending}
+                continue
+            got = [t for t in pending if t in frame.columns and frame[t].notna().any()]
+            if got:
+                parts.append(frame[got])
+            got_set = set(got)
+            pending = [t for t in pending if t not in got_set]
+            errors = {t: "No data returned." for t in pending}
+        merged = pd.concat(parts, axis=1, join="outer") if parts else None
+        return merged, {t: errors.get(t, "No data returned.") for t in pending}, attempt
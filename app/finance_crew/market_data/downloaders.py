@@ -0,0 +1,125 @@
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.finance_crew.profiling import tracer
+
+
+class PriceDownloader:
+    """Interface for price sources used by the fetch tool and the price cache.
+
+    download() returns close prices as a DataFrame indexed by timestamp with one
+    column per ticker (NaN for missing bars). Either period or start/end is
+    given; end is exclusive, dates are 'YYYY-MM-DD' strings.
+    """
+
+    def download(self, tickers: List[str], interval: str = "1d", period: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class YFinanceDownloader(PriceDownloader):
+    """Adjusted close prices from Yahoo Finance via yfinance."""
+
+    def download(self, tickers: List[str], interval: str = "1d", period: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        import yfinance as yf
+
+        with tracer.span("yf.download", "fetch", tickers=len(tickers), interval=interval):
+            data = yf.download(
+                tickers, period=period, start=start, end=end, interval=interval,
+                auto_adjust=True, progress=False, group_by="ticker"
+            )
+        if data is None or data.empty:
+            return pd.DataFrame(columns=tickers, dtype="float64")
+        if isinstance(data.columns, pd.MultiIndex):
+            level = 1 if "Close" in data.columns.get_level_values(1) else 0
+            prices = data.xs("Close", axis=1, level=level).copy()
+        else:
+            field = "Close" if "Close" in data else "Adj Close"
+            prices = data[field].to_frame(name=tickers[0])
+        prices.columns = [str(c) for c in prices.columns]
+        return prices
+
+
+class InMemoryDownloader(PriceDownloader):
+    """Serves slices of a fixed price frame; for tests and offline runs.
+
+    Every call is recorded in `calls` so callers can assert which ranges were
+    requested.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.sort_index()
+        self.calls: List[Dict] = []
+
+    def download(self, tickers: List[str], interval: str = "1d", period: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        self.calls.append({"tickers": list(tickers), "interval": interval,
+                           "period": period, "start": start, "end": end})
+        frame = self.frame
+        if period is not None and start is None:
+            begin = period_start(period, frame.index[-1]) if len(frame) else None
+            if begin is not None:
+                frame = frame[frame.index >= begin]
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start)]
+        if end is not None:
+            frame = frame[frame.index < pd.Timestamp(end)]
+        return frame[[t for t in tickers if t in frame.columns]].copy()
+
+
+_PERIOD_UNITS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+
+
+def period_start(period: str, today) -> Optional[pd.Timestamp]:
+    """First date covered by a yfinance-style period ('5d', '6mo', '1y', 'ytd', 'max')."""
+    today = pd.Timestamp(today).normalize()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1)
+    for suffix, unit in _PERIOD_UNITS.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return today - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period '{period}'.")
+
+
+class StubDownloader(InMemoryDownloader):
+    """InMemoryDownloader with injected latency and failures, for exercising retries.
+
+    latency is slept on every call, plus per_ticker_latency for each requested
+    ticker. A call raises with probability fail_rate (seeded), and also while
+    any requested ticker in `flaky` still has failures left. Tickers in `dead`
+    always come back as all-NaN columns, like unknown symbols on Yahoo.
+    """
+
+    def __init__(self, frame: pd.DataFrame, latency: float = 0.0, per_ticker_latency: float = 0.0,
+                 fail_rate: float = 0.0, flaky: Optional[Dict[str, int]] = None,
+                 dead: Optional[List[str]] = None, seed: int = 0):
+        super().__init__(frame)
+        self.latency = latency
+        self.per_ticker_latency = per_ticker_latency
+        self.fail_rate = fail_rate
+        self.flaky = dict(flaky or {})
+        self.dead = set(dead or [])
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def download(self, tickers: List[str], interval: str = "1d", period: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        time.sleep(self.latency + self.per_ticker_latency * len(tickers))
+        with self._lock:
+            flaky = [t for t in tickers if self.flaky.get(t, 0) > 0]
+            for t in flaky:
+                self.flaky[t] -= 1
+            unlucky = self._rng.random() < self.fail_rate
+        if flaky or unlucky:
+            raise ConnectionError(f"Injected failure for {len(tickers)} tickers.")
+        frame = super().download(tickers, interval=interval, period=period, start=start, end=end)
+        for t in self.dead & set(frame.columns):
+            frame[t] = float("nan")
+        return frame
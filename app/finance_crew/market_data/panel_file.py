@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .price_store import PricePanel
+
+# Index "format" tag of a panel file: a raw float64 matrix plus a JSON sidecar index.
+PANEL_FORMAT = "finance-crew-panel/1"
+_DTYPE = np.dtype("<f8")
+
+
+def _base(path: str) -> str:
+    base, ext = os.path.splitext(path)
+    return base if ext in (".f64", ".json") else path
+
+
+def _read_index(index_path: str) -> dict:
+    with open(index_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def panel_paths(path: str) -> Tuple[str, str]:
+    """(data file, index file) of the panel file at `path`, with or without its extension.
+
+    The data file is the one the index names; before the first write (or for an
+    index without a "data" entry) it is `<path>.f64`.
+    """
+    base = _base(path)
+    index_path = base + ".json"
+    try:
+        name = _read_index(index_path).get("data")
+    except (OSError, ValueError):
+        name = None
+    return (os.path.join(os.path.dirname(index_path), name) if name else base + ".f64"), index_path
+
+
+class PanelFileWriter:
+    """Builds a panel file from price frames added one ticker chunk at a time.
+
+    The data file holds the (dates x tickers) float64 matrix in column-major
+    order, so a column range is one contiguous read; the JSON index next to it
+    holds the dates, tickers, shape and content key. Each chunk is spilled to a
+    scratch directory until close(), which lays all of them out on the union of
+    their dates; only one chunk is ever in memory. Dates where every ticker of
+    a chunk is missing are dropped from that chunk. The data file is named after
+    the content key (`<path>.<key>.f64`) and the index, written last, names it:
+    replacing the index is the single commit point, so readers see the old panel
+    or the new one, never a partial one. The previous data file is removed after.
+    """
+
+    def __init__(self, path: str):
+        self._base = _base(path)
+        self.index_path = self._base + ".json"
+        directory = os.path.dirname(os.path.abspath(self.index_path))
+        os.makedirs(directory, exist_ok=True)
+        self._scratch: Optional[str] = tempfile.mkdtemp(prefix=".panel-", dir=directory)
+        self._chunks: List[Tuple[str, List[str], List[str]]] = []
+        self._tickers = set()
+
+    def add(self, frame) -> None:
+        """Append the columns of a DataFrame indexed by date with one column per ticker."""
+        if self._scratch is None:
+            raise ValueError("Panel file writer is closed.")
+        frame = frame.dropna(how="all")
+        tickers = [str(c) for c in frame.columns]
+        repeated = self._tickers.intersection(tickers)
+        if len(set(tickers)) < len(tickers):
+            repeated |= {t for t in set(tickers) if tickers.count(t) > 1}
+        if repeated:
+            raise ValueError(f"Tickers already in the panel file: {', '.join(sorted(repeated))}.")
+        self._tickers.update(tickers)
+        chunk = os.path.join(self._scratch, f"{len(self._chunks)}.npy")
+        np.save(chunk, np.asfortranarray(frame.to_numpy(dtype=np.float64, na_value=np.nan)))
+        self._chunks.append((chunk, [i.strftime("%Y-%m-%d") for i in frame.index], tickers))
+
+    def close(self) -> PricePanel:
+        """Write the data and index files and return the panel opened from them."""
+        if self._scratch is None:
+            raise ValueError("Panel file writer is closed.")
+        try:
+            dates = np.unique(np.array([d for _, chunk_dates, _ in self._chunks for d in chunk_dates], dtype=str))
+            tickers = [t for _, _, chunk_tickers in self._chunks for t in chunk_tickers]
+            key = hashlib.blake2b(digest_size=8)
+            key.update(json.dumps([dates.tolist(), tickers]).encode())
+            partial = os.path.join(self._scratch, "data.partial")
+            with open(partial, "wb") as out:
+                for chunk, chunk_dates, _ in self._chunks:
+                    values = np.load(chunk)
+                    block = np.full((len(dates), values.shape[1]), np.nan, dtype=_DTYPE, order="F")
+                    block[np.searchsorted(dates, chunk_dates)] = values
+                    data = memoryview(block.T)  # the column-major bytes, without a copy
+                    key.update(data)
+                    out.write(data)
+                    os.remove(chunk)
+            index = {
+                "format": PANEL_FORMAT,
+                "dtype": _DTYPE.str,
+                "order": "F",
+                "shape": [len(dates), len(tickers)],
+                "dates": dates.tolist(),
+                "tickers": tickers,
+                "key": key.hexdigest(),
+                "data": f"{os.path.basename(self._base)}.{key.hexdigest()}.f64",
+            }
+            previous, _ = panel_paths(self.index_path)
+            data_path = os.path.join(os.path.dirname(self.index_path), index["data"])
+            os.replace(partial, data_path)
+            try:
+                with open(os.path.join(self._scratch, "index.partial"), "w", encoding="utf-8") as f:
+                    json.dump(index, f)
+                os.replace(f.name, self.index_path)
+            except BaseException:
+                # The index still names the previous data file; the new one is unreferenced.
+                if os.path.abspath(previous) != os.path.abspath(data_path):
+                    os.remove(data_path)
+                raise
+        finally:
+            self.abort()
+        if os.path.abspath(previous) != os.path.abspath(data_path):
+            try:
+                os.remove(previous)
+            except OSError:
+                pass
+        return open_panel_file(self.index_path)
+
+    def abort(self) -> None:
+        """Drop everything added so far; the panel file on disk, if any, is left as it was."""
+        if self._scratch is not None:
+            shutil.rmtree(self._scratch, ignore_errors=True)
+            self._scratch = None
+
+    def __enter__(self) -> "PanelFileWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def open_panel_file(path: str) -> PricePanel:
+    """A PricePanel whose values are a read-only memory map of the panel file.
+
+    Nothing is read until a tool touches the prices; per-ticker analytics read
+    the file in column blocks (see analytics.stream_columns), so panels larger
+    than RAM work. The panel key comes from the index instead of hashing the data.
+    """
+    index_path = _base(path) + ".json"
+    for attempt in range(2):
+        index = _read_index(index_path)
+        if index.get("format") != PANEL_FORMAT or index.get("dtype") != _DTYPE.str or index.get("order") != "F":
+            raise ValueError(f"{index_path} is not a {PANEL_FORMAT} index.")
+        data_path = os.path.join(os.path.dirname(index_path), index["data"]) if "data" in index \
+            else _base(path) + ".f64"
+        shape = tuple(index["shape"])
+        expected = shape[0] * shape[1] * _DTYPE.itemsize
+        try:
+            size = os.path.getsize(data_path)
+            if size != expected:
+                raise ValueError(f"{data_path} holds {size} bytes, expected {expected} for shape {list(shape)}.")
+            if expected:
+                values = np.memmap(data_path, dtype=_DTYPE, mode="r", shape=shape, order="F")
+            else:
+                values = np.empty(shape, dtype=_DTYPE)
+            break
+        except FileNotFoundError:
+            # A writer committed a new index and removed this data file since we read the index.
+            if attempt:
+                raise
+    panel = PricePanel(values, index["dates"], index["tickers"])
+    panel._key.append(index["key"])
+    return panel
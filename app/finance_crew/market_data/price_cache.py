@@ -0,0 +1,288 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .downloaders import PriceDownloader, YFinanceDownloader, period_start
+
+# covered_from value for a ticker whose full ("max") history has been fetched.
+EARLIEST = "0001-01-01"
+_INTRADAY_SUFFIXES = ("m", "h")
+_SQL_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    date TEXT NOT NULL,
+    close REAL NOT NULL,
+    PRIMARY KEY (ticker, interval, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    covered_from TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (ticker, interval)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class CacheResult:
+    """Prices served by the cache plus what happened for each ticker.
+
+    status values: 'hit' (served from disk), 'refreshed' (missing range fetched
+    and merged), 'fetched' (first download), 'stale' (older than the TTL but
+    could not be refreshed: offline or download failed), 'missing' (nothing cached).
+    """
+    prices: pd.DataFrame
+    status: Dict[str, str]
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+def _is_intraday(interval: str) -> bool:
+    return interval.endswith(_INTRADAY_SUFFIXES) and not interval.endswith("mo")
+
+
+def _date_keys(index: pd.Index, interval: str) -> List[str]:
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    fmt = "%Y-%m-%d %H:%M:%S" if _is_intraday(interval) else "%Y-%m-%d"
+    return [i.strftime(fmt) for i in index]
+
+
+class PriceCache:
+    """SQLite-backed close price cache keyed by (ticker, interval).
+
+    get_prices() only downloads what the cache does not cover yet: history
+    older than the oldest fetched range, and new bars once a ticker's last
+    refresh is older than `ttl`. A refresh starts at the bar before the last
+    cached one: the last bar gets overwritten (it may have been partial) and
+    the one before is the anchor. Closes are split and dividend adjusted, so
+    when the provider's anchor close differs from the cached one the history
+    was re-adjusted since it was cached, and the ticker's whole covered range
+    is fetched again rather than mixing two adjustment bases. In offline mode
+    the downloader is never called and whatever is on disk is served.
+    """
+
+    def __init__(self, path: str, downloader: Optional[PriceDownloader] = None,
+                 ttl: timedelta = timedelta(hours=12), offline: bool = False,
+                 clock: Callable[[], datetime] = datetime.now):
+        self.path = path
+        self.downloader = downloader or YFinanceDownloader()
+        self.ttl = ttl
+        self.offline = offline
+        self.clock = clock
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls, downloader: Optional[PriceDownloader] = None) -> Optional["PriceCache"]:
+        """Build a cache from FINANCE_CREW_PRICE_CACHE (path), FINANCE_CREW_PRICE_CACHE_TTL_HOURS
+        and FINANCE_CREW_OFFLINE; returns None when no cache path is configured."""
+        path = os.getenv("FINANCE_CREW_PRICE_CACHE")
+        if not path:
+            return None
+        ttl = timedelta(hours=float(os.getenv("FINANCE_CREW_PRICE_CACHE_TTL_HOURS", "12")))
+        offline = os.getenv("FINANCE_CREW_OFFLINE", "").lower() in ("1", "true", "yes")
+        return cls(path, downloader=downloader, ttl=ttl, offline=offline)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_prices(self, tickers: List[str], period: str = "1y", interval: str = "1d") -> CacheResult:
+        now = self.clock()
+        begin = period_start(period, now)
+        begin_key = EARLIEST if begin is None else begin.strftime("%Y-%m-%d")
+        coverage = self._coverage(tickers, interval)
+
+        status: Dict[str, str] = {}
+        failed: Dict[str, str] = {}
+        heads: Dict[Tuple[str, Optional[str]], List[str]] = {}
+        tails: Dict[str, str] = {}
+        for t in tickers:
+            cov = coverage.get(t)
+            if cov is None:
+                status[t] = "missing" if self.offline else "fetched"
+                if not self.offline:
+                    heads.setdefault((begin_key, None), []).append(t)
+                continue
+            covered_from, fetched_at, last_bar, anchor = cov
+            stale = now.timestamp() - fetched_at > self.ttl.total_seconds()
+            if self.offline:
+                status[t] = "stale" if stale else "hit"
+                continue
+            status[t] = "hit"
+            if last_bar is None and stale:
+                heads.setdefault((begin_key, None), []).append(t)
+                status[t] = "refreshed"
+                continue
+            if begin_key < covered_from:
+                heads.setdefault((begin_key, covered_from), []).append(t)
+                status[t] = "refreshed"
+            if stale:
+                tails[t] = anchor or last_bar
+                status[t] = "refreshed"
+
+        for (start, end), group in heads.items():
+            self._fetch(group, interval, start, end, begin_key, now, failed,
+                        mark_fresh=end is None, period=period if start == EARLIEST else None)
+        if tails:
+            self._refresh_tails(tails, coverage, interval, now, failed)
+        for t in failed:
+            status[t] = "stale" if t in coverage else "missing"
+
+        return CacheResult(self._read(tickers, interval, begin_key), status, failed)
+
+    def _fetch(self, tickers: List[str], interval: str, start: str, end: Optional[str],
+               covered_from: Optional[str], now: datetime, failed: Dict[str, str],
+               mark_fresh: bool, period: Optional[str] = None, replace: bool = False) -> None:
+        try:
+            if period is not None:
+                frame = self.downloader.download(tickers, interval=interval, period=period)
+            else:
+                frame = self.downloader.download(tickers, interval=interval, start=start, end=end)
+        except Exception as e:
+            for t in tickers:
+                failed[t] = f"{type(e).__name__}: {e}"
+            return
+        partial = frame.attrs.get("failed", {})
+        failed.update(partial)
+        stored = [t for t in tickers if t not in partial]
+        self._store(frame, stored, interval, covered_from, now if mark_fresh else None, replace=replace)
+
+    def _refresh_tails(self, anchors: Dict[str, str], coverage: Dict[str, tuple], interval: str,
+                       now: datetime, failed: Dict[str, str]) -> None:
+        """Fetch new bars from each ticker's anchor bar; a ticker whose anchor close changed
+        is re-adjusted history, so its covered range is fetched again and replaces its bars."""
+        tickers = list(anchors)
+        try:
+            frame = self.downloader.download(tickers, interval=interval,
+                                             start=min(a[:10] for a in anchors.values()), end=None)
+        except Exception as e:
+            for t in tickers:
+                failed[t] = f"{type(e).__name__}: {e}"
+            return
+        partial = frame.attrs.get("failed", {})
+        failed.update(partial)
+        fetched = [t for t in tickers if t not in partial]
+        cached = self._closes({t: anchors[t] for t in fetched}, interval)
+        rows = {k: i for i, k in enumerate(_date_keys(frame.index, interval))}
+        rebased: Dict[str, List[str]] = {}
+        for t in fetched:
+            i = rows.get(anchors[t])
+            if t not in cached or i is None or t not in frame.columns:
+                continue
+            new = float(frame[t].iloc[i])
+            if np.isfinite(new) and not np.isclose(new, cached[t], rtol=1e-6, atol=0.0):
+                rebased.setdefault(coverage[t][0], []).append(t)
+        moved = {t for group in rebased.values() for t in group}
+        self._store(frame, [t for t in fetched if t not in moved], interval, None, now)
+        for covered_from, group in rebased.items():
+            self._fetch(group, interval, covered_from, None, covered_from, now, failed, mark_fresh=True,
+                        period="max" if covered_from == EARLIEST else None, replace=True)
+
+    def _closes(self, bars: Dict[str, str], interval: str) -> Dict[str, float]:
+        """Cached close of each ticker at the given bar date key, where there is one."""
+        out = {}
+        with self._connect() as conn:
+            for t, date in bars.items():
+                row = conn.execute("SELECT close FROM bars WHERE ticker = ? AND interval = ? AND date = ?",
+                                   (t, interval, date)).fetchone()
+                if row is not None:
+                    out[t] = row[0]
+        return out
+
+    def _store(self, frame: pd.DataFrame, tickers: List[str], interval: str,
+               covered_from: Optional[str], fetched_at: Optional[datetime], replace: bool = False) -> None:
+        keys = _date_keys(frame.index, interval)
+        rows = []
+        for t in tickers:
+            if t not in frame.columns:
+                continue
+            col = frame[t].to_numpy(dtype=np.float64, na_value=np.nan)
+            ok = np.isfinite(col)
+            rows.extend((t, interval, keys[i], float(col[i])) for i in np.flatnonzero(ok))
+        with self._connect() as conn:
+            if replace:
+                # Same transaction as the insert: readers never see the ticker without bars.
+                for i in range(0, len(tickers), _SQL_BATCH):
+                    batch = tickers[i:i + _SQL_BATCH]
+                    conn.execute(f"DELETE FROM bars WHERE interval = ? AND ticker IN ({','.join('?' * len(batch))})",
+                                 [interval, *batch])
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?)", rows)
+            for t in tickers:
+                conn.execute(
+                    "INSERT INTO coverage VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (ticker, interval) DO UPDATE SET "
+                    "covered_from = MIN(covered_from, excluded.covered_from), "
+                    "fetched_at = MAX(fetched_at, excluded.fetched_at)",
+                    (t, interval, covered_from or "9999-12-31",
+                     fetched_at.timestamp() if fetched_at else 0.0),
+                )
+
+    def _coverage(self, tickers: List[str], interval: str
+                  ) -> Dict[str, Tuple[str, float, Optional[str], Optional[str]]]:
+        """(covered_from, fetched_at, last bar, bar before the last) of every cached ticker."""
+        out = {}
+        with self._connect() as conn:
+            for i in range(0, len(tickers), _SQL_BATCH):
+                batch = tickers[i:i + _SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    "SELECT c.ticker, c.covered_from, c.fetched_at, "
+                    "(SELECT MAX(b.date) FROM bars b WHERE b.ticker = c.ticker AND b.interval = c.interval), "
+                    "(SELECT b.date FROM bars b WHERE b.ticker = c.ticker AND b.interval = c.interval "
+                    " ORDER BY b.date DESC LIMIT 1 OFFSET 1) "
+                    f"FROM coverage c WHERE c.interval = ? AND c.ticker IN ({marks})",
+                    [interval, *batch],
+                ).fetchall()
+                out.update({r[0]: (r[1], r[2], r[3], r[4]) for r in rows})
+        return out
+
+    def _read(self, tickers: List[str], interval: str, begin_key: str) -> pd.DataFrame:
+        rows = []
+        with self._connect() as conn:
+            for i in range(0, len(tickers), _SQL_BATCH):
+                batch = tickers[i:i + _SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows.extend(conn.execute(
+                    f"SELECT ticker, date, close FROM bars WHERE interval = ? AND date >= ? AND ticker IN ({marks})",
+                    [interval, begin_key, *batch],
+                ).fetchall())
+        if not rows:
+            return pd.DataFrame(columns=tickers, dtype="float64")
+        long = pd.DataFrame(rows, columns=["ticker", "date", "close"])
+        wide = long.pivot(index="date", columns="ticker", values="close")
+        wide.index = pd.to_datetime(wide.index)
+        wide.columns.name = None
+        return wide.reindex(columns=tickers).sort_index()
+
+    def invalidate(self, tickers: Optional[List[str]] = None, interval: Optional[str] = None) -> None:
+        """Drop cached bars and coverage, for all tickers or the given ones."""
+        clauses, params = [], []
+        if tickers is not None:
+            clauses.append(f"ticker IN ({','.join('?' * len(tickers))})")
+            params.extend(tickers)
+        if interval is not None:
+            clauses.append("interval = ?")
+            params.append(interval)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM bars" + where, params)
+            conn.execute("DELETE FROM coverage" + where, params)
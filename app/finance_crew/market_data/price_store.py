@@ -0,0 +1,217 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.finance_crew.profiling import tracer
+
+from .wire import is_binary, panel_from_binary, panel_to_binary
+
+HANDLE_PREFIX = "px:"
+
+
+class PricesPayloadError(ValueError):
+    """Raised when a prices payload is flagged not ok or a handle cannot be resolved."""
+
+
+@dataclass(frozen=True, eq=False)
+class PricePanel:
+    """Close prices as a float64 (dates x tickers) matrix; NaN marks a missing bar."""
+    values: np.ndarray
+    dates: Tuple[str, ...]
+    tickers: Tuple[str, ...]
+    _positions: Dict[str, int] = field(init=False, repr=False)
+    _key: List[str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        values = np.asarray(self.values, dtype=np.float64)
+        if values.ndim != 2:
+            raise ValueError(f"Price matrix must be 2-D, got shape {values.shape}.")
+        if values.shape != (len(self.dates), len(self.tickers)):
+            raise ValueError(
+                f"Price matrix shape {values.shape} does not match "
+                f"{len(self.dates)} dates x {len(self.tickers)} tickers."
+            )
+        values.setflags(write=False)
+        object.__setattr__(self, "values", values)
+        object.__setattr__(self, "dates", tuple(self.dates))
+        object.__setattr__(self, "tickers", tuple(self.tickers))
+        object.__setattr__(self, "_positions", {t: j for j, t in enumerate(self.tickers)})
+        object.__setattr__(self, "_key", [])
+
+    @classmethod
+    def from_frame(cls, frame) -> "PricePanel":
+        """Build a panel from a DataFrame indexed by date with one column per ticker."""
+        dates = [i.strftime("%Y-%m-%d") for i in frame.index]
+        return cls(frame.to_numpy(dtype=np.float64, na_value=np.nan), dates, [str(c) for c in frame.columns])
+
+    @classmethod
+    def from_payload(cls, obj: dict) -> "PricePanel":
+        """Build a panel from the legacy {'index': [...], 'data': {ticker: [...]}} payload
+        or its binary ('format': 'npb64') counterpart."""
+        if is_binary(obj):
+            dates, tickers, values = panel_from_binary(obj)
+            return cls(values, dates, tickers)
+        dates = obj.get("index", [])
+        data = obj.get("data", {})
+        if not isinstance(data, dict):
+            raise ValueError("Invalid prices_json structure.")
+        tickers = list(data.keys())
+        values = np.empty((len(dates), len(tickers)), dtype=np.float64)
+        for j, t in enumerate(tickers):
+            series = data[t]
+            if len(series) != len(dates):
+                raise ValueError(f"Series for '{t}' has {len(series)} points, expected {len(dates)}.")
+            values[:, j] = np.array(series, dtype=np.float64)
+        return cls(values, dates, tickers)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def n_dates(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def n_tickers(self) -> int:
+        return self.values.shape[1]
+
+    @property
+    def key(self) -> str:
+        """Content hash of the panel; identical panels share a key (and a store handle)."""
+        if not self._key:
+            h = hashlib.blake2b(digest_size=8)
+            h.update(json.dumps([self.dates, self.tickers]).encode())
+            h.update(np.ascontiguousarray(self.values).tobytes())
+            self._key.append(h.hexdigest())
+        return self._key[0]
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._positions
+
+    def position(self, ticker: str) -> int:
+        return self._positions[ticker]
+
+    def column(self, ticker: str) -> np.ndarray:
+        """Zero-copy, read-only view of one ticker's price series."""
+        return self.values[:, self._positions[ticker]]
+
+    def select(self, tickers: Sequence[str]) -> "PricePanel":
+        """Sub-panel restricted to the given tickers, in the given order."""
+        idx = [self._positions[t] for t in tickers]
+        return PricePanel(self.values[:, idx], self.dates, list(tickers))
+
+    def series(self, ticker: str) -> List[Optional[float]]:
+        """Price series as a Python list with None for gaps (legacy list-based code paths)."""
+        col = self.column(ticker)
+        return [None if v != v else v for v in col.tolist()]
+
+    def to_payload(self) -> dict:
+        """Legacy JSON payload, identical to what fetch_yfinance_prices returns inline."""
+        return {
+            "ok": True,
+            "index": list(self.dates),
+            "data": {t: self.series(t) for t in self.tickers},
+        }
+
+    def to_binary_payload(self) -> dict:
+        """Same content as to_payload() with the price matrix as one base64 float64 buffer."""
+        return panel_to_binary(self.dates, self.tickers, self.values)
+
+
+class PriceStore:
+    """Thread-safe, in-process registry of price panels addressed by short handles.
+
+    Handles are derived from the panel content, so storing the same panel twice
+    returns the same handle. The least recently used panel is evicted once
+    max_panels is exceeded.
+    """
+
+    def __init__(self, max_panels: int = 64):
+        self.max_panels = max_panels
+        self._panels: "OrderedDict[str, PricePanel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, panel: PricePanel) -> str:
+        handle = HANDLE_PREFIX + panel.key
+        with self._lock:
+            self._panels[handle] = panel
+            self._panels.move_to_end(handle)
+            while len(self._panels) > self.max_panels:
+                self._panels.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> PricePanel:
+        with self._lock:
+            panel = self._panels.get(handle)
+            if panel is None:
+                raise PricesPayloadError(f"Unknown or expired price handle '{handle}'.")
+            self._panels.move_to_end(handle)
+            return panel
+
+    def drop(self, handle: str) -> None:
+        with self._lock:
+            self._panels.pop(handle, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._panels.clear()
+
+    def handles(self) -> Iterable[str]:
+        with self._lock:
+            return list(self._panels.keys())
+
+    def __contains__(self, handle: str) -> bool:
+        with self._lock:
+            return handle in self._panels
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._panels)
+
+
+price_store = PriceStore()
+
+
+def handle_payload(handle: str, panel: PricePanel) -> dict:
+    """Small JSON-able descriptor returned to agents instead of the full price payload."""
+    return {
+        "ok": True,
+        "handle": handle,
+        "tickers": list(panel.tickers),
+        "start": panel.dates[0] if panel.dates else None,
+        "end": panel.dates[-1] if panel.dates else None,
+        "n_dates": panel.n_dates,
+    }
+
+
+def load_price_panel(prices_json: str, store: Optional[PriceStore] = None) -> PricePanel:
+    """Resolve a prices input to a PricePanel.
+
+    Accepts a bare handle ('px:...'), a handle descriptor ({'ok': true, 'handle': ...}),
+    the legacy inline payload with 'index' and 'data', or the binary payload. A
+    descriptor of a panel file ('path') is reopened from disk if its handle is not
+    in the store (e.g. in another process).
+    """
+    store = store or price_store
+    text = prices_json.strip()
+    if text.startswith(HANDLE_PREFIX):
+        return store.get(text)
+    with tracer.span("load_price_panel", "parse") as span:
+        if span is not None:
+            span.bytes_in = len(text)
+        obj = json.loads(text)
+        if not obj.get("ok", False):
+            raise PricesPayloadError(obj.get("error", "prices_json not ok"))
+        if "data" not in obj and "values" not in obj and "handle" in obj:
+            if obj["handle"] not in store and "path" in obj:
+                from .panel_file import open_panel_file
+
+                store.put(open_panel_file(obj["path"]))
+            return store.get(obj["handle"])
+        return PricePanel.from_payload(obj)
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .batch_download import BatchDownloader
+from .downloaders import PriceDownloader, YFinanceDownloader
+from .panel_file import PanelFileWriter
+from .price_cache import PriceCache
+from .price_store import PricePanel
+
+
+@dataclass
+class FetchResult:
+    """Fetched panel, tickers that failed, and per-ticker cache status when a cache was used."""
+    panel: PricePanel
+    failed: Dict[str, str]
+    cache_status: Optional[Dict[str, str]] = None
+
+
+def default_downloader() -> PriceDownloader:
+    """yfinance, batched when FINANCE_CREW_FETCH_CHUNK_SIZE is set."""
+    return BatchDownloader.from_env(YFinanceDownloader()) or YFinanceDownloader()
+
+
+def fetch_price_panel(tickers: List[str], period: str = "1y", interval: str = "1d",
+                      downloader: Optional[PriceDownloader] = None,
+                      price_cache: Optional[PriceCache] = None) -> FetchResult:
+    """Fetch closes for the tickers, through the cache when one is given.
+
+    Dates where every ticker is missing are dropped.
+    """
+    cache_status = None
+    if price_cache is not None:
+        cached = price_cache.get_prices(tickers, period=period, interval=interval)
+        prices, failed, cache_status = cached.prices, cached.failed, cached.status
+    else:
+        prices = (downloader or default_downloader()).download(tickers, interval=interval, period=period)
+        failed = prices.attrs.get("failed", {})
+    prices = prices.dropna(how="all").sort_index()
+    return FetchResult(PricePanel.from_frame(prices), dict(failed), cache_status)
+
+
+def fetch_panel_file(tickers: List[str], path: str, period: str = "1y", interval: str = "1d",
+                     downloader: Optional[PriceDownloader] = None,
+                     price_cache: Optional[PriceCache] = None, chunk_size: int = 500) -> FetchResult:
+    """fetch_price_panel into a memory-mapped panel file at `path`, chunk_size tickers at a time.
+
+    Only one chunk of prices is in memory at once, so the universe can be larger
+    than RAM. The returned panel is backed by the file (see open_panel_file).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    failed: Dict[str, str] = {}
+    cache_status: Optional[Dict[str, str]] = {} if price_cache is not None else None
+    chunk_size = max(chunk_size, 1)
+    writer = PanelFileWriter(path)
+    try:
+        for start in range(0, len(tickers), chunk_size):
+            chunk = tickers[start:start + chunk_size]
+            if price_cache is not None:
+                cached = price_cache.get_prices(chunk, period=period, interval=interval)
+                prices, chunk_failed = cached.prices, cached.failed
+                cache_status.update(cached.status)
+            else:
+                prices = (downloader or default_downloader()).download(chunk, interval=interval, period=period)
+                chunk_failed = prices.attrs.get("failed", {})
+            failed.update(chunk_failed)
+            writer.add(prices.sort_index())
+    except BaseException:
+        writer.abort()
+        raise
+    return FetchResult(writer.close(), failed, cache_status)
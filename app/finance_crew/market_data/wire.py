@@ -0,0 +1,77 @@
+import base64
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Payload "format" tag for base64-encoded little-endian float64 buffers.
+BINARY_FORMAT = "npb64"
+_DTYPE = np.dtype("<f8")
+
+
+def encode_array(values: np.ndarray) -> str:
+    """Base64 of an array's little-endian float64 buffer in C order; NaN is kept as-is."""
+    return base64.b64encode(np.ascontiguousarray(values, dtype=_DTYPE).tobytes()).decode("ascii")
+
+
+def decode_array(text: str, shape: Optional[Sequence[int]] = None) -> np.ndarray:
+    """Inverse of encode_array (1-D without a shape); the result is a read-only view of the decoded bytes."""
+    values = np.frombuffer(base64.b64decode(text), dtype=_DTYPE)
+    if shape is None:
+        return values
+    expected = int(np.prod(shape))
+    if values.size != expected:
+        raise ValueError(f"Binary buffer holds {values.size} values, expected {expected} for shape {list(shape)}.")
+    return values.reshape(shape)
+
+
+def is_binary(obj: dict) -> bool:
+    return obj.get("format") == BINARY_FORMAT
+
+
+def panel_to_binary(dates: Sequence[str], tickers: Sequence[str], values: np.ndarray) -> dict:
+    """Prices payload with the (dates x tickers) matrix as one base64 float64 buffer."""
+    return {
+        "ok": True,
+        "format": BINARY_FORMAT,
+        "index": list(dates),
+        "tickers": list(tickers),
+        "shape": [len(dates), len(tickers)],
+        "values": encode_array(values),
+    }
+
+
+def panel_from_binary(obj: dict) -> Tuple[List[str], List[str], np.ndarray]:
+    """(dates, tickers, values) from a payload built by panel_to_binary."""
+    dates, tickers = obj.get("index", []), obj.get("tickers", [])
+    return dates, tickers, decode_array(obj["values"], (len(dates), len(tickers)))
+
+
+def returns_payload(dates: Sequence[str], rets: np.ndarray, curve: np.ndarray,
+                    output_format: str = "json") -> dict:
+    """build_portfolio_returns output, inline JSON lists (rounded to 1e-10) or binary buffers."""
+    if output_format == "binary":
+        return {
+            "ok": True,
+            "format": BINARY_FORMAT,
+            "index": list(dates),
+            "portfolio_returns": encode_array(rets),
+            "portfolio_curve": encode_array(curve),
+        }
+    return {
+        "ok": True,
+        "index": list(dates),
+        "portfolio_returns": [round(x, 10) for x in rets.tolist()],
+        "portfolio_curve": [round(x, 10) for x in curve.tolist()],
+    }
+
+
+def load_returns(obj: dict) -> Tuple[List[str], np.ndarray, Optional[np.ndarray]]:
+    """(dates, returns, curve or None) from either build_portfolio_returns payload format."""
+    dates = obj.get("index", [])
+    if is_binary(obj):
+        rets = decode_array(obj.get("portfolio_returns", ""), (len(dates),) if dates else None)
+        curve = obj.get("portfolio_curve")
+        return dates, rets, decode_array(curve, rets.shape) if curve else None
+    rets = np.array([float(x) for x in obj.get("portfolio_returns", [])], dtype=np.float64)
+    curve = obj.get("portfolio_curve")
+    return dates, rets, np.array(curve, dtype=np.float64) if curve else None
@@ -0,0 +1,18 @@
+from .batch import asset_map_from, pivot_weights, read_portfolio_book, run_batch
+from .dag import Dag, DagRun, Node, NodeTiming, PipelineError
+from .fast_path import build_quant_dag, execute_quant_pipeline, run_quant_pipeline
+
+__all__ = [
+    "Dag",
+    "DagRun",
+    "Node",
+    "NodeTiming",
+    "PipelineError",
+    "asset_map_from",
+    "build_quant_dag",
+    "execute_quant_pipeline",
+    "pivot_weights",
+    "read_portfolio_book",
+    "run_batch",
+    "run_quant_pipeline",
+]
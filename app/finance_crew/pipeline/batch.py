@@ -0,0 +1,127 @@
+from statistics import NormalDist
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.finance_crew.analytics import (
+    beta_correlation,
+    normalize_weights,
+    portfolio_returns,
+    scenario_var,
+    simple_returns,
+    var_cvar,
+)
+from app.finance_crew.market_data import PricePanel
+
+TRADING_DAYS = 252.0
+
+
+def read_portfolio_book(path: str) -> pd.DataFrame:
+    """Read a long CSV of holdings: portfolio_id, ticker, weight and optionally
+    asset_class and target_weight."""
+    long = pd.read_csv(path, dtype={"portfolio_id": str, "ticker": str, "asset_class": str})
+    long["ticker"] = long["ticker"].str.strip()
+    return long
+
+
+def pivot_weights(long: pd.DataFrame, value: str = "weight") -> pd.DataFrame:
+    """portfolios x tickers matrix of one value column of a portfolio book (0.0 when not held)."""
+    matrix = long.pivot_table(index="portfolio_id", columns="ticker", values=value,
+                              aggfunc="sum", fill_value=0.0)
+    matrix.columns.name = None
+    return matrix.astype(np.float64)
+
+
+def asset_map_from(frame: pd.DataFrame) -> dict:
+    """{ticker: asset_class} from any frame with ticker and asset_class columns."""
+    frame = frame[["ticker", "asset_class"]].dropna().drop_duplicates("ticker")
+    return dict(zip(frame["ticker"].str.strip(), frame["asset_class"].str.strip()))
+
+
+def run_batch(weights: pd.DataFrame, panel: PricePanel, asset_map: Optional[Mapping[str, str]] = None,
+              targets: Optional[pd.DataFrame] = None, benchmark: Optional[str] = None,
+              var_conf: float = 0.95, chunk_size: int = 1000, mc_method: Optional[str] = None,
+              n_scenarios: int = 10_000, seed: int = 0) -> pd.DataFrame:
+    """Risk metrics for every row of a portfolios x tickers weight matrix in one vectorized pass.
+
+    Uses the same rules as the single-portfolio tools: returns use weights
+    rescaled to 1.0 when their sum is outside [0.98, 1.02], a day with a
+    missing return on any held ticker counts as 0.0, HHI and exposures use the
+    raw weights, and portfolio beta is the weight-averaged ticker beta.
+    Portfolios are processed `chunk_size` at a time to bound memory.
+
+    Historical VaR/CVaR are always computed; mc_method ('normal' or
+    'bootstrap') adds Monte Carlo VaR/CVaR from n_scenarios draws. Every chunk
+    reuses the same seed, so all portfolios are valued on the same scenarios.
+    """
+    tickers = list(weights.columns)
+    raw = weights.to_numpy(dtype=np.float64)
+    priced_idx = [i for i, t in enumerate(tickers) if t in panel]
+    priced = [tickers[i] for i in priced_idx]
+
+    rets = simple_returns(panel.select(priced).values)
+    z = abs(NormalDist().inv_cdf(1 - var_conf))
+    out = pd.DataFrame(index=weights.index)
+    out.index.name = weights.index.name or "portfolio_id"
+    out["n_positions"] = (raw != 0).sum(axis=1)
+    out["weights_sum"] = raw.sum(axis=1)
+
+    names = ["ann_vol", "max_drawdown", "var_daily", "hist_var_daily", "hist_cvar_daily"]
+    if mc_method is not None:
+        names += ["mc_var_daily", "mc_cvar_daily"]
+    stats = {k: np.full(len(raw), np.nan) for k in names}
+    for lo in range(0, len(raw), chunk_size):
+        w = raw[lo:lo + chunk_size][:, priced_idx]
+        wn = normalize_weights(w)
+        held = w != 0
+        port, curve = portfolio_returns(rets, np.nan_to_num(wn), held)
+        if len(port) == 0:
+            continue
+        mu = port.mean(axis=0)
+        std = port.std(axis=0, ddof=1) if len(port) > 1 else np.zeros(port.shape[1])
+        peaks = np.maximum.accumulate(np.vstack([np.full(curve.shape[1], -1e18), curve]), axis=0)[1:]
+        valid = held.any(axis=1) & np.isfinite(wn).all(axis=1)
+        stats["ann_vol"][lo:lo + len(w)] = np.where(valid, std * np.sqrt(TRADING_DAYS), np.nan)
+        stats["max_drawdown"][lo:lo + len(w)] = np.where(valid, np.minimum((curve / peaks - 1.0).min(axis=0), 0.0), np.nan)
+        stats["var_daily"][lo:lo + len(w)] = np.where(valid, mu - z * std, np.nan)
+        hist_var, hist_cvar = var_cvar(port, var_conf)
+        stats["hist_var_daily"][lo:lo + len(w)] = np.where(valid, hist_var, np.nan)
+        stats["hist_cvar_daily"][lo:lo + len(w)] = np.where(valid, hist_cvar, np.nan)
+        if mc_method is not None and len(port) > 1:
+            mc_var, mc_cvar, _ = scenario_var(rets, np.nan_to_num(wn), conf=var_conf, method=mc_method,
+                                              n_scenarios=n_scenarios, seed=seed)
+            stats["mc_var_daily"][lo:lo + len(w)] = np.where(valid, mc_var, np.nan)
+            stats["mc_cvar_daily"][lo:lo + len(w)] = np.where(valid, mc_cvar, np.nan)
+    out["ann_vol"] = stats["ann_vol"]
+    out["max_drawdown"] = stats["max_drawdown"]
+    out["var_daily"] = stats["var_daily"]
+    out["var_annual"] = stats["var_daily"] * np.sqrt(TRADING_DAYS)
+    for name in names[3:]:
+        out[name] = stats[name]
+    out["hhi"] = (raw ** 2).sum(axis=1)
+
+    if benchmark is not None and benchmark in panel:
+        bench = simple_returns(panel.column(benchmark)[:, None])[:, 0]
+        beta, _, _ = beta_correlation(rets, bench)
+        has_beta = ~np.isnan(beta) & (np.array(priced) != benchmark)
+        w = raw[:, priced_idx]
+        wsum = w[:, has_beta].sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["beta"] = np.where(wsum > 0, w[:, has_beta] @ beta[has_beta] / wsum, np.nan)
+
+    if asset_map is not None:
+        classes = sorted({asset_map.get(t, "unknown") for t in tickers})
+        class_pos = {c: j for j, c in enumerate(classes)}
+        onehot = np.zeros((len(tickers), len(classes)))
+        for i, t in enumerate(tickers):
+            onehot[i, class_pos[asset_map.get(t, "unknown")]] = 1.0
+        current = raw @ onehot
+        for j, cls in enumerate(classes):
+            out[f"exposure_{cls}"] = current[:, j]
+        if targets is not None:
+            target = targets.reindex(index=weights.index, columns=tickers, fill_value=0.0).to_numpy() @ onehot
+            for j, cls in enumerate(classes):
+                out[f"target_{cls}"] = target[:, j]
+                out[f"delta_{cls}"] = current[:, j] - target[:, j]
+    return out
@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.finance_crew.profiling import tracer
+
+
+class PipelineError(RuntimeError):
+    """Raised when a pipeline node fails; carries the node name."""
+
+    def __init__(self, node: str, message: str):
+        super().__init__(f"{node}: {message}")
+        self.node = node
+
+
+@dataclass(frozen=True)
+class Node:
+    """One pipeline step: fn is called with the results of `deps`, in order."""
+    name: str
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class NodeTiming:
+    """Start/end of a node relative to the start of the run, in seconds."""
+    start: float
+    end: float
+    worker: str
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class DagRun:
+    """Results of every node (and the inputs) plus per-node timing."""
+    results: Dict[str, Any]
+    timings: Dict[str, NodeTiming] = field(default_factory=dict)
+    wall: float = 0.0
+    deps: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """Chain of dependent nodes with the largest total duration."""
+        finish: Dict[str, float] = {}
+        parent: Dict[str, Optional[str]] = {}
+        for name in sorted(self.timings, key=lambda n: self.timings[n].end):
+            prior = [d for d in self.deps.get(name, ()) if d in finish]
+            best = max(prior, key=lambda d: finish[d], default=None)
+            finish[name] = self.timings[name].duration + (finish[best] if best else 0.0)
+            parent[name] = best
+        if not finish:
+            return [], 0.0
+        node: Optional[str] = max(finish, key=finish.get)
+        total = finish[node]
+        path = []
+        while node is not None:
+            path.append(node)
+            node = parent[node]
+        return path[::-1], total
+
+    def timing_report(self) -> dict:
+        path, total = self.critical_path()
+        return {
+            "wall_ms": round(self.wall * 1000, 3),
+            "nodes": {n: {"start_ms": round(t.start * 1000, 3), "duration_ms": round(t.duration * 1000, 3),
+                          "worker": t.worker} for n, t in self.timings.items()},
+            "critical_path": path,
+            "critical_path_ms": round(total * 1000, 3),
+        }
+
+
+def _timed_call(name: str, fn: Callable[..., Any], args: tuple) -> Tuple[Any, float, float, str]:
+    start = time.perf_counter()
+    with tracer.span(name, "node"):
+        result = fn(*args)
+    worker = f"{os.getpid()}:{threading.current_thread().name}"
+    return result, start, time.perf_counter(), worker
+
+
+class Dag:
+    """A static pipeline of nodes, validated and topologically ordered once at construction.
+
+    Dependencies may name other nodes or inputs passed to run(). Independent
+    nodes can run concurrently in a thread or process pool; with a process
+    pool, node functions, their arguments and results must be picklable.
+    """
+
+    def __init__(self, nodes: Iterable[Node]):
+        self.nodes: Dict[str, Node] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate node '{node.name}'.")
+            self.nodes[node.name] = node
+        self.order: List[str] = self._toposort()
+
+    def _toposort(self) -> List[str]:
+        indegree = {name: sum(1 for d in node.deps if d in self.nodes) for name, node in self.nodes.items()}
+        children: Dict[str, List[str]] = {name: [] for name in self.nodes}
+        for name, node in self.nodes.items():
+            for d in node.deps:
+                if d in self.nodes:
+                    children[d].append(name)
+        ready = [name for name, deg in indegree.items() if deg == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for child in children[name]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.nodes):
+            raise ValueError("Pipeline has a dependency cycle.")
+        return order
+
+    def external_inputs(self) -> List[str]:
+        return sorted({d for node in self.nodes.values() for d in node.deps if d not in self.nodes})
+
+    def run(self, **inputs: Any) -> Dict[str, Any]:
+        return self.execute(inputs).results
+
+    def execute(self, inputs: Dict[str, Any], mode: str = "sequential",
+                max_workers: Optional[int] = None) -> DagRun:
+        """Run the pipeline. mode is 'sequential', 'thread' or 'process'."""
+        missing = [name for name in self.external_inputs() if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing pipeline inputs: {', '.join(missing)}.")
+        run = DagRun(dict(inputs), deps={n: node.deps for n, node in self.nodes.items()})
+        origin = time.perf_counter()
+
+        def record(name: str, outcome: Tuple[Any, float, float, str]) -> None:
+            result, start, end, worker = outcome
+            run.results[name] = result
+            run.timings[name] = NodeTiming(start - origin, end - origin, worker)
+
+        if mode == "sequential":
+            for name in self.order:
+                node = self.nodes[name]
+                record(name, _timed_call(name, node.fn, tuple(run.results[d] for d in node.deps)))
+        elif mode in ("thread", "process"):
+            pool_cls = ThreadPoolExecutor if mode == "thread" else ProcessPoolExecutor
+            with pool_cls(max_workers=max_workers) as pool:
+                self._run_parallel(pool, run, record)
+        else:
+            raise ValueError(f"Unknown mode '{mode}'.")
+        run.wall = time.perf_counter() - origin
+        return run
+
+    def _run_parallel(self, pool, run: DagRun, record) -> None:
+        remaining = {name: {d for d in node.deps if d in self.nodes} for name, node in self.nodes.items()}
+        running: Dict[Future, str] = {}
+
+        def submit_ready() -> None:
+            for name in [n for n in self.order if n in remaining and not remaining[n]]:
+                node = self.nodes[name]
+                del remaining[name]
+                running[pool.submit(_timed_call, name, node.fn, tuple(run.results[d] for d in node.deps))] = name
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    record(name, future.result())
+                except Exception:
+                    for pending in running:
+                        pending.cancel()
+                    raise
+                for deps in remaining.values():
+                    deps.discard(name)
+            submit_ready()
@@ -0,0 +1,200 @@
+import json
+from functools import partial
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from app.finance_crew.market_data import (
+    AlignmentConfig,
+    PriceCache,
+    PriceDownloader,
+    alignment_cache,
+    load_price_panel,
+)
+from app.finance_crew.portfolio import CASH_CLASS, rebalance_holdings, scan_holdings, value_holdings
+from app.finance_crew.tools.researcher_agent import ComputeMarketMetricsTool, FetchYFinancePricesTool
+from app.finance_crew.tools.risk_analyst import (
+    BetaCorrelationTool,
+    BuildPortfolioReturnsTool,
+    ConcentrationMetricsTool,
+    DataQualityCheckTool,
+    ExposuresVsTargetTool,
+    PortfolioRiskMetricsTool,
+)
+
+from .dag import Dag, DagRun, Node, PipelineError
+
+def _call(stage: str, tool, **kwargs) -> dict:
+    result = json.loads(tool._run(**kwargs))
+    if not result.get("ok", False):
+        raise PipelineError(stage, result.get("error", "tool returned ok=false"))
+    return result
+
+
+def read_holdings(dataset_path: str) -> pd.DataFrame:
+    """Holdings aggregated by ticker: quantity, asset_class, target_weight."""
+    holdings = scan_holdings(dataset_path).holdings
+    missing = [c for c in ("quantity", "asset_class", "target_weight") if c not in holdings.columns]
+    if missing:
+        raise PipelineError("holdings", f"Missing columns: {', '.join(missing)}.")
+    return holdings[["quantity", "asset_class", "target_weight"]]
+
+
+def _prices_json(prices: dict) -> str:
+    # A bare handle, or with a panel file a descriptor that other processes can reopen from disk.
+    if "path" in prices:
+        return json.dumps({"ok": True, "handle": prices["handle"], "path": prices["path"]})
+    return prices["handle"]
+
+
+def fetch_prices(holdings: pd.DataFrame, benchmark: str, period: str, interval: str,
+                 downloader: Optional[PriceDownloader] = None, price_cache: Optional[PriceCache] = None,
+                 output_format: str = "handle") -> dict:
+    """Prices of every non-cash holding plus the benchmark, as a handle descriptor."""
+    tickers = [t for t, cls in holdings["asset_class"].items() if cls != CASH_CLASS]
+    tickers = tickers + ([benchmark] if benchmark not in tickers else [])
+    fetch = FetchYFinancePricesTool(downloader=downloader, price_cache=price_cache)
+    return _call("prices", fetch, tickers_json=json.dumps(tickers), period=period,
+                 interval=interval, output_format=output_format)
+
+
+# Gap policy of the shared alignment stage; DataQualityCheckTool scans with the default config,
+# which uses the same policy, so returns, beta and data quality all reuse one alignment.
+PRICE_FILL = AlignmentConfig().fill
+
+
+def align_prices(prices: dict) -> dict:
+    """Align the prices once through alignment_cache and report the raw data's quality summary.
+
+    The stages that read aligned prices depend on this node, so they find the
+    alignment cached instead of racing to compute it (in a process pool, once per worker).
+    """
+    aligned = alignment_cache.get_or_align(load_price_panel(_prices_json(prices)), AlignmentConfig(fill=PRICE_FILL))
+    return {"quality": aligned.quality.summary(), "n_dates": aligned.panel.n_dates}
+
+
+def holdings_weights(holdings: pd.DataFrame, prices: dict) -> dict:
+    """Current weights from quantity x last price; cash is valued at 1.0 per unit."""
+    valuation = value_holdings(holdings, load_price_panel(_prices_json(prices)), cash_class=CASH_CLASS)
+    return {
+        "weights": valuation.weights.astype(float).to_dict(),
+        "target_weights": valuation.target_weights.to_dict(),
+        "asset_map": valuation.asset_map.to_dict(),
+        "total_value": valuation.total_value,
+        "unpriced": valuation.unpriced,
+    }
+
+
+def market_metrics(prices: dict) -> dict:
+    return _call("market_metrics", ComputeMarketMetricsTool(), prices_json=_prices_json(prices))
+
+
+def portfolio_returns(prices: dict, aligned: dict, weights: dict) -> dict:
+    return _call("returns", BuildPortfolioReturnsTool(), prices_json=_prices_json(prices),
+                 weights_json=json.dumps(weights["weights"]), output_format="binary", fill=PRICE_FILL)
+
+
+def risk_metrics(returns: dict) -> dict:
+    return _call("risk", PortfolioRiskMetricsTool(), portfolio_returns_json=json.dumps(returns))
+
+
+def exposures(weights: dict) -> dict:
+    return _call("exposures", ExposuresVsTargetTool(), weights_json=json.dumps(weights["weights"]),
+                 asset_map_json=json.dumps(weights["asset_map"]),
+                 target_weights_json=json.dumps(weights["target_weights"]))
+
+
+def concentration(weights: dict, top_k: int = 5) -> dict:
+    return _call("concentration", ConcentrationMetricsTool(), weights_json=json.dumps(weights["weights"]),
+                 top_k=top_k)
+
+
+def beta(prices: dict, aligned: dict, weights: dict, benchmark: str) -> dict:
+    return _call("beta", BetaCorrelationTool(), prices_json=_prices_json(prices),
+                 weights_json=json.dumps(weights["weights"]), benchmark=benchmark, fill=PRICE_FILL)
+
+
+def rebalance(holdings: pd.DataFrame, prices: dict) -> dict:
+    return rebalance_holdings(holdings, load_price_panel(_prices_json(prices))).to_dict()
+
+
+def data_quality(prices: dict, aligned: dict, weights: dict) -> dict:
+    return _call("data_quality", DataQualityCheckTool(), prices_json=_prices_json(prices),
+                 weights_json=json.dumps(weights["weights"]))
+
+
+def build_quant_dag(downloader: Optional[PriceDownloader] = None, price_cache: Optional[PriceCache] = None,
+                    top_k: int = 5, prices_format: str = "handle") -> Dag:
+    """The deterministic quantitative stages of the crew as a DAG of tool calls.
+
+    Prices are passed between tools as a handle descriptor, never as JSON, and
+    portfolio returns in the binary wire format. The prices are aligned once
+    (gaps forward-filled, see PRICE_FILL) and returns, beta and the data quality
+    check all read that alignment. Stages are module-level functions, so the
+    DAG also runs in a process pool; there, use prices_format='file' so other
+    processes can open the prices from disk.
+    Inputs: dataset_path, benchmark, period, interval.
+    """
+    return Dag([
+        Node("holdings", read_holdings, ("dataset_path",)),
+        Node("prices", partial(fetch_prices, downloader=downloader, price_cache=price_cache,
+                               output_format=prices_format), ("holdings", "benchmark", "period", "interval")),
+        Node("market_metrics", market_metrics, ("prices",)),
+        Node("aligned", align_prices, ("prices",)),
+        Node("weights", holdings_weights, ("holdings", "prices")),
+        Node("returns", portfolio_returns, ("prices", "aligned", "weights")),
+        Node("risk", risk_metrics, ("returns",)),
+        Node("exposures", exposures, ("weights",)),
+        Node("concentration", partial(concentration, top_k=top_k), ("weights",)),
+        Node("beta", beta, ("prices", "aligned", "weights", "benchmark")),
+        Node("rebalance", rebalance, ("holdings", "prices")),
+        Node("data_quality", data_quality, ("prices", "aligned", "weights")),
+    ])
+
+
+def summarize(results: Dict[str, Any], timings: Optional[dict] = None) -> dict:
+    """The finished metrics handed to the reporting agent (no price or return series),
+    plus the per-stage timings and critical path of the run when given."""
+    prices = results["prices"]
+    weights = results["weights"]
+    strip = lambda d: {k: v for k, v in d.items() if k != "ok"}
+    return {
+        "pricing_range": {"start": prices["start"], "end": prices["end"], "n_dates": prices["n_dates"]},
+        "failed_tickers": prices.get("failed", {}),
+        "market_metrics": results["market_metrics"]["metrics"],
+        "total_value": round(weights["total_value"], 2),
+        "current_weights": {t: round(w, 6) for t, w in weights["weights"].items()},
+        "target_weights": weights["target_weights"],
+        "asset_map": weights["asset_map"],
+        "unpriced_tickers": weights["unpriced"],
+        "risk_metrics": results["risk"]["metrics"],
+        "exposures": strip(results["exposures"]),
+        "concentration": strip(results["concentration"]),
+        "beta": strip(results["beta"]),
+        "data_quality": strip(results["data_quality"]),
+        "rebalance": results["rebalance"],
+        **({"timings": timings} if timings is not None else {}),
+    }
+
+
+def execute_quant_pipeline(dataset_path: str, benchmark: str = "SPY", period: str = "1y", interval: str = "1d",
+                           downloader: Optional[PriceDownloader] = None, price_cache: Optional[PriceCache] = None,
+                           mode: str = "thread", max_workers: Optional[int] = None) -> DagRun:
+    """Run every quantitative stage without the LLM; independent stages run concurrently.
+
+    Returns the full DagRun so callers can inspect per-stage timings and the critical path.
+    With mode='process' prices go through a panel file, as handles do not cross processes.
+    """
+    dag = build_quant_dag(downloader=downloader, price_cache=price_cache,
+                          prices_format="file" if mode == "process" else "handle")
+    inputs = {"dataset_path": dataset_path, "benchmark": benchmark, "period": period, "interval": interval}
+    return dag.execute(inputs, mode=mode, max_workers=max_workers)
+
+
+def run_quant_pipeline(dataset_path: str, benchmark: str = "SPY", period: str = "1y", interval: str = "1d",
+                       downloader: Optional[PriceDownloader] = None,
+                       price_cache: Optional[PriceCache] = None) -> dict:
+    """Run every quantitative stage without the LLM and return the summarized metrics and timings."""
+    run = execute_quant_pipeline(dataset_path, benchmark=benchmark, period=period, interval=interval,
+                                 downloader=downloader, price_cache=price_cache)
+    return summarize(run.results, run.timing_report())
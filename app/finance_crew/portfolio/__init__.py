@@ -0,0 +1,31 @@
+from .holdings import HoldingsScan, aggregate_holdings, holdings_columns, iter_holdings_chunks, scan_holdings
+from .rebalance import (
+    RebalanceConstraints,
+    RebalancePlan,
+    project_weights,
+    rebalance_accounts,
+    rebalance_holdings,
+    rebalance_matrix,
+    round_shares,
+)
+from .valuation import CASH_CLASS, Valuation, last_prices, value_accounts, value_holdings
+
+__all__ = [
+    "CASH_CLASS",
+    "HoldingsScan",
+    "RebalanceConstraints",
+    "RebalancePlan",
+    "Valuation",
+    "aggregate_holdings",
+    "holdings_columns",
+    "iter_holdings_chunks",
+    "last_prices",
+    "project_weights",
+    "rebalance_accounts",
+    "rebalance_holdings",
+    "rebalance_matrix",
+    "round_shares",
+    "scan_holdings",
+    "value_accounts",
+    "value_holdings",
+]
@@ -0,0 +1,128 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Columns read from a holdings file besides the ticker column, with their dtypes.
+VALUE_COLUMNS = {"quantity": "float64", "target_weight": "float64"}
+LABEL_COLUMNS = {"asset_class": "category"}
+DEFAULT_CHUNK_ROWS = 1_000_000
+_PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+@dataclass
+class HoldingsScan:
+    """Result of one streaming pass over a holdings file.
+
+    holdings is indexed by ticker (sorted) with whichever of quantity,
+    target_weight (summed) and asset_class (first seen) the file has.
+    """
+    tickers: List[str]
+    row_count: int
+    holdings: pd.DataFrame
+
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith(_PARQUET_SUFFIXES)
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet holdings requires pyarrow (pip install pyarrow).") from e
+    return pq
+
+
+def holdings_columns(path: str) -> List[str]:
+    """Column names of a CSV or Parquet holdings file, without reading its rows."""
+    if _is_parquet(path):
+        return list(_parquet().ParquetFile(path).schema_arrow.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_holdings_chunks(path: str, columns: List[str], dtypes: Optional[Dict[str, str]] = None,
+                         chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield `columns` of a CSV or Parquet file in frames of at most chunk_rows rows."""
+    dtypes = {c: t for c, t in (dtypes or {}).items() if c in columns}
+    if _is_parquet(path):
+        for batch in _parquet().ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas().astype(dtypes)
+        return
+    yield from pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunk_rows)
+
+
+def scan_holdings(path: str, ticker_column: str = "ticker", aggregate: bool = True,
+                  chunk_rows: int = DEFAULT_CHUNK_ROWS) -> HoldingsScan:
+    """Unique tickers, row count and per-ticker aggregates of a holdings file in one chunked pass.
+
+    Only the ticker column and, with aggregate, the quantity / target_weight /
+    asset_class columns present in the file are read, with explicit dtypes.
+    Each chunk is reduced to one row per ticker before being merged into the
+    running totals, so memory grows with the number of distinct tickers, not rows.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    available = holdings_columns(path)
+    if ticker_column not in available:
+        raise KeyError(f"Missing column '{ticker_column}' in {os.path.basename(path)}.")
+    extra = _aggregated_columns(available, ticker_column) if aggregate else []
+    agg = _aggregations(extra)
+    dtypes = {**VALUE_COLUMNS, **LABEL_COLUMNS, ticker_column: "category"}
+
+    row_count = 0
+    totals: Optional[pd.DataFrame] = None
+    for chunk in iter_holdings_chunks(path, [ticker_column, *extra], dtypes, chunk_rows):
+        row_count += len(chunk)
+        part = _reduce_chunk(chunk, ticker_column, agg)
+        parts = [part] if totals is None else [totals, part]
+        totals = pd.concat(parts).groupby(level=0, sort=False).agg(agg) if agg \
+            else pd.DataFrame(index=pd.concat(parts).index.unique())
+
+    if totals is None:
+        totals = pd.DataFrame(index=pd.Index([], dtype=object), columns=extra)
+    totals = _finish(totals)
+    return HoldingsScan([str(t) for t in totals.index], row_count, totals)
+
+
+def aggregate_holdings(frame: pd.DataFrame, ticker_column: str = "ticker") -> pd.DataFrame:
+    """In-memory counterpart of scan_holdings: lot-level rows reduced to one row per
+    (stripped) ticker, sorted, with quantity/target_weight summed and asset_class first seen."""
+    agg = _aggregations(_aggregated_columns(frame.columns, ticker_column))
+    part = _reduce_chunk(frame, ticker_column, agg)
+    totals = part.groupby(level=0, sort=False).agg(agg) if agg else pd.DataFrame(index=part.index.unique())
+    return _finish(totals)
+
+
+def _aggregated_columns(columns, ticker_column: str) -> List[str]:
+    return [c for c in (*VALUE_COLUMNS, *LABEL_COLUMNS) if c in columns and c != ticker_column]
+
+
+def _aggregations(columns: List[str]) -> Dict[str, str]:
+    return {c: "sum" if c in VALUE_COLUMNS else "first" for c in columns}
+
+
+def _finish(totals: pd.DataFrame) -> pd.DataFrame:
+    totals = totals.sort_index()
+    for c in LABEL_COLUMNS:
+        if c in totals.columns:
+            totals[c] = totals[c].astype(object)
+    totals.index.name = "ticker"
+    return totals
+
+
+def _reduce_chunk(chunk: pd.DataFrame, ticker_column: str, agg: Dict[str, str]) -> pd.DataFrame:
+    """One row per distinct raw ticker of a chunk, grouped on the integer category codes
+    rather than the strings. The index holds stripped tickers and may repeat when raw
+    spellings differ only by whitespace."""
+    ticker = chunk[ticker_column].astype("category")
+    codes = ticker.cat.codes.to_numpy()
+    keys = ticker.cat.categories.astype(str).str.strip()
+    valid = codes >= 0
+    if not agg:
+        return pd.DataFrame(index=keys[np.unique(codes[valid])])
+    part = chunk.loc[valid, list(agg)].groupby(codes[valid]).agg(agg)
+    part.index = keys[part.index]
+    return part
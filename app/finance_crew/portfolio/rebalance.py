@@ -0,0 +1,231 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.finance_crew.market_data import PricePanel
+
+from .holdings import aggregate_holdings
+from .valuation import CASH_CLASS, last_prices
+
+# Halvings of the multiplier bracket; 64 take any bracket below float resolution.
+_BISECTION_STEPS = 64
+
+
+@dataclass(frozen=True)
+class RebalanceConstraints:
+    """Rules every proposed portfolio must satisfy: no shorts, at most max_weight in any
+    single non-cash ticker and at least min_cash in cash when the portfolio holds cash."""
+    max_weight: float = 0.35
+    min_cash: float = 0.02
+    cash_class: str = CASH_CLASS
+
+    def bounds(self, is_cash: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-ticker (lower, upper) weight bounds."""
+        lower = np.where(is_cash, self.min_cash, 0.0)
+        upper = np.where(is_cash, 1.0, self.max_weight)
+        return lower, upper
+
+
+def project_weights(target: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """Weights closest to target (least squares) with lower <= w <= upper and sum(w) = 1.
+
+    The KKT conditions of this QP give w = clip(target - lam, lower, upper) for a
+    scalar lam per portfolio, and sum(w) is monotone in lam, so lam is found by
+    bisection: exact up to float precision and vectorized over the rows of a
+    (portfolios x tickers) target matrix. Raises ValueError when the bounds
+    cannot sum to one.
+    """
+    target = np.asarray(target, dtype=np.float64)
+    single = target.ndim == 1
+    t = np.atleast_2d(target)
+    lo = np.broadcast_to(lower, t.shape)
+    hi = np.broadcast_to(upper, t.shape)
+    if (lo.sum(axis=1) > 1 + 1e-12).any() or (hi.sum(axis=1) < 1 - 1e-12).any():
+        raise ValueError("Constraints are infeasible: weight bounds cannot sum to 1.")
+    a = (t - hi).min(axis=1, keepdims=True)
+    b = (t - lo).max(axis=1, keepdims=True)
+    for _ in range(_BISECTION_STEPS):
+        mid = 0.5 * (a + b)
+        over = np.clip(t - mid, lo, hi).sum(axis=1, keepdims=True) > 1.0
+        a = np.where(over, mid, a)
+        b = np.where(over, b, mid)
+    w = np.clip(t - 0.5 * (a + b), lo, hi)
+    return w[0] if single else w
+
+
+def round_shares(weights: np.ndarray, prices: np.ndarray, values: np.ndarray, is_cash: np.ndarray,
+                 upper: np.ndarray) -> np.ndarray:
+    """Whole share counts for target weights; cash takes the remainder.
+
+    Shares are rounded down, which can only lower non-cash weights and raise
+    cash, so the bounds still hold. Left-over cash above the weight the
+    optimizer gave it then buys one more share of the most under-weight
+    tickers, in order, while it lasts and the extra share stays under the cap.
+    """
+    w = np.atleast_2d(weights)
+    v = np.asarray(values, dtype=np.float64).reshape(-1, 1)
+    px = np.where(is_cash, 1.0, prices)
+    desired = w * v
+    shares = np.where(is_cash, 0.0, np.floor(desired / px + 1e-9))
+    spare = v[:, 0] - (shares * px).sum(axis=1) - (w * is_cash).sum(axis=1) * v[:, 0]
+
+    shortfall = np.where(is_cash, -np.inf, desired - shares * px)
+    fits = ~is_cash & ((shares + 1) * px <= upper * v + 1e-9)
+    order = np.argsort(-np.where(fits, shortfall, -np.inf), axis=1)
+    cost = np.take_along_axis(np.where(fits, px, np.inf), order, axis=1)
+    take = np.cumsum(cost, axis=1) <= spare[:, None]
+    np.put_along_axis(shares, order, np.take_along_axis(shares, order, axis=1) + take, axis=1)
+
+    cash = v[:, 0] - (shares * px).sum(axis=1)
+    n_cash = is_cash.sum()
+    if n_cash:
+        shares = np.where(is_cash, cash[:, None] / n_cash, shares)
+    return shares
+
+
+@dataclass
+class RebalancePlan:
+    """Current, target, optimal (continuous) and proposed (whole-share) weights with the trades."""
+    tickers: list
+    current_weights: np.ndarray
+    target_weights: np.ndarray
+    optimal_weights: np.ndarray
+    proposed_weights: np.ndarray
+    current_shares: np.ndarray
+    proposed_shares: np.ndarray
+    prices: np.ndarray
+    total_value: float
+    is_cash: np.ndarray
+    unpriced: list
+
+    @property
+    def trades(self) -> Dict[str, float]:
+        delta = self.proposed_shares - self.current_shares
+        return {t: (round(float(d), 2) if c else int(round(d)))
+                for t, d, c in zip(self.tickers, delta, self.is_cash) if abs(d) > 1e-9}
+
+    def to_dict(self) -> dict:
+        def weights(w):
+            return {t: round(float(x), 6) for t, x in zip(self.tickers, w)}
+
+        def error(w):
+            return round(float(np.sqrt(((w - self.target_weights) ** 2).sum())), 6)
+
+        return {
+            "suggested_trades": self.trades,
+            "current_weights": weights(self.current_weights),
+            "target_weights": weights(self.target_weights),
+            "optimal_weights": weights(self.optimal_weights),
+            "proposed_weights": weights(self.proposed_weights),
+            "tracking_error_before": error(self.current_weights),
+            "tracking_error_after": error(self.proposed_weights),
+            "turnover": round(float(np.abs(self.proposed_weights - self.current_weights).sum() / 2), 6),
+            "uninvested": round(float(1.0 - self.proposed_weights.sum()), 6),
+            "total_value": round(self.total_value, 2),
+            "unpriced": self.unpriced,
+        }
+
+
+def rebalance_matrix(quantities: np.ndarray, targets: np.ndarray, prices: np.ndarray, is_cash: np.ndarray,
+                     constraints: RebalanceConstraints = RebalanceConstraints()
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Rebalance P accounts over N priced tickers at once.
+
+    quantities and targets are (P, N), prices (N,) with cash at 1.0. Returns
+    (current_weights, optimal_weights, proposed_shares, proposed_weights).
+    """
+    q = np.atleast_2d(np.asarray(quantities, dtype=np.float64))
+    px = np.where(is_cash, 1.0, prices)
+    values = q * px
+    totals = values.sum(axis=1)
+    if (totals <= 0).any():
+        raise ValueError("Every account needs a positive market value.")
+    current = values / totals[:, None]
+    lower, upper = constraints.bounds(is_cash)
+    optimal = project_weights(np.atleast_2d(targets), lower, upper)
+    shares = round_shares(optimal, px, totals, is_cash, upper)
+    proposed = shares * px / totals[:, None]
+    return current, optimal, shares, proposed
+
+
+def rebalance_holdings(holdings: pd.DataFrame, panel: PricePanel,
+                       constraints: RebalanceConstraints = RebalanceConstraints(),
+                       ticker_column: str = "ticker") -> RebalancePlan:
+    """Rebalance one portfolio of holdings (quantity, asset_class, target_weight) at the panel's last prices.
+
+    Tickers without a price are left untouched and reported as unpriced.
+    """
+    if ticker_column in holdings.columns:
+        holdings = aggregate_holdings(holdings, ticker_column)
+    is_cash_all = (holdings["asset_class"] == constraints.cash_class).to_numpy() \
+        if "asset_class" in holdings.columns else np.zeros(len(holdings), dtype=bool)
+    last, _ = last_prices(panel)
+    pos = pd.Index(panel.tickers).get_indexer(holdings.index)
+    px_all = np.where(is_cash_all, 1.0, np.where(pos >= 0, last[np.maximum(pos, 0)], np.nan))
+    priced = ~np.isnan(px_all)
+
+    tickers = [str(t) for t in holdings.index[priced]]
+    is_cash = is_cash_all[priced]
+    q = holdings["quantity"].to_numpy(dtype=np.float64)[priced]
+    target = holdings["target_weight"].to_numpy(dtype=np.float64)[priced] \
+        if "target_weight" in holdings.columns else np.zeros(len(tickers))
+    current, optimal, shares, proposed = rebalance_matrix(q, np.nan_to_num(target), px_all[priced], is_cash,
+                                                          constraints)
+    return RebalancePlan(
+        tickers=tickers,
+        current_weights=current[0],
+        target_weights=np.nan_to_num(target),
+        optimal_weights=optimal[0],
+        proposed_weights=proposed[0],
+        current_shares=q,
+        proposed_shares=shares[0],
+        prices=px_all[priced],
+        total_value=float((q * px_all[priced]).sum()),
+        is_cash=is_cash,
+        unpriced=sorted(str(t) for t in holdings.index[~priced]),
+    )
+
+
+def rebalance_accounts(frame: pd.DataFrame, panel: PricePanel, by: str = "account",
+                       constraints: RebalanceConstraints = RebalanceConstraints(),
+                       ticker_column: str = "ticker", targets: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Share deltas for many accounts from one lot-level book (by, ticker, quantity, asset_class
+    and target_weight unless a separate accounts x tickers `targets` matrix is given).
+
+    All accounts are solved in one vectorized pass. Returns a long frame with
+    by, ticker, current_shares, proposed_shares, delta, current_weight and
+    proposed_weight for every priced (account, ticker) pair with a position or a trade.
+    """
+    frame = frame.assign(**{ticker_column: frame[ticker_column].astype(str).str.strip()})
+    per_ticker = aggregate_holdings(frame, ticker_column)
+    last, _ = last_prices(panel)
+    pos = pd.Index(panel.tickers).get_indexer(per_ticker.index)
+    cash = (per_ticker["asset_class"] == constraints.cash_class).to_numpy() \
+        if "asset_class" in per_ticker.columns else np.zeros(len(per_ticker), dtype=bool)
+    px = np.where(cash, 1.0, np.where(pos >= 0, last[np.maximum(pos, 0)], np.nan))
+    priced = list(per_ticker.index[~np.isnan(px)])
+
+    qty = frame.pivot_table(index=by, columns=ticker_column, values="quantity", aggfunc="sum", fill_value=0.0)
+    qty = qty.reindex(columns=priced, fill_value=0.0)
+    if targets is None:
+        targets = frame.pivot_table(index=by, columns=ticker_column, values="target_weight", aggfunc="sum",
+                                    fill_value=0.0)
+    tgt = targets.reindex(index=qty.index, columns=priced, fill_value=0.0)
+    keep = ~np.isnan(px)
+    current, _, shares, proposed = rebalance_matrix(qty.to_numpy(), tgt.to_numpy(), px[keep], cash[keep],
+                                                    constraints)
+
+    delta = shares - qty.to_numpy()
+    active = (qty.to_numpy() != 0) | (np.abs(delta) > 1e-9)
+    rows, cols = np.nonzero(active)
+    return pd.DataFrame({
+        by: qty.index.to_numpy()[rows],
+        "ticker": np.asarray(priced, dtype=object)[cols],
+        "current_shares": qty.to_numpy()[rows, cols],
+        "proposed_shares": shares[rows, cols],
+        "delta": delta[rows, cols],
+        "current_weight": current[rows, cols],
+        "proposed_weight": proposed[rows, cols],
+    })
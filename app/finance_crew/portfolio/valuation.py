@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.finance_crew.market_data import PricePanel
+
+from .holdings import aggregate_holdings
+
+CASH_CLASS = "cash"
+
+
+def last_prices(panel: PricePanel) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """Last non-missing price of every ticker and the date it is from (NaN / None when
+    a ticker has no price at all), in one pass over the panel."""
+    valid = ~np.isnan(panel.values)
+    n = panel.n_dates
+    if n == 0:
+        return np.full(panel.n_tickers, np.nan), [None] * panel.n_tickers
+    row = n - 1 - np.argmax(valid[::-1], axis=0)
+    has = valid.any(axis=0)
+    prices = np.where(has, panel.values[row, np.arange(panel.n_tickers)], np.nan)
+    return prices, [panel.dates[r] if h else None for r, h in zip(row, has)]
+
+
+def _unit_prices(tickers: pd.Index, asset_class: Optional[pd.Series], panel: PricePanel,
+                 cash_class: str, cash_price: float) -> Tuple[np.ndarray, Optional[str]]:
+    prices, dates = last_prices(panel)
+    pos = pd.Index(panel.tickers).get_indexer(tickers)
+    unit = np.where(pos >= 0, prices[np.maximum(pos, 0)], np.nan)
+    if asset_class is not None:
+        unit = np.where(asset_class.reindex(tickers).to_numpy() == cash_class, cash_price, unit)
+    used = [dates[p] for p in pos[(pos >= 0)] if dates[p] is not None]
+    return unit, max(used) if used else None
+
+
+@dataclass
+class Valuation:
+    """Market value and current weight of every holding, plus the target and asset-class maps.
+
+    Weights are market value over the total value of the priced holdings;
+    unpriced tickers have a NaN market value and no weight.
+    """
+    market_values: pd.Series
+    weights: pd.Series
+    target_weights: pd.Series
+    asset_map: pd.Series
+    total_value: float
+    unpriced: List[str]
+    as_of: Optional[str]
+
+    def to_dict(self, digits: int = 10) -> dict:
+        return {
+            "weights": {t: round(float(w), digits) for t, w in self.weights.items()},
+            "target_weights": {t: float(w) for t, w in self.target_weights.items()},
+            "asset_map": {t: str(c) for t, c in self.asset_map.items()},
+            "market_values": {t: round(float(v), 2) for t, v in self.market_values.dropna().items()},
+            "total_value": round(self.total_value, 2),
+            "unpriced": self.unpriced,
+            "as_of": self.as_of,
+        }
+
+
+def value_holdings(holdings: pd.DataFrame, panel: PricePanel, ticker_column: str = "ticker",
+                   cash_class: str = CASH_CLASS, cash_price: float = 1.0) -> Valuation:
+    """Value holdings at the last price in the panel; cash holdings are valued at cash_price per unit.
+
+    holdings is either lot-level rows with a ticker column (aggregated by ticker
+    first, so millions of rows cost one group-by) or a frame already indexed by
+    ticker, as returned by scan_holdings / aggregate_holdings.
+    """
+    if ticker_column in holdings.columns:
+        holdings = aggregate_holdings(holdings, ticker_column)
+    if "quantity" not in holdings.columns:
+        raise KeyError("Holdings need a 'quantity' column.")
+    asset_class = holdings["asset_class"] if "asset_class" in holdings.columns else None
+    unit, as_of = _unit_prices(holdings.index, asset_class, panel, cash_class, cash_price)
+    values = holdings["quantity"].to_numpy(dtype=np.float64) * unit
+    market_values = pd.Series(values, index=holdings.index)
+    priced = market_values.dropna()
+    total = float(priced.sum())
+    if total == 0:
+        raise ValueError("Total market value of the priced holdings is zero.")
+    targets = holdings["target_weight"].astype(float) if "target_weight" in holdings.columns \
+        else pd.Series(dtype=float)
+    return Valuation(
+        market_values=market_values,
+        weights=priced / total,
+        target_weights=targets,
+        asset_map=asset_class.astype(str) if asset_class is not None else pd.Series(dtype=object),
+        total_value=total,
+        unpriced=sorted(str(t) for t in market_values.index[market_values.isna()]),
+        as_of=as_of,
+    )
+
+
+def value_accounts(frame: pd.DataFrame, panel: PricePanel, by: str = "account", ticker_column: str = "ticker",
+                   cash_class: str = CASH_CLASS, cash_price: float = 1.0) -> Tuple[pd.DataFrame, pd.Series]:
+    """Weights of many accounts from one lot-level holdings frame.
+
+    Returns (weights, total_value): an accounts x tickers weight matrix (0.0
+    when not held, unpriced tickers left out) ready for pipeline.run_batch, and
+    each account's priced market value. Rows are valued through the ticker
+    category codes and summed with a single group-by on (account, ticker).
+    """
+    ticker = frame[ticker_column].astype("category")
+    codes = ticker.cat.codes.to_numpy()
+    names = ticker.cat.categories.astype(str).str.strip()
+    per_ticker = aggregate_holdings(frame, ticker_column)
+    asset_class = per_ticker["asset_class"] if "asset_class" in per_ticker.columns else None
+    unit, _ = _unit_prices(pd.Index(names), asset_class, panel, cash_class, cash_price)
+    row_unit = np.where(codes >= 0, unit[np.maximum(codes, 0)], np.nan)
+    values = frame["quantity"].to_numpy(dtype=np.float64) * row_unit
+    keep = ~np.isnan(values)
+    grouped = pd.Series(values[keep]).groupby([frame[by].to_numpy()[keep], names[codes[keep]]]).sum()
+    matrix = grouped.unstack(fill_value=0.0)
+    matrix.index.name, matrix.columns.name = by, None
+    totals = matrix.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weights = matrix.div(totals.where(totals != 0), axis=0)
+    return weights.sort_index(axis=1), totals
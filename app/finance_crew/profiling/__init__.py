@@ -0,0 +1,25 @@
+from .trace import (
+    FORMATS,
+    Span,
+    Tracer,
+    format_summary,
+    load_trace,
+    summarize,
+    to_chrome,
+    trace_run,
+    traced,
+    tracer,
+)
+
+__all__ = [
+    "FORMATS",
+    "Span",
+    "Tracer",
+    "format_summary",
+    "load_trace",
+    "summarize",
+    "to_chrome",
+    "trace_run",
+    "traced",
+    "tracer",
+]
@@ -0,0 +1,111 @@
+import threading
+from typing import Dict, Optional
+
+from crewai.events import (
+    BaseEventListener,
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+)
+
+from .trace import tracer
+
+_USAGE_KEYS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+def _micros(event) -> int:
+    return int(event.timestamp.timestamp() * 1e6)
+
+
+def _payload_bytes(value) -> int:
+    return len(value) if isinstance(value, str) else len(str(value)) if value is not None else 0
+
+
+def _call_key(source, event):
+    # crewai 0.186 has no call_id; its LLM emits started and completed/failed from the calling
+    # thread, and an agent makes one call at a time, so the LLM, agent and task identify the call.
+    return getattr(event, "call_id", None) or (id(source), getattr(event, "agent_id", None),
+                                                      getattr(event, "task_id", None))
+
+
+def _token_counter(callbacks):
+    # crewai 0.186 reports usage through the TokenCalcHandler callback passed to each call,
+    # which adds to the agent's TokenProcess; the difference across the call is its usage.
+    for cb in callbacks or ():
+        counter = getattr(cb, "token_cost_process", None)
+        if counter is not None:
+            return counter
+    return None
+
+
+def _counts(counter) -> tuple:
+    return tuple(getattr(counter, key, 0) or 0 for key in _USAGE_KEYS)
+
+
+class LLMTraceListener(BaseEventListener):
+    """Turns crewai LLM call events into "llm" spans on the tracer: latency from the
+    started/completed event timestamps, token usage as reported by the provider, and
+    the size of the messages and the response. Fields newer crewai releases add to
+    the events (call_id, usage) are used when present."""
+
+    def __init__(self):
+        self._started: Dict[object, tuple] = {}
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def setup_listeners(self, crewai_event_bus) -> None:
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_started(source, event):
+            if tracer.active:
+                counter = _token_counter(getattr(event, "callbacks", None))
+                with self._lock:
+                    self._started[_call_key(source, event)] = (
+                        _micros(event), _payload_bytes(event.messages), getattr(event, "model", None),
+                        counter, _counts(counter) if counter is not None else None)
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def on_completed(source, event):
+            self._finish(source, event, usage=getattr(event, "usage", None),
+                         bytes_out=_payload_bytes(event.response))
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        def on_failed(source, event):
+            self._finish(source, event, error=event.error)
+
+    def _finish(self, source, event, usage: Optional[dict] = None, bytes_out: int = 0,
+                error: Optional[str] = None):
+        with self._lock:
+            started = self._started.pop(_call_key(source, event), None)
+        if started is None or not tracer.active:
+            return
+        ts, bytes_in, model, counter, before = started
+        record = {"name": getattr(event, "model", None) or model or "llm", "cat": "llm", "ts": ts,
+                  "dur": max(_micros(event) - ts, 0), "bytes_in": bytes_in, "bytes_out": bytes_out}
+        if not usage and counter is not None and error is None:
+            deltas = [b - a for a, b in zip(before, _counts(counter))]
+            if any(deltas):
+                usage = dict(zip(_USAGE_KEYS, deltas))
+        if usage is not None and not isinstance(usage, dict):
+            usage = {key: getattr(usage, key, None) for key in _USAGE_KEYS}
+        for key in _USAGE_KEYS:
+            if usage and usage.get(key) is not None:
+                record[key] = int(usage[key])
+        agent = getattr(event, "agent_role", None)
+        if agent:
+            record["args"] = {"agent": agent}
+        if error:
+            record["error"] = error
+        tracer.record(record)
+
+
+_listener: Optional[LLMTraceListener] = None
+_install_lock = threading.Lock()
+
+
+def install_llm_listener() -> LLMTraceListener:
+    """Register the LLM listener on the crewai event bus once per process."""
+    global _listener
+    with _install_lock:
+        if _listener is None:
+            _listener = LLMTraceListener()
+        return _listener
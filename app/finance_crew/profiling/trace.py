@@ -0,0 +1,262 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+FORMATS = ("jsonl", "chrome")
+
+
+class Span:
+    """One timed stage; the fields a traced block can fill in while it runs."""
+
+    __slots__ = ("name", "category", "args", "bytes_in", "bytes_out", "_peak")
+
+    def __init__(self, name: str, category: str, args: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.category = category
+        self.args = dict(args or {})
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._peak = 0
+
+
+class Tracer:
+    """Collects timed spans (tool calls, LLM calls, fetches, parsing) for one run.
+
+    Every span records wall time, CPU time of its thread, payload bytes in and
+    out and, with track_memory, the peak of Python-allocated memory (numpy
+    buffers included) reached while it ran. The peak comes from tracemalloc,
+    which is process-wide: spans running concurrently on other threads count
+    towards it. When the tracer is not started, span() costs one attribute check.
+    """
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self.format = "jsonl"
+        self.track_memory = False
+        self.events: List[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = None
+        self._started_memory = False
+        self.active = False
+
+    def start(self, path: Optional[str] = None, format: str = "jsonl", track_memory: bool = True) -> None:
+        """Begin a run. JSON lines are streamed to `path` as spans finish; the Chrome
+        trace (chrome://tracing, Perfetto) is written when the run stops."""
+        if format not in FORMATS:
+            raise ValueError(f"Unknown trace format '{format}'; expected one of {', '.join(FORMATS)}.")
+        self.stop()
+        self.path, self.format, self.track_memory = path, format, track_memory
+        self.events = []
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            if format == "jsonl":
+                self._file = open(path, "w", encoding="utf-8")
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_memory = True
+        self.active = True
+
+    def stop(self) -> Optional[str]:
+        """End the run, write the Chrome trace if requested and return the trace path."""
+        if not self.active:
+            return None
+        self.active = False
+        if self._started_memory:
+            tracemalloc.stop()
+            self._started_memory = False
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        elif self.path and self.format == "chrome":
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(to_chrome(self.events), f)
+        return self.path
+
+    def record(self, event: dict) -> None:
+        """Add a finished span: name, cat, ts (epoch microseconds), dur (microseconds) plus any metrics."""
+        event.setdefault("pid", os.getpid())
+        event.setdefault("tid", threading.get_ident())
+        with self._lock:
+            self.events.append(event)
+            if self._file is not None:
+                self._file.write(json.dumps(event, default=str) + "\n")
+                self._file.flush()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **args: Any) -> Iterator[Optional[Span]]:
+        if not self.active:
+            yield None
+            return
+        span = Span(name, category, args)
+        stack = self._stack()
+        if self.track_memory and tracemalloc.is_tracing():
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            base = None
+        stack.append(span)
+        ts = time.time_ns() // 1000
+        wall, cpu = time.perf_counter(), time.thread_time()
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            cpu = time.thread_time() - cpu
+            wall = time.perf_counter() - wall
+            stack.pop()
+            event = {"name": name, "cat": category, "ts": ts, "dur": round(wall * 1e6),
+                     "cpu_ms": round(cpu * 1e3, 3), "bytes_in": span.bytes_in, "bytes_out": span.bytes_out}
+            if base is not None:
+                # A nested span resets the peak, so the parent keeps the largest peak of its children.
+                peak = max(tracemalloc.get_traced_memory()[1] - base, span._peak, 0)
+                event["peak_bytes"] = peak
+                if stack:
+                    stack[-1]._peak = max(stack[-1]._peak, peak)
+            if span.args:
+                event["args"] = span.args
+            if error:
+                event["error"] = error
+            self.record(event)
+
+
+tracer = Tracer()
+
+
+def traced(run: Callable[..., str]) -> Callable[..., str]:
+    """Decorator for the `_run` method of a tool: one "tool" span per call, with the
+    keyword arguments' size as bytes_in and the result's as bytes_out.
+
+    Put it above @memoized so cache hits are traced too.
+    """
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs) -> str:
+        if not tracer.active:
+            return run(self, *args, **kwargs)
+        with tracer.span(self.name, "tool") as span:
+            span.bytes_in = sum(len(str(v)) for v in (*args, *kwargs.values()))
+            result = run(self, *args, **kwargs)
+            span.bytes_out = len(result)
+            if not result.startswith('{"ok": true'):
+                span.args["ok"] = False
+            return result
+
+    return wrapper
+
+
+def run_trace_path(directory: str, label: str, format: str = "jsonl") -> str:
+    """Per-run trace file name: <directory>/<label>-<timestamp>-<pid>.<jsonl|json>."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"{label}-{stamp}-{os.getpid()}.{'jsonl' if format == 'jsonl' else 'json'}")
+
+
+@contextmanager
+def trace_run(label: str = "run", directory: Optional[str] = None, format: Optional[str] = None,
+              track_memory: Optional[bool] = None) -> Iterator[Optional[str]]:
+    """Trace one run into its own file and yield the path.
+
+    Defaults come from FINANCE_CREW_TRACE_DIR (unset: no tracing),
+    FINANCE_CREW_TRACE_FORMAT ('jsonl' or 'chrome') and
+    FINANCE_CREW_TRACE_MEMORY ('0' turns peak memory tracking off).
+    LLM calls are traced through the crewai event bus.
+    """
+    directory = directory or os.getenv("FINANCE_CREW_TRACE_DIR")
+    if not directory:
+        yield None
+        return
+    format = format or os.getenv("FINANCE_CREW_TRACE_FORMAT", "jsonl")
+    if track_memory is None:
+        track_memory = os.getenv("FINANCE_CREW_TRACE_MEMORY", "1") != "0"
+    from .listener import install_llm_listener
+
+    install_llm_listener()
+    path = run_trace_path(directory, label, format)
+    tracer.start(path, format, track_memory)
+    try:
+        with tracer.span(label, "run"):
+            yield path
+    finally:
+        tracer.stop()
+
+
+def to_chrome(events: List[dict]) -> dict:
+    """Chrome trace-event JSON: one complete ('X') event per span, metrics under args."""
+    trace = []
+    for e in events:
+        args = dict(e.get("args", {}))
+        args.update({k: v for k, v in e.items() if k not in ("name", "cat", "ts", "dur", "pid", "tid", "args")})
+        trace.append({"name": e["name"], "cat": e["cat"], "ph": "X", "ts": e["ts"], "dur": e["dur"],
+                      "pid": e["pid"], "tid": e["tid"], "args": args})
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def load_trace(path: str) -> List[dict]:
+    """Spans from a trace file in either format."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith('{"traceEvents"'):
+        events = []
+        for e in json.loads(text)["traceEvents"]:
+            args = dict(e.get("args", {}))
+            metrics = {k: args.pop(k) for k in ("cpu_ms", "bytes_in", "bytes_out", "peak_bytes", "error",
+                                                "prompt_tokens", "completion_tokens", "total_tokens")
+                       if k in args}
+            events.append({"name": e["name"], "cat": e.get("cat", ""), "ts": e["ts"], "dur": e["dur"],
+                           "args": args, **metrics})
+        return events
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def summarize(events: List[dict], top: int = 15) -> List[dict]:
+    """Spans grouped by (category, name), hottest first by total wall time.
+    The enclosing 'run' span is left out so stages rank against each other."""
+    groups: Dict[tuple, dict] = {}
+    for e in events:
+        if e.get("cat") == "run":
+            continue
+        g = groups.setdefault((e.get("cat", ""), e["name"]), {
+            "category": e.get("cat", ""), "name": e["name"], "calls": 0, "errors": 0, "wall_ms": 0.0,
+            "max_ms": 0.0, "cpu_ms": 0.0, "bytes_in": 0, "bytes_out": 0, "peak_bytes": 0, "tokens": 0})
+        ms = e["dur"] / 1e3
+        g["calls"] += 1
+        g["errors"] += 1 if e.get("error") else 0
+        g["wall_ms"] += ms
+        g["max_ms"] = max(g["max_ms"], ms)
+        g["cpu_ms"] += e.get("cpu_ms", 0.0)
+        g["bytes_in"] += e.get("bytes_in", 0)
+        g["bytes_out"] += e.get("bytes_out", 0)
+        g["peak_bytes"] = max(g["peak_bytes"], e.get("peak_bytes", 0))
+        g["tokens"] += e.get("total_tokens", 0) or 0
+    rows = sorted(groups.values(), key=lambda g: -g["wall_ms"])[:top]
+    for g in rows:
+        g["wall_ms"], g["max_ms"], g["cpu_ms"] = round(g["wall_ms"], 3), round(g["max_ms"], 3), round(g["cpu_ms"], 3)
+    return rows
+
+
+def format_summary(rows: List[dict]) -> str:
+    """Plain-text table of summarize() output."""
+    header = f"{'stage':<40} {'calls':>5} {'wall ms':>10} {'max ms':>9} {'cpu ms':>9} " \
+             f"{'in KB':>9} {'out KB':>9} {'peak MB':>8} {'tokens':>7}"
+    lines = [header, "-" * len(header)]
+    for g in rows:
+        name = f"{g['category']}:{g['name']}"[:40]
+        lines.append(f"{name:<40} {g['calls']:>5} {g['wall_ms']:>10.1f} {g['max_ms']:>9.1f} {g['cpu_ms']:>9.1f} "
+                     f"{g['bytes_in'] / 1024:>9.1f} {g['bytes_out'] / 1024:>9.1f} "
+                     f"{g['peak_bytes'] / 2 ** 20:>8.1f} {g['tokens']:>7}")
+    return "\n".join(lines)
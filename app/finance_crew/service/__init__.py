@@ -0,0 +1,31 @@
+import importlib
+from typing import TYPE_CHECKING
+
+from .client import RemoteTool, WorkerClient, WorkerUnavailable, remote, schema_model
+
+if TYPE_CHECKING:
+    from .server import DEFAULT_HOST, DEFAULT_PORT, ToolWorker, WorkerServer, default_tools, serve
+
+# The server side needs every tool and its numeric stack; clients (the crew) should not pay for it.
+_SERVER = ("DEFAULT_HOST", "DEFAULT_PORT", "ToolWorker", "WorkerServer", "default_tools", "serve")
+
+
+def __getattr__(name: str):
+    if name in _SERVER:
+        return getattr(importlib.import_module(".server", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "DEFAULT_HOST",
+    "DEFAULT_PORT",
+    "RemoteTool",
+    "ToolWorker",
+    "WorkerClient",
+    "WorkerServer",
+    "WorkerUnavailable",
+    "default_tools",
+    "remote",
+    "schema_model",
+    "serve",
+]
@@ -0,0 +1,162 @@
+import http.client
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Type, Union
+from urllib.parse import urlsplit
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, create_model
+
+
+class WorkerUnavailable(ConnectionError):
+    """Raised when the worker cannot be reached or answers with a transport-level error."""
+
+
+class WorkerClient:
+    """Thin client of a running WorkerServer.
+
+    Each thread keeps one persistent HTTP connection, so a crew that calls
+    tools in a loop pays for the TCP handshake once. A dropped connection is
+    reopened and the request retried once.
+    """
+
+    def __init__(self, url: str, timeout: float = 600.0):
+        parts = urlsplit(url if "://" in url else f"http://{url}")
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"Worker URL must look like http://host:port, got {url!r}")
+        self.url = f"http://{parts.hostname}:{parts.port or 80}"
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+        self._tools: Optional[Dict[str, dict]] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["WorkerClient"]:
+        """Client of FINANCE_CREW_WORKER_URL, or None when it is not set."""
+        url = os.getenv("FINANCE_CREW_WORKER_URL")
+        return cls(url, timeout=float(os.getenv("FINANCE_CREW_WORKER_TIMEOUT", "600"))) if url else None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> str:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                text = response.read().decode("utf-8")
+            except (ConnectionError, http.client.HTTPException, OSError) as e:
+                self._drop_connection()
+                if attempt:
+                    raise WorkerUnavailable(f"Worker at {self.url} unreachable: {type(e).__name__}: {e}") from e
+                continue
+            if response.status >= 500:
+                raise WorkerUnavailable(f"Worker at {self.url} answered {response.status}: {text[:200]}")
+            return text
+        raise AssertionError("unreachable")
+
+    def call(self, tool: str, arguments: Dict[str, Any]) -> str:
+        """JSON result of one tool call, exactly as the tool returned it."""
+        return self.request("POST", f"/tools/{tool}", arguments)
+
+    def quant_pipeline(self, dataset_path: str, **arguments: str) -> dict:
+        """Summarized quant pipeline metrics; raises RuntimeError when the pipeline fails."""
+        result = json.loads(self.request("POST", "/pipelines/quant", {"dataset_path": dataset_path, **arguments}))
+        if not result.get("ok"):
+            raise RuntimeError(result.get("error", "quant pipeline failed"))
+        return result["metrics"]
+
+    def tools(self) -> Dict[str, dict]:
+        """{name: {"description", "schema"}} of the worker's tools, fetched once per client."""
+        if self._tools is None:
+            self._tools = json.loads(self.request("GET", "/tools"))["tools"]
+        return self._tools
+
+    def health(self) -> dict:
+        return json.loads(self.request("GET", "/health"))
+
+    def close(self) -> None:
+        self._drop_connection()
+
+
+_JSON_TYPES = {"string": str, "integer": int, "number": float, "boolean": bool, "array": list, "object": dict}
+# JSON schema numeric bounds and the Field arguments that emit them.
+_BOUNDS = {"minimum": "ge", "maximum": "le", "exclusiveMinimum": "gt", "exclusiveMaximum": "lt"}
+
+
+def _annotation(prop: Dict[str, Any]) -> Any:
+    if "anyOf" in prop:
+        options = [_annotation(p) for p in prop["anyOf"] if p.get("type") != "null"]
+        ann = Union[tuple(options)] if len(options) > 1 else options[0] if options else Any
+        return Optional[ann] if len(options) < len(prop["anyOf"]) else ann
+    return _JSON_TYPES.get(prop.get("type"), Any)
+
+
+def schema_model(schema: Dict[str, Any]) -> Type[BaseModel]:
+    """Pydantic model of a tool's JSON args schema, as the worker's /tools publishes it.
+
+    Field types, defaults, bounds and descriptions are rebuilt from the schema, so
+    the client validates and describes arguments without importing the tool.
+    """
+    required = set(schema.get("required", ()))
+    fields = {
+        name: (_annotation(prop), Field(... if name in required else prop.get("default"),
+                                        description=prop.get("description"),
+                                        **{arg: prop[key] for key, arg in _BOUNDS.items() if key in prop}))
+        for name, prop in schema.get("properties", {}).items()
+    }
+    return create_model(schema.get("title", "RemoteToolInput"), __doc__=schema.get("description"), **fields)
+
+
+class RemoteTool(BaseTool):
+    """A tool with the name, description and schema of a worker tool whose calls run on the worker.
+
+    Price handles returned by remote tools live in the worker's price store,
+    so every tool of a crew should be remote or none. If the worker cannot
+    be reached the call returns {"ok": false, ...} like any failed tool.
+    """
+
+    client: WorkerClient
+
+    @classmethod
+    def wrap(cls, tool: BaseTool, client: WorkerClient) -> "RemoteTool":
+        return cls(name=tool.name, description=tool.description, args_schema=tool.args_schema, client=client)
+
+    @classmethod
+    def from_worker(cls, name: str, client: WorkerClient) -> "RemoteTool":
+        """The worker's tool `name`, described from its /tools metadata; raises KeyError if it has none."""
+        spec = client.tools().get(name)
+        if spec is None:
+            raise KeyError(f"Worker at {client.url} has no tool {name!r}")
+        return cls(name=name, description=spec["description"], args_schema=schema_model(spec["schema"]),
+                   client=client)
+
+    def _run(self, **kwargs: Any) -> str:
+        try:
+            return self.client.call(self.name, kwargs)
+        except WorkerUnavailable as e:
+            return json.dumps({"ok": False, "error": str(e)})
+
+
+def remote(name: str, build: Callable[[], BaseTool], client: Optional[WorkerClient]) -> BaseTool:
+    """The worker's tool `name` with a client, otherwise the local tool from `build()`.
+
+    The local tool is only built without a client, so a crew whose tools run
+    on a worker imports none of them, nor pandas behind them.
+    """
+    return RemoteTool.from_worker(name, client) if client is not None else build()
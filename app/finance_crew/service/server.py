@@ -0,0 +1,244 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from crewai.tools import BaseTool
+from pydantic import ValidationError
+
+from app.finance_crew.analytics import covariance_cache
+from app.finance_crew.market_data import (
+    PriceCache,
+    PriceDownloader,
+    alignment_cache,
+    default_downloader,
+    price_store,
+)
+from app.finance_crew.tools.tool_cache import tool_cache
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Request bodies are tool arguments; prices travel as handles or binary payloads, so this is generous.
+MAX_BODY_BYTES = 256 * 2 ** 20
+
+
+def default_tools(downloader: Optional[PriceDownloader] = None,
+                  price_cache: Optional[PriceCache] = None) -> Dict[str, BaseTool]:
+    """Every numeric tool, built the way FinAssistCrew builds them, keyed by tool name."""
+    from app.finance_crew.tools.rebalancer import RebalancePortfolioTool
+    from app.finance_crew.tools.researcher_agent import (
+        AlignPricePanelTool,
+        ComputeMarketMetricsTool,
+        FetchYFinancePricesTool,
+        HoldingsWeightsTool,
+        ReadPortfolioTickersTool,
+    )
+    from app.finance_crew.tools.risk_analyst import (
+        BetaCorrelationTool,
+        BuildPortfolioReturnsTool,
+        ConcentrationMetricsTool,
+        CovarianceRiskTool,
+        DataQualityCheckTool,
+        ExposuresVsTargetTool,
+        PortfolioRiskMetricsTool,
+        RiskSuiteTool,
+        RollingRiskTool,
+        ScenarioVarTool,
+        StressTestTool,
+    )
+
+    downloader = downloader or default_downloader()
+    tools = [
+        ReadPortfolioTickersTool(),
+        FetchYFinancePricesTool(downloader=downloader,
+                                price_cache=price_cache or PriceCache.from_env(downloader)),
+        ComputeMarketMetricsTool(),
+        HoldingsWeightsTool(),
+        AlignPricePanelTool(),
+        BuildPortfolioReturnsTool(),
+        PortfolioRiskMetricsTool(),
+        ExposuresVsTargetTool(),
+        ConcentrationMetricsTool(),
+        BetaCorrelationTool(),
+        DataQualityCheckTool(),
+        ScenarioVarTool(),
+        CovarianceRiskTool(),
+        RollingRiskTool(),
+        StressTestTool(),
+        RiskSuiteTool(),
+        RebalancePortfolioTool(),
+    ]
+    return {t.name: t for t in tools}
+
+
+class ToolWorker:
+    """Runs tool calls by name against one set of warm tools and process-wide caches.
+
+    Arguments are validated with each tool's args_schema, as crewai does
+    before calling `_run`, so a remote call behaves like a local one. Tool
+    failures come back in the tools' own {"ok": false, ...} envelope.
+    """
+
+    def __init__(self, tools: Optional[Dict[str, BaseTool]] = None, downloader: Optional[PriceDownloader] = None,
+                 price_cache: Optional[PriceCache] = None):
+        self.downloader = downloader or default_downloader()
+        self.price_cache = price_cache if price_cache is not None else PriceCache.from_env(self.downloader)
+        self.tools = tools if tools is not None else default_tools(self.downloader, self.price_cache)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Dict[str, float]] = {}
+
+    def _count(self, name: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            c = self._calls.setdefault(name, {"calls": 0, "errors": 0, "seconds": 0.0})
+            c["calls"] += 1
+            c["errors"] += 0 if ok else 1
+            c["seconds"] += seconds
+
+    def call(self, name: str, arguments: Dict[str, Any]) -> Tuple[int, str]:
+        """(HTTP status, result JSON) of one tool call."""
+        tool = self.tools.get(name)
+        if tool is None:
+            return 404, json.dumps({"ok": False, "error": f"Unknown tool: {name}"})
+        start = time.perf_counter()
+        try:
+            if tool.args_schema is not None:
+                arguments = tool.args_schema(**arguments).model_dump()
+            result = tool._run(**arguments)
+        except ValidationError as e:
+            result = json.dumps({"ok": False, "error": f"Invalid arguments for {name}: {e}"})
+        except Exception as e:
+            result = json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
+        self._count(name, time.perf_counter() - start, result.startswith('{"ok": true'))
+        return 200, result
+
+    def quant_pipeline(self, arguments: Dict[str, Any]) -> str:
+        """Summarized metrics of the deterministic quant pipeline, run with the worker's warm price cache."""
+        from app.finance_crew.pipeline import run_quant_pipeline
+
+        start = time.perf_counter()
+        try:
+            kwargs = {k: str(arguments[k]) for k in ("benchmark", "period", "interval") if k in arguments}
+            metrics = run_quant_pipeline(str(arguments["dataset_path"]), downloader=self.downloader,
+                                         price_cache=self.price_cache, **kwargs)
+            result = json.dumps({"ok": True, "metrics": metrics})
+        except KeyError as e:
+            result = json.dumps({"ok": False, "error": f"Missing argument: {e.args[0]}"})
+        except Exception as e:
+            result = json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
+        self._count("quant_pipeline", time.perf_counter() - start, result.startswith('{"ok": true'))
+        return result
+
+    def health(self) -> dict:
+        with self._lock:
+            calls = {name: dict(c, seconds=round(c["seconds"], 6)) for name, c in self._calls.items()}
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 3),
+            "tools": sorted(self.tools),
+            "calls": calls,
+            "price_panels": len(price_store),
+            "aligned_panels": len(alignment_cache),
+            "covariance_models": len(covariance_cache),
+            "tool_cache": tool_cache.stats(),
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "WorkerServer"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: str) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send(status, json.dumps({"ok": False, "error": message}))
+
+    def do_GET(self) -> None:
+        worker = self.server.worker
+        if self.path == "/health":
+            self._send(200, json.dumps(worker.health()))
+        elif self.path == "/tools":
+            self._send(200, json.dumps({
+                "ok": True,
+                "tools": {name: {"description": t.description,
+                                 "schema": t.args_schema.model_json_schema() if t.args_schema else {}}
+                          for name, t in sorted(worker.tools.items())},
+            }))
+        else:
+            self._error(404, f"Unknown path: {self.path}")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._error(413, f"Request body over {MAX_BODY_BYTES} bytes")
+            return
+        try:
+            arguments = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(arguments, dict):
+                raise ValueError("body must be a JSON object of arguments")
+        except ValueError as e:
+            self._error(400, f"Invalid request body: {e}")
+            return
+
+        if self.path.startswith("/tools/"):
+            self._send(*self.server.worker.call(self.path[len("/tools/"):], arguments))
+        elif self.path == "/pipelines/quant":
+            self._send(200, self.server.worker.quant_pipeline(arguments))
+        else:
+            self._error(404, f"Unknown path: {self.path}")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class WorkerServer(ThreadingHTTPServer):
+    """Local HTTP front end of a ToolWorker; each connection is served on its own thread.
+
+    POST /tools/<name>      JSON object of tool arguments -> the tool's JSON result
+    POST /pipelines/quant   {"dataset_path", ["benchmark", "period", "interval"]} -> {"ok", "metrics"}
+    GET  /tools             tool names, descriptions and JSON argument schemas
+    GET  /health            uptime, call counters and cache sizes
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, worker: Optional[ToolWorker] = None,
+                 verbose: bool = False):
+        self.worker = worker or ToolWorker()
+        self.verbose = verbose
+        super().__init__((host, port), _Handler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start_background(self) -> threading.Thread:
+        """Serve on a daemon thread (for tests and benchmarks); stop with shutdown()."""
+        thread = threading.Thread(target=self.serve_forever, name="finance-crew-worker", daemon=True)
+        thread.start()
+        return thread
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, verbose: bool = True) -> None:
+    """Run the worker until interrupted. Defaults come from FINANCE_CREW_WORKER_HOST / _PORT."""
+    host = host or os.getenv("FINANCE_CREW_WORKER_HOST", DEFAULT_HOST)
+    port = port if port is not None else int(os.getenv("FINANCE_CREW_WORKER_PORT", str(DEFAULT_PORT)))
+    with WorkerServer(host, port, verbose=verbose) as server:
+        print(f"Finance crew worker serving {len(server.worker.tools)} tools on {server.url}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,39 @@
+import importlib
+import sys
+import types
+from typing import Any, Callable, List, Sequence, Tuple
+
+
+class _ToolPackage(types.ModuleType):
+    """Module type of a lazy tool package.
+
+    Each tool lives in a submodule named after its class, and the import
+    system binds a submodule on its package once loaded, whoever imported
+    it. Binding the class instead keeps `package.Tool` the class either way.
+    """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if isinstance(value, types.ModuleType) and name in getattr(self, "__all__", ()):
+            value = getattr(value, name, value)
+        super().__setattr__(name, value)
+
+
+def lazy_tools(package: str, names: Sequence[str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """(__getattr__, __dir__) for a tool package whose tools are imported on first access (PEP 562).
+
+    `names` are the tool classes, one per same-named submodule of `package`.
+    """
+    module = sys.modules[package]
+    module.__class__ = _ToolPackage
+    tools = frozenset(names)
+
+    def __getattr__(name: str) -> Any:
+        if name not in tools:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        importlib.import_module(f"{package}.{name}")
+        return module.__dict__[name]
+
+    def __dir__() -> List[str]:
+        return sorted(set(module.__dict__) | tools)
+
+    return __getattr__, __dir__
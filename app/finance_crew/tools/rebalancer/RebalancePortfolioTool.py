@@ -0,0 +1,47 @@
+from crewai.tools import BaseTool
+from typing import Type
+from pydantic import BaseModel, Field
+import json
+import os
+
+from app.finance_crew.market_data import PricesPayloadError, load_price_panel
+from app.finance_crew.portfolio import CASH_CLASS, RebalanceConstraints, rebalance_holdings, scan_holdings
+from app.finance_crew.profiling import traced
+
+class RebalancePortfolioInput(BaseModel):
+    """Input schema for the constrained rebalancing optimizer."""
+    dataset_path: str = Field(..., description="Path of the holdings CSV/Parquet (ticker, quantity, asset_class, target_weight).")
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
+    max_weight: float = Field(0.35, description="Maximum weight of any single non-cash ticker (default 0.35).")
+    min_cash: float = Field(0.02, description="Minimum cash weight when the portfolio holds cash (default 0.02).")
+    cash_class: str = Field(CASH_CLASS, description="Asset class treated as cash (valued at 1.0 per unit).")
+
+class RebalancePortfolioTool(BaseTool):
+    name: str = "optimize_rebalance"
+    description: str = (
+        "Compute the trades that bring the portfolio closest to its target weights while respecting the "
+        "constraints: max weight per ticker, min cash, no short positions. Returns JSON with "
+        "suggested_trades {ticker: whole-share delta (cash in currency units)}, current/target/optimal/proposed "
+        "weights, tracking error before and after, and turnover."
+    )
+    args_schema: Type[BaseModel] = RebalancePortfolioInput
+
+    @traced
+    def _run(self, dataset_path: str, prices_json: str, max_weight: float = 0.35, min_cash: float = 0.02,
+             cash_class: str = CASH_CLASS) -> str:
+        try:
+            if not os.path.exists(dataset_path):
+                return json.dumps({"ok": False, "error": f"File not found: {dataset_path}"})
+            panel = load_price_panel(prices_json)
+            holdings = scan_holdings(dataset_path).holdings
+            constraints = RebalanceConstraints(max_weight=max_weight, min_cash=min_cash, cash_class=cash_class)
+            plan = rebalance_holdings(holdings, panel, constraints)
+            return json.dumps({
+                "ok": True,
+                **plan.to_dict(),
+                "constraints": {"max_weight": max_weight, "min_cash": min_cash, "no_shorts": True},
+            })
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e:
+            return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
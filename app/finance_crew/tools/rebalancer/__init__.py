@@ -0,0 +1,13 @@
+from typing import TYPE_CHECKING
+
+from app.finance_crew.tools.lazy import lazy_tools
+
+if TYPE_CHECKING:
+    from .RebalancePortfolioTool import RebalancePortfolioTool
+
+__all__ = [
+    "RebalancePortfolioTool",
+]
+
+# Tools (and pandas, crewai, ... behind them) are imported on first access.
+__getattr__, __dir__ = lazy_tools(__name__, __all__)
@@ -0,0 +1,72 @@
+from crewai.tools import BaseTool
+from typing import Type
+from pydantic import BaseModel, Field
+import json
+
+from app.finance_crew.market_data import (
+    AlignmentConfig,
+    PricesPayloadError,
+    alignment_cache,
+    handle_payload,
+    load_price_panel,
+    price_store,
+)
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
+
+class AlignPricePanelInput(BaseModel):
+    """Input schema for aligning prices to one calendar and filling gaps."""
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
+    fill: str = Field("ffill", description="Gap policy: 'ffill', 'interpolate', 'drop' (dates with any gap) or 'none'.")
+    limit: int = Field(5, description="Longest gap in bars that ffill/interpolate may fill (0 = no limit).")
+    calendar: str = Field(
+        "union", description="'union' (all dates), 'common' (dates every listed ticker traded), 'business' "
+                             "(every weekday) or a ticker whose trading days to use, e.g. the benchmark.")
+    stale_run: int = Field(5, description="Identical consecutive prices that count as a stale run.")
+    outlier_z: float = Field(8.0, description="Robust z-score above which a daily jump is an outlier.")
+    output_format: str = Field("handle", description="'handle' (default), 'json' or 'binary' for the aligned prices.")
+
+class AlignPricePanelTool(BaseTool):
+    name: str = "align_price_panel"
+    description: str = (
+        "Align prices to one calendar, fill gaps (forward-fill with a limit, interpolate, or drop dates) and "
+        "report per-ticker data quality: gaps, stale runs and outlier jumps. Returns the aligned prices "
+        "(a handle by default) to pass as prices_json to the other tools."
+    )
+    args_schema: Type[BaseModel] = AlignPricePanelInput
+
+    @traced
+    def _run(self, prices_json: str, fill: str = "ffill", limit: int = 5, calendar: str = "union",
+             stale_run: int = 5, outlier_z: float = 8.0, output_format: str = "handle") -> str:
+        # A handle only resolves while price_store holds the panel, which a cached result can outlive
+        # (eviction, clear(), a disk-tier hit after a restart). Handles are not memoized; alignment_cache
+        # still spares the realignment and the panel is put back in the store on every call.
+        run = self._align if output_format == "handle" else self._align_memoized
+        return run(prices_json, fill=fill, limit=limit, calendar=calendar, stale_run=stale_run,
+                   outlier_z=outlier_z, output_format=output_format)
+
+    def _align(self, prices_json: str, fill: str = "ffill", limit: int = 5, calendar: str = "union",
+               stale_run: int = 5, outlier_z: float = 8.0, output_format: str = "handle") -> str:
+        try:
+            if output_format not in ("json", "binary", "handle"):
+                return json.dumps({"ok": False, "error": f"Unknown output_format '{output_format}'."})
+            panel = load_price_panel(prices_json)
+            config = AlignmentConfig(fill=fill, limit=limit, calendar=calendar, stale_run=stale_run,
+                                     outlier_z=outlier_z)
+            aligned = alignment_cache.get_or_align(panel, config)
+            if output_format == "handle":
+                payload = handle_payload(price_store.put(aligned.panel), aligned.panel)
+            elif output_format == "binary":
+                payload = aligned.panel.to_binary_payload()
+            else:
+                payload = aligned.panel.to_payload()
+            quality = aligned.quality
+            payload["quality"] = quality.summary()
+            payload["flagged"] = {t: quality.ticker(t) for t in quality.flagged()}
+            return json.dumps(payload)
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e:
+            return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+    _align_memoized = memoized(_align)
@@ -1,12 +1,23 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Optional, Type
 from pydantic import BaseModel, Field
 import json
 import math
+import numpy as np
+
+from app.finance_crew.analytics import MarketMetricsState, price_moments, shard_pool
+from app.finance_crew.market_data import PricesPayloadError, load_price_panel
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
 
 class ComputeMetricsInput(BaseModel):
     """Input schema for computing market metrics."""
-    prices_json: str = Field(..., description="JSON with 'index' and 'data' (as returned by fetch_yfinance_prices).")
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (as returned by fetch_yfinance_prices), or a price handle.")
+    checkpoint_json: Optional[str] = Field(
+        None,
+        description="Checkpoint returned by a previous call ('{}' to start one). Only bars dated after "
+                    "the checkpoint are consumed, and an updated 'checkpoint' is returned.",
+    )
 
 
 class ComputeMarketMetricsTool(BaseTool):
@@ -17,47 +28,42 @@ class ComputeMarketMetricsTool(BaseTool):
     )
     args_schema: Type[BaseModel] = ComputeMetricsInput
 
-    def _run(self, prices_json: str) -> str:
+    @traced
+    @memoized
+    def _run(self, prices_json: str, checkpoint_json: Optional[str] = None) -> str:
         try:
-            obj = json.loads(prices_json)
-            if not obj.get("ok", False):
-                return json.dumps({"ok": False, "error": obj.get("error", "prices_json not ok")})
-            index = obj.get("index", [])
-            data = obj.get("data", {})
-            if not index or not isinstance(data, dict):
+            panel = load_price_panel(prices_json)
+            if panel.n_dates == 0:
                 return json.dumps({"ok": False, "error": "Invalid prices_json structure."})
+            if checkpoint_json is not None:
+                checkpoint = json.loads(checkpoint_json or "{}")
+                state = MarketMetricsState.from_dict(checkpoint) if checkpoint \
+                    else MarketMetricsState(panel.tickers)
+                state = state.align(panel.tickers)
+                start = 0
+                if state.last_date is not None:
+                    start = next((i for i, d in enumerate(panel.dates) if d > state.last_date), panel.n_dates)
+                state.update(panel.values[start:], panel.dates[start:])
+                return json.dumps({"ok": True, "metrics": state.metrics(), "checkpoint": state.to_dict()})
+
             result = {}
             trading_days = 252.0
+            last, n_prices, n_rets, mean, std = shard_pool.map(price_moments, panel.values)
 
-            for ticker, series in data.items():
-                prices = [float(x) for x in series if x is not None]
-                if len(prices) < 2:
-                    result[ticker] = {"last_price": (prices[-1] if prices else None),
-                                      "mean_ret": None, "ann_vol": None}
-                    continue
-
-                last_price = prices[-1]
-                rets = []
-                for i in range(1, len(prices)):
-                    p0, p1 = prices[i-1], prices[i]
-                    if p0 and p0 > 0:
-                        rets.append((p1 - p0) / p0)
-                if len(rets) == 0:
+            for j, ticker in enumerate(panel.tickers):
+                last_price = None if np.isnan(last[j]) else float(last[j])
+                if n_prices[j] < 2 or n_rets[j] == 0:
                     result[ticker] = {"last_price": last_price, "mean_ret": None, "ann_vol": None}
                     continue
 
-                mean_ret = sum(rets) / len(rets)
-                mu = mean_ret
-                var = sum((r - mu) ** 2 for r in rets) / (len(rets) - 1) if len(rets) > 1 else 0.0
-                std = math.sqrt(var)
-                ann_vol = std * math.sqrt(trading_days)
-
                 result[ticker] = {
                     "last_price": round(last_price, 6),
-                    "mean_ret": round(mean_ret, 8),
-                    "ann_vol": round(ann_vol, 6),
+                    "mean_ret": round(float(mean[j]), 8),
+                    "ann_vol": round(float(std[j]) * math.sqrt(trading_days), 6),
                 }
 
             return json.dumps({"ok": True, "metrics": result})
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
         except Exception as e:
             return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
@@ -1,51 +1,94 @@
 from crewai.tools import BaseTool
-from typing import Type, List
+from typing import Type, List, Optional
 from pydantic import BaseModel, Field
-import pandas as pd
-import yfinance as yf
+from datetime import date
+import hashlib
 import json
+import os
+import tempfile
+
+from app.finance_crew.market_data import (
+    PriceCache,
+    PriceDownloader,
+    fetch_panel_file,
+    fetch_price_panel,
+    handle_payload,
+    price_store,
+)
+from app.finance_crew.profiling import traced
+
+
+def default_panel_path(tickers: List[str], period: str, interval: str) -> str:
+    """Panel file for this request under FINANCE_CREW_PANEL_DIR (default: the temp dir), one per day."""
+    directory = os.getenv("FINANCE_CREW_PANEL_DIR") or os.path.join(tempfile.gettempdir(), "finance_crew_panels")
+    name = hashlib.blake2b(json.dumps([tickers, period, interval, date.today().isoformat()]).encode(),
+                           digest_size=8).hexdigest()
+    return os.path.join(directory, name)
 
 class FetchPricesInput(BaseModel):
     """Input schema for fetching historical prices via yfinance."""
     tickers_json: str = Field(..., description="JSON array of tickers, e.g. '[\"AAPL\",\"MSFT\"]'.")
     period: str = Field("1y", description="yfinance period, e.g. '6mo', '1y', '2y'.")
     interval: str = Field("1d", description="yfinance interval, e.g. '1d', '1wk', '1mo'.")
+    output_format: str = Field(
+        "json",
+        description="'json' returns prices inline; 'binary' returns them inline as one base64 float64 "
+                    "buffer (much smaller and faster to parse); 'handle' keeps them in the in-process price "
+                    "store and returns a short handle; 'file' writes them to a memory-mapped panel file "
+                    "and returns a handle. The other tools accept all of these as prices_json, but only "
+                    "compute_market_metrics and compute_beta_and_correlations stream a panel file from disk; "
+                    "the rest load the whole panel into memory.",
+    )
+    panel_path: Optional[str] = Field(
+        None,
+        description="Where output_format='file' writes the panel (default: under FINANCE_CREW_PANEL_DIR).",
+    )
 
 class FetchYFinancePricesTool(BaseTool):
     name: str = "fetch_yfinance_prices"
     description: str = (
         "Download historical adjusted close prices with yfinance for the given tickers/period/interval. "
-        "Returns JSON with 'index' (ISO dates) and 'data' (dict[ticker]->list of prices)."
+        "Returns JSON with 'index' (ISO dates) and 'data' (dict[ticker]->list of prices). "
+        "With output_format='binary' the prices come as one base64 float64 buffer, with "
+        "output_format='handle' as a small JSON with a 'handle' usable as prices_json, and with "
+        "output_format='file' the same after writing them to an on-disk panel file (streamed from disk only by "
+        "compute_market_metrics and compute_beta_and_correlations; other tools load it whole)."
     )
     args_schema: Type[BaseModel] = FetchPricesInput
+    downloader: Optional[PriceDownloader] = None
+    price_cache: Optional[PriceCache] = None
 
-    def _run(self, tickers_json: str, period: str = "1y", interval: str = "1d") -> str:
+    @traced
+    def _run(self, tickers_json: str, period: str = "1y", interval: str = "1d",
+             output_format: str = "json", panel_path: Optional[str] = None) -> str:
         try:
             tickers = json.loads(tickers_json)
             if not isinstance(tickers, list) or not all(isinstance(t, str) for t in tickers):
                 return json.dumps({"ok": False, "error": "tickers_json must be a JSON array of strings."})
+            if output_format not in ("json", "binary", "handle", "file"):
+                return json.dumps({"ok": False, "error": f"Unknown output_format '{output_format}'."})
 
-            data = yf.download(
-                tickers, period=period, interval=interval,
-                auto_adjust=True, progress=False, group_by="ticker"
-            )
-            if "Close" in data:
-                prices = data["Close"].copy()
+            if output_format == "file":
+                panel_path = panel_path or default_panel_path(tickers, period, interval)
+                fetched = fetch_panel_file(tickers, panel_path, period=period, interval=interval,
+                                           downloader=self.downloader, price_cache=self.price_cache)
             else:
-                prices = data["Adj Close"].to_frame(name=tickers[0]) if "Adj Close" in data\
-                    else data["Close"].to_frame(name=tickers[0])
-
-            if isinstance(prices.columns, pd.MultiIndex):
-                prices.columns = [c[0] for c in prices.columns]
-
-            prices = prices.dropna(how="all")
-            prices = prices.sort_index()
-
-            payload = {
-                "ok": True,
-                "index": [i.strftime("%Y-%m-%d") for i in prices.index],
-                "data": {col: [None if pd.isna(v) else float(v) for v in prices[col].tolist()] for col in prices.columns}
-            }
+                fetched = fetch_price_panel(tickers, period=period, interval=interval,
+                                            downloader=self.downloader, price_cache=self.price_cache)
+            panel = fetched.panel
+            if output_format == "file":
+                payload = handle_payload(price_store.put(panel), panel)
+                payload["path"] = panel_path
+            elif output_format == "handle":
+                payload = handle_payload(price_store.put(panel), panel)
+            elif output_format == "binary":
+                payload = panel.to_binary_payload()
+            else:
+                payload = panel.to_payload()
+            if fetched.cache_status is not None:
+                payload["cache"] = fetched.cache_status
+            if fetched.failed:
+                payload["failed"] = fetched.failed
             return json.dumps(payload)
         except Exception as e:
             return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
@@ -0,0 +1,39 @@
+from crewai.tools import BaseTool
+from typing import Type
+from pydantic import BaseModel, Field
+import json
+import os
+
+from app.finance_crew.market_data import PricesPayloadError, load_price_panel
+from app.finance_crew.portfolio import CASH_CLASS, scan_holdings, value_holdings
+from app.finance_crew.profiling import traced
+
+class HoldingsWeightsInput(BaseModel):
+    """Input schema for valuing holdings and computing current weights."""
+    dataset_path: str = Field(..., description="Path of the holdings CSV/Parquet (ticker, quantity, asset_class, target_weight).")
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
+    cash_class: str = Field(CASH_CLASS, description="Asset class valued at 1.0 per unit instead of a market price.")
+
+class HoldingsWeightsTool(BaseTool):
+    name: str = "compute_holdings_weights"
+    description: str = (
+        "Value the portfolio holdings (quantity x last price; cash at 1.0 per unit) and compute current weights. "
+        "Returns JSON with 'weights', 'target_weights' and 'asset_map' ready to pass as weights_json, "
+        "target_weights_json and asset_map_json, plus market_values, total_value, unpriced tickers and as_of date."
+    )
+    args_schema: Type[BaseModel] = HoldingsWeightsInput
+    chunk_rows: int = 1_000_000
+
+    @traced
+    def _run(self, dataset_path: str, prices_json: str, cash_class: str = CASH_CLASS) -> str:
+        try:
+            if not os.path.exists(dataset_path):
+                return json.dumps({"ok": False, "error": f"File not found: {dataset_path}"})
+            panel = load_price_panel(prices_json)
+            holdings = scan_holdings(dataset_path, chunk_rows=self.chunk_rows).holdings
+            valuation = value_holdings(holdings, panel, cash_class=cash_class)
+            return json.dumps({"ok": True, **valuation.to_dict()})
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e:
+            return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
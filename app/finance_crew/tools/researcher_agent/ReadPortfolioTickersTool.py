@@ -1,32 +1,42 @@
 from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
-import pandas as pd
 import json
 import os
 
+from app.finance_crew.portfolio import scan_holdings
+from app.finance_crew.profiling import traced
+
 class ReadPortfolioInput(BaseModel):
     """Input schema for reading a portfolio CSV."""
     ticker_column: str = Field("ticker", description="Name of the column that contains tickers.")
+    aggregate: bool = Field(
+        False, description="If true, also return quantity, target_weight and asset_class aggregated by ticker.")
 
 class ReadPortfolioTickersTool(BaseTool):
     name: str = "read_portfolio_tickers"
     description: str = (
-        "Read a portfolio CSV and extract the unique tickers. "
-        "The CSV must contain at least a 'ticker' column (configurable via ticker_column). "
-        "Returns a JSON string: { 'tickers': [..], 'row_count': N }."
+        "Read a portfolio CSV (or Parquet) file and extract the unique tickers. "
+        "The file must contain at least a 'ticker' column (configurable via ticker_column). "
+        "Returns a JSON string: { 'tickers': [..], 'row_count': N }, plus 'holdings' "
+        "{ticker: {quantity, target_weight, asset_class}} when aggregate is true."
     )
     args_schema: Type[BaseModel] = ReadPortfolioInput
+    chunk_rows: int = 1_000_000
 
+    @traced
     def _run(self, dataset_path: str = "/Users/tommasobiganzoli/Desktop/finance_crew/app/data/portfolio.csv",
-             ticker_column: str = "ticker") -> str:
+             ticker_column: str = "ticker", aggregate: bool = False) -> str:
         try:
             if not os.path.exists(dataset_path):
                 return json.dumps({"ok": False, "error": f"File not found: {dataset_path}"})
-            df = pd.read_csv(dataset_path)
-            if ticker_column not in df.columns:
+            try:
+                scan = scan_holdings(dataset_path, ticker_column, aggregate=aggregate, chunk_rows=self.chunk_rows)
+            except KeyError:
                 return json.dumps({"ok": False, "error": f"Missing column '{ticker_column}' in CSV."})
-            tickers = sorted([str(t).strip() for t in df[ticker_column].dropna().unique()])
-            return json.dumps({"ok": True, "tickers": tickers, "row_count": int(len(df))})
+            result = {"ok": True, "tickers": scan.tickers, "row_count": scan.row_count}
+            if aggregate:
+                result["holdings"] = json.loads(scan.holdings.to_json(orient="index"))
+            return json.dumps(result)
         except Exception as e:
             return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
@@ -1,9 +1,21 @@
-from .ReadPortfolioTickersTool import ReadPortfolioTickersTool
-from .FetchYFinancePricesTool import FetchYFinancePricesTool
-from .ComputeMarketMetricsTool import ComputeMarketMetricsTool
+from typing import TYPE_CHECKING
+
+from app.finance_crew.tools.lazy import lazy_tools
+
+if TYPE_CHECKING:
+    from .ReadPortfolioTickersTool import ReadPortfolioTickersTool
+    from .FetchYFinancePricesTool import FetchYFinancePricesTool
+    from .ComputeMarketMetricsTool import ComputeMarketMetricsTool
+    from .HoldingsWeightsTool import HoldingsWeightsTool
+    from .AlignPricePanelTool import AlignPricePanelTool
 
 __all__ = [
     "ReadPortfolioTickersTool",
     "FetchYFinancePricesTool",
     "ComputeMarketMetricsTool",
+    "HoldingsWeightsTool",
+    "AlignPricePanelTool",
 ]
+
+# Tools (and pandas, crewai, ... behind them) are imported on first access.
+__getattr__, __dir__ = lazy_tools(__name__, __all__)
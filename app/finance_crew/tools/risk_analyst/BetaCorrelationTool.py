@@ -2,92 +2,95 @@ from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
 import json
+import numpy as np
+
+from app.finance_crew.analytics import correlation_matrix, price_beta_correlation, shard_pool, simple_returns
+from app.finance_crew.market_data import PricesPayloadError, load_aligned_panel
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
 
 class BetaCorrelationInput(BaseModel):
     """Compute per-ticker beta vs benchmark and portfolio beta."""
-    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list).")
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
     weights_json: str = Field(..., description="JSON dict {ticker: weight}.")
     benchmark: str = Field(..., description="Benchmark ticker present in prices_json data.")
+    include_matrix: bool = Field(False, description="If true, also return the full ticker x ticker correlation matrix.")
+    rolling_window: int = Field(0, ge=0, description="If >= 2, also return rolling betas over this many trading days (0 disables).")
+    fill: str = Field("none", description="Gap policy applied first by the shared alignment stage: 'ffill', "
+                                           "'interpolate', 'drop' or 'none' (raw prices).")
+
+def _rounded(values):
+    return [None if v != v else round(v, 6) for v in values.tolist()]
 
 class BetaCorrelationTool(BaseTool):
     name: str = "compute_beta_and_correlations"
     description: str = (
         "Compute per-ticker beta vs benchmark and approximate portfolio beta via weighted average. "
-        "Also returns correlation of each ticker vs benchmark."
+        "Also returns correlation of each ticker vs benchmark, optionally the full correlation matrix "
+        "and rolling betas. Returns are aligned by date."
     )
     args_schema: Type[BaseModel] = BetaCorrelationInput
 
-    def _run(self, prices_json: str, weights_json: str, benchmark: str) -> str:
+    @traced
+    @memoized
+    def _run(self, prices_json: str, weights_json: str, benchmark: str,
+             include_matrix: bool = False, rolling_window: int = 0, fill: str = "none") -> str:
         try:
-            obj = json.loads(prices_json)
-            if not obj.get("ok", False):
-                return json.dumps({"ok": False, "error": obj.get("error", "prices_json not ok")})
-            data = obj.get("data", {})
+            if rolling_window != 0 and rolling_window < 2:
+                return json.dumps({"ok": False, "error": "rolling_window must be 0 (off) or >= 2 trading days."})
+            panel = load_aligned_panel(prices_json, fill)
             weights = json.loads(weights_json)
 
-            if benchmark not in data:
+            if benchmark not in panel:
                 return json.dumps({"ok": False, "error": f"Benchmark '{benchmark}' not in prices data."})
 
-            def series_to_returns(series):
-                rets = []
-                prev = None
-                for v in series:
-                    if v is None or prev is None or prev == 0:
-                        prev = v
-                        continue
-                    rets.append((float(v)-float(prev))/float(prev))
-                    prev = v
-                return rets
-
-            bench_rets = series_to_returns(data[benchmark])
-            if len(bench_rets) < 3:
+            bench_rets = simple_returns(panel.values[:, [panel.position(benchmark)]])[:, 0]
+            bench_valid = bench_rets[~np.isnan(bench_rets)]
+            if len(bench_valid) < 3:
                 return json.dumps({"ok": False, "error": "Not enough benchmark data to compute beta."})
-
-            import statistics
-            vb = statistics.pvariance(bench_rets)
-            if vb == 0:
+            if bench_valid.var() == 0:
                 return json.dumps({"ok": False, "error": "Zero variance on benchmark returns."})
 
-            betas = {}
-            cors = {}
-            for t, series in data.items():
-                if t == benchmark:
-                    continue
-                r = series_to_returns(series)
-                n = min(len(r), len(bench_rets))
-                if n < 3:
-                    betas[t] = None
-                    cors[t] = None
-                    continue
-                r = r[-n:]
-                b = bench_rets[-n:]
-                mu_r = statistics.mean(r)
-                mu_b = statistics.mean(b)
-                cov = sum((ri-mu_r)*(bi-mu_b) for ri, bi in zip(r, b))/n
-                beta = cov/vb if vb != 0 else None
-                try:
-                    import math
-                    vr = statistics.pvariance(r)
-                    corr = cov / math.sqrt(vr*vb) if vr > 0 and vb > 0 else None
-                except Exception:
-                    corr = None
-                betas[t] = None if beta is None else float(beta)
-                cors[t] = None if corr is None else float(corr)
+            tickers = [t for t in panel.tickers if t != benchmark]
+            cols = [panel.position(t) for t in tickers]
+            # The benchmark column is sharded along with the rest and dropped after.
+            sharded = shard_pool.map(price_beta_correlation, panel.values, bench_rets, rolling_window)
+            beta, corr = sharded[0][cols], sharded[1][cols]
+            raw_betas = dict(zip(tickers, beta.tolist()))
+            betas = dict(zip(tickers, _rounded(beta)))
+            cors = dict(zip(tickers, _rounded(corr)))
 
             bsum = 0.0
             wsum = 0.0
             for t, w in weights.items():
-                if t in betas and betas[t] is not None:
-                    bsum += float(w)*float(betas[t])
+                if t in raw_betas and raw_betas[t] == raw_betas[t]:
+                    bsum += float(w)*raw_betas[t]
                     wsum += float(w)
             portfolio_beta = (bsum/wsum) if wsum > 0 else None
 
-            return json.dumps({
+            result = {
                 "ok": True,
-                "betas": {t: (None if v is None else round(float(v), 6)) for t, v in betas.items()},
-                "correlations_vs_benchmark": {t: (None if v is None else round(float(v), 6)) for t, v in cors.items()},
+                "betas": betas,
+                "correlations_vs_benchmark": cors,
                 "portfolio_beta": (None if portfolio_beta is None else round(float(portfolio_beta), 6)),
                 "benchmark": benchmark
-            })
+            }
+            if include_matrix:
+                matrix = correlation_matrix(simple_returns(panel.values))
+                result["correlation_matrix"] = {
+                    "tickers": list(panel.tickers),
+                    "values": [_rounded(row) for row in matrix],
+                }
+            if rolling_window > 0:
+                rolling = sharded[3][:, cols]
+                start = rolling_window - 1
+                result["rolling_betas"] = {
+                    "window": rolling_window,
+                    "index": list(panel.dates[1 + start:]),
+                    "betas": {t: _rounded(rolling[start:, j]) for j, t in enumerate(tickers)},
+                }
+            return json.dumps(result)
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
         except Exception as e:
             return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
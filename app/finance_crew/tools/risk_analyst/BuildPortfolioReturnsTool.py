@@ -2,11 +2,21 @@ from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
 import json
+import numpy as np
+
+from app.finance_crew.analytics import normalize_weights, portfolio_returns, simple_returns
+from app.finance_crew.market_data import PricesPayloadError, load_aligned_panel, returns_payload
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
 
 class BuildPortfolioReturnsInput(BaseModel):
     """Input schema to compute portfolio daily returns from prices and weights."""
-    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list).")
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
     weights_json: str = Field(..., description="JSON dict {ticker: weight} that sums approx to 1.0.")
+    output_format: str = Field(
+        "json", description="'json' for inline lists, 'binary' for base64 float64 buffers ('format': 'npb64').")
+    fill: str = Field("none", description="Gap policy applied first by the shared alignment stage: 'ffill', "
+                                           "'interpolate', 'drop' or 'none' (raw prices).")
 
 class BuildPortfolioReturnsTool(BaseTool):
     name: str = "build_portfolio_returns"
@@ -16,63 +26,29 @@ class BuildPortfolioReturnsTool(BaseTool):
     )
     args_schema: Type[BaseModel] = BuildPortfolioReturnsInput
 
-    def _run(self, prices_json: str, weights_json: str) -> str:
+    @traced
+    @memoized
+    def _run(self, prices_json: str, weights_json: str, output_format: str = "json",
+             fill: str = "none") -> str:
         try:
-            obj = json.loads(prices_json)
-            if not obj.get("ok", False):
-                return json.dumps({"ok": False, "error": obj.get("error", "prices_json not ok")})
-            dates = obj.get("index", [])
-            data = obj.get("data", {})
+            if output_format not in ("json", "binary"):
+                return json.dumps({"ok": False, "error": f"Unknown output_format '{output_format}'."})
+            panel = load_aligned_panel(prices_json, fill)
+            dates = list(panel.dates)
             weights = json.loads(weights_json)
 
-            tickers = [t for t in data.keys() if t in weights and weights[t] is not None]
+            tickers = [t for t in panel.tickers if t in weights and weights[t] is not None]
             if not tickers:
                 return json.dumps({"ok": False, "error": "No overlapping tickers between prices and weights."})
 
-            per_ticker_returns = {}
-            n = None
-            for t in tickers:
-                series = [None if v is None else float(v) for v in data[t]]
-                rets = []
-                for i in range(1, len(series)):
-                    p0, p1 = series[i-1], series[i]
-                    if p0 is None or p1 is None or p0 == 0:
-                        rets.append(None)
-                    else:
-                        rets.append((p1 - p0) / p0)
-                per_ticker_returns[t] = rets
-                n = len(rets)
-
-            wsum = sum(float(weights[t]) for t in tickers)
-            if not (0.98 <= wsum <= 1.02):
-                weights = {t: float(weights[t]) / wsum for t in tickers}
-            else:
-                weights = {t: float(weights[t]) for t in tickers}
-
-            port_rets = []
-            for i in range(n):
-                valid = True
-                acc = 0.0
-                for t in tickers:
-                    r = per_ticker_returns[t][i]
-                    if r is None:
-                        valid = False
-                        break
-                    acc += weights[t] * r
-                port_rets.append(acc if valid else None)
-            port_rets = [0.0 if r is None else float(r) for r in port_rets]
-
-            curve = []
-            level = 1.0
-            for r in port_rets:
-                level *= (1.0 + r)
-                curve.append(level)
+            w = normalize_weights([float(weights[t]) for t in tickers])
+            if not np.isfinite(w).all():
+                return json.dumps({"ok": False, "error": "Weights sum to zero."})
+            rets = simple_returns(panel.select(tickers).values)
+            port_rets, curve = portfolio_returns(rets, w)
 
-            return json.dumps({
-                "ok": True,
-                "index": dates[1:],
-                "portfolio_returns": [round(float(x), 10) for x in port_rets],
-                "portfolio_curve": [round(float(x), 10) for x in curve]
-            })
+            return json.dumps(returns_payload(dates[1:], port_rets, curve, output_format))
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
         except Exception as e:
             return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
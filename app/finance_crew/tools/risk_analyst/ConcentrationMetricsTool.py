@@ -3,6 +3,9 @@ from typing import Type, List, Tuple
 from pydantic import BaseModel, Field
 import json
 
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
+
 class ConcentrationMetricsInput(BaseModel):
     """Compute concentration metrics from weights."""
     weights_json: str = Field(..., description="JSON dict {ticker: weight}.")
@@ -16,6 +19,8 @@ class ConcentrationMetricsTool(BaseTool):
     )
     args_schema: Type[BaseModel] = ConcentrationMetricsInput
 
+    @traced
+    @memoized
     def _run(self, weights_json: str, top_k: int = 5) -> str:
         try:
             w = json.loads(weights_json)
@@ -0,0 +1,79 @@
+from crewai.tools import BaseTool
+from typing import Type
+from pydantic import BaseModel, Field
+import json
+import numpy as np
+
+from app.finance_crew.analytics import CovarianceModel, covariance_cache, normalize_weights, simple_returns
+from app.finance_crew.market_data import PricesPayloadError, load_aligned_panel
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
+
+class CovarianceRiskInput(BaseModel):
+    """Input schema for covariance-based portfolio risk and risk contributions."""
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
+    weights_json: str = Field(
+        ..., description="JSON dict {ticker: weight}, or {portfolio_id: {ticker: weight}} for several portfolios.")
+    method: str = Field("sample", description="Covariance estimator: 'sample', 'ledoit_wolf' or 'ewma'.")
+    ewma_lambda: float = Field(0.94, description="Decay factor for method='ewma' (default 0.94).")
+    fill: str = Field("none", description="Gap policy applied first by the shared alignment stage: 'ffill', "
+                                           "'interpolate', 'drop' or 'none' (raw prices).")
+
+class CovarianceRiskTool(BaseTool):
+    name: str = "compute_covariance_risk"
+    description: str = (
+        "Compute portfolio volatility from the asset covariance matrix (sample, Ledoit-Wolf shrinkage or EWMA) "
+        "and each ticker's marginal, component and percent contribution to risk, for one or several "
+        "portfolios. The matrix is fitted once per price panel and reused for later weight changes. "
+        "A missing return counts as 0.0 for that ticker only."
+    )
+    args_schema: Type[BaseModel] = CovarianceRiskInput
+
+    @traced
+    @memoized
+    def _run(self, prices_json: str, weights_json: str, method: str = "sample", ewma_lambda: float = 0.94,
+             fill: str = "none") -> str:
+        try:
+            panel = load_aligned_panel(prices_json, fill)
+            weights = json.loads(weights_json)
+            nested = bool(weights) and all(isinstance(v, dict) for v in weights.values())
+            books = weights if nested else {"portfolio": weights}
+
+            tickers = sorted({t for book in books.values() for t, w in book.items()
+                              if w is not None and t in panel})
+            if not tickers:
+                return json.dumps({"ok": False, "error": "No overlapping tickers between prices and weights."})
+            w = normalize_weights(np.array([[float(book.get(t) or 0.0) for t in tickers] for book in books.values()]))
+            if not np.isfinite(w).all():
+                return json.dumps({"ok": False, "error": "Weights sum to zero."})
+
+            key = (panel.key, tuple(tickers), method, ewma_lambda if method == "ewma" else None)
+            model = covariance_cache.get_or_fit(key, lambda: CovarianceModel.fit(
+                simple_returns(panel.select(tickers).values), method=method, tickers=tickers,
+                ewma_lambda=ewma_lambda))
+
+            vol = model.volatility(w)
+            marginal = model.marginal_contributions(w)
+            component = model.component_contributions(w)
+            percent = model.percent_contributions(w)
+            results = {}
+            for i, pid in enumerate(books):
+                held = [j for j, t in enumerate(tickers) if w[i, j] != 0]
+                results[pid] = {
+                    "vol_daily": round(float(vol[i]), 8),
+                    "ann_vol": round(float(vol[i] * np.sqrt(252.0)), 6),
+                    "marginal": {tickers[j]: round(float(marginal[i, j]), 8) for j in held},
+                    "component": {tickers[j]: round(float(component[i, j]), 8) for j in held},
+                    "percent": {tickers[j]: round(float(percent[i, j]), 6) for j in held},
+                }
+            return json.dumps({
+                "ok": True,
+                "method": method,
+                "shrinkage": round(model.shrinkage, 6) if model.shrinkage is not None else None,
+                "n_obs": model.n_obs,
+                "metrics": results if nested else results["portfolio"],
+            })
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e:
+            return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
@@ -2,24 +2,31 @@ from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
 import json
+import numpy as np
+
+from app.finance_crew.market_data import PricesPayloadError, alignment_cache, load_price_panel
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
 
 class DataQualityCheckInput(BaseModel):
     """Validate weights sum and basic data completeness."""
-    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list).")
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
     weights_json: str = Field(..., description="JSON dict {ticker: weight}.")
     tolerance: float = Field(0.02, description="Allowed deviation for weights sum around 1.0.")
 
 class DataQualityCheckTool(BaseTool):
     name: str = "validate_portfolio_data_quality"
     description: str = (
-        "Validate that portfolio weights sum ~ 1.0 and report missing data counts per ticker. "
-        "Returns JSON with 'issues' (list of strings) and simple stats."
+        "Validate that portfolio weights sum ~ 1.0 and report missing data counts per ticker, "
+        "plus gaps, stale prices and outlier jumps. Returns JSON with 'issues' (list of strings) and simple stats."
     )
     args_schema: Type[BaseModel] = DataQualityCheckInput
 
+    @traced
+    @memoized
     def _run(self, prices_json: str, weights_json: str, tolerance: float = 0.02) -> str:
         try:
-            obj = json.loads(prices_json)
+            panel = load_price_panel(prices_json)
             w = json.loads(weights_json)
 
             issues = []
@@ -27,19 +34,20 @@ class DataQualityCheckTool(BaseTool):
             if not (1.0 - tolerance <= wsum <= 1.0 + tolerance):
                 issues.append(f"Weights sum out of bounds: {wsum:.6f}")
 
-            data = obj.get("data", {})
-            missing = {}
-            for t, series in data.items():
-                mc = sum(1 for v in series if v is None)
-                missing[t] = mc
-                if mc > 0:
-                    issues.append(f"{t}: {mc} missing price points")
+            # The stats come from the shared alignment stage, so a panel is scanned once per process.
+            quality = alignment_cache.get_or_align(panel).quality
+            counts = np.isnan(panel.values).sum(axis=0)
+            missing = dict(zip(panel.tickers, counts.tolist()))
+            issues.extend(quality.issues())
 
             return json.dumps({
                 "ok": True,
                 "weights_sum": round(float(wsum), 6),
                 "missing_points": missing,
+                "quality": quality.summary(),
                 "issues": issues
             })
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
         except Exception as e:
             return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
@@ -3,6 +3,9 @@ from typing import Type, Dict
 from pydantic import BaseModel, Field
 import json
 
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
+
 class ExposuresVsTargetInput(BaseModel):
     """Compute asset-class exposures and deltas vs target."""
     weights_json: str = Field(..., description="JSON dict {ticker: weight}.")
@@ -17,6 +20,8 @@ class ExposuresVsTargetTool(BaseTool):
     )
     args_schema: Type[BaseModel] = ExposuresVsTargetInput
 
+    @traced
+    @memoized
     def _run(self, weights_json: str, asset_map_json: str, target_weights_json: str) -> str:
         try:
             w = json.loads(weights_json)
@@ -39,7 +44,7 @@ class ExposuresVsTargetTool(BaseTool):
                 "ok": True,
                 "current_exposures": {k: round(float(cur_agg.get(k, 0.0)), 6) for k in keys},
                 "target_exposures": {k: round(float(tgt_agg.get(k, 0.0)), 6) for k in keys},
-                "deltas": {k: round(v, 6) for k in deltas}
+                "deltas": {k: round(v, 6) for k, v in deltas.items()}
             })
         except Exception as e:
             return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
@@ -1,64 +1,110 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Optional, Type
 from pydantic import BaseModel, Field
 import json
 import math
-from scipy.stats import norm
+from statistics import NormalDist
+import numpy as np
+
+from app.finance_crew.analytics.streaming import PortfolioRiskState
+from app.finance_crew.market_data import load_returns
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
 
 class PortfolioRiskMetricsInput(BaseModel):
     """Input schema for portfolio risk metrics."""
-    portfolio_returns_json: str = Field(..., description="JSON with 'index' and 'portfolio_returns' from build_portfolio_returns.")
+    portfolio_returns_json: str = Field(..., description="JSON with 'index' and 'portfolio_returns' from build_portfolio_returns (json or binary).")
     annualize_var: bool = Field(True, description="If true, also return annualized VaR via sqrt(252) scaling.")
     var_conf: float = Field(0.95, description="Confidence level for parametric VaR (default 0.95).")
+    checkpoint_json: Optional[str] = Field(
+        None,
+        description="Checkpoint returned by a previous call ('{}' to start one). Only returns dated after "
+                    "the checkpoint are consumed, and an updated 'checkpoint' is returned.",
+    )
+    windows_json: str = Field(
+        "[21, 63, 252]",
+        description="JSON array of rolling window lengths in trading days tracked by a new checkpoint; "
+                    "their volatility and drawdown at the last date are returned under 'rolling'. "
+                    "A resumed checkpoint keeps the windows it was started with.",
+    )
 
 class PortfolioRiskMetricsTool(BaseTool):
     name: str = "compute_portfolio_risk_metrics"
     description: str = (
         "Compute portfolio annualized volatility, max drawdown (from curve), and parametric VaR at given confidence. "
-        "Returns JSON with ann_vol, max_drawdown, var_daily, var_annual (if requested)."
+        "Returns JSON with ann_vol, max_drawdown, var_daily, var_annual (if requested). With a checkpoint, "
+        "also returns rolling volatility and drawdown over 21/63/252-day windows, updated bar by bar."
     )
     args_schema: Type[BaseModel] = PortfolioRiskMetricsInput
 
-    def _run(self, portfolio_returns_json: str, annualize_var: bool = True, var_conf: float = 0.95) -> str:
+    @traced
+    @memoized
+    def _run(self, portfolio_returns_json: str, annualize_var: bool = True, var_conf: float = 0.95,
+             checkpoint_json: Optional[str] = None, windows_json: str = "[21, 63, 252]") -> str:
         try:
             obj = json.loads(portfolio_returns_json)
             if not obj.get("ok", False):
                 return json.dumps({"ok": False, "error": obj.get("error", "portfolio_returns_json not ok")})
-            rets = [float(x) for x in obj.get("portfolio_returns", [])]
-            curve = obj.get("portfolio_curve", [])
+            dates, rets, curve = load_returns(obj)
+            rets = rets.tolist()
+            curve = curve.tolist() if curve is not None else []
 
-            if not rets:
+            if not rets and checkpoint_json is None:
                 return json.dumps({"ok": False, "error": "Empty returns series."})
 
-            mu = sum(rets)/len(rets)
-            var = sum((r - mu)**2 for r in rets)/(len(rets)-1) if len(rets) > 1 else 0.0
-            std = math.sqrt(var)
-            ann_vol = std*math.sqrt(252.0)
+            state = None
+            if checkpoint_json is not None:
+                checkpoint = json.loads(checkpoint_json or "{}")
+                if checkpoint:
+                    state = PortfolioRiskState.from_dict(checkpoint)
+                else:
+                    windows = json.loads(windows_json or "[]")
+                    if not isinstance(windows, list) or not all(isinstance(w, int) and w >= 2 for w in windows):
+                        return json.dumps({"ok": False, "error": "windows_json must be a JSON array of integers >= 2."})
+                    state = PortfolioRiskState(windows)
+                if dates and state.last_date is not None:
+                    start = next((i for i, d in enumerate(dates) if d > state.last_date), len(dates))
+                elif dates:
+                    start = 0
+                else:
+                    start = state.count
+                new_curve = np.asarray(curve[start:], dtype=np.float64) if curve else None
+                curve_base = curve[start - 1] if curve and start > 0 else 1.0
+                state.update(np.asarray(rets[start:], dtype=np.float64), new_curve, dates[start:] or None,
+                             curve_base=curve_base)
+                if state.count == 0:
+                    return json.dumps({"ok": False, "error": "Empty returns series."})
+                mu, std, mdd = state.mean(), state.std(), state.max_drawdown()
+            else:
+                mu = sum(rets)/len(rets)
+                var = sum((r - mu)**2 for r in rets)/(len(rets)-1) if len(rets) > 1 else 0.0
+                std = math.sqrt(var)
 
-            if not curve:
-                lvl = 1.0
-                curve = []
-                for r in rets:
-                    lvl *= (1.0 + r)
-                    curve.append(lvl)
+                if not curve:
+                    lvl = 1.0
+                    curve = []
+                    for r in rets:
+                        lvl *= (1.0 + r)
+                        curve.append(lvl)
 
-            peak = -1e18
-            mdd = 0.0
-            for v in curve:
-                if v > peak:
-                    peak = v
-                dd = (v/peak) - 1.0
-                if dd < mdd:
-                    mdd = dd
+                peak = -1e18
+                mdd = 0.0
+                for v in curve:
+                    if v > peak:
+                        peak = v
+                    dd = (v/peak) - 1.0
+                    if dd < mdd:
+                        mdd = dd
+            ann_vol = std*math.sqrt(252.0)
 
             try:
-                z = abs(norm.ppf(1 - var_conf))
+                z = abs(NormalDist().inv_cdf(1 - var_conf))
             except Exception:
                 z = 1.65 if abs(var_conf - 0.95) < 1e-6 else 1.65
             var_daily = mu - z*std
             var_annual = var_daily*math.sqrt(252.0) if annualize_var else None
 
-            return json.dumps({
+            result = {
                 "ok": True,
                 "metrics": {
                     "ann_vol": round(ann_vol, 6),
@@ -67,6 +113,10 @@ class PortfolioRiskMetricsTool(BaseTool):
                     "var_annual": round(var_annual, 6) if var_annual is not None else None,
                     "conf_level": var_conf
                 }
-            })
+            }
+            if state is not None:
+                result["rolling"] = {k: None if v is None else round(v, 6) for k, v in state.rolling().items()}
+                result["checkpoint"] = state.to_dict()
+            return json.dumps(result)
         except Exception as e:
             return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
@@ -0,0 +1,69 @@
+from crewai.tools import BaseTool
+from typing import Optional, Type
+from pydantic import BaseModel, Field
+import json
+
+from app.finance_crew.market_data import PricesPayloadError, load_price_panel, price_store
+from app.finance_crew.pipeline.dag import Dag, Node
+from app.finance_crew.profiling import traced
+from .BetaCorrelationTool import BetaCorrelationTool
+from .BuildPortfolioReturnsTool import BuildPortfolioReturnsTool
+from .ConcentrationMetricsTool import ConcentrationMetricsTool
+from .DataQualityCheckTool import DataQualityCheckTool
+from .ExposuresVsTargetTool import ExposuresVsTargetTool
+from .PortfolioRiskMetricsTool import PortfolioRiskMetricsTool
+
+class RiskSuiteInput(BaseModel):
+    """Run every risk analysis tool on one portfolio, independent tools in parallel."""
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
+    weights_json: str = Field(..., description="JSON dict {ticker: weight}.")
+    asset_map_json: str = Field(..., description="JSON dict {ticker: asset_class} (e.g., equity/bond/cash).")
+    target_weights_json: str = Field(..., description="JSON dict {ticker: target_weight} summing ~1.")
+    benchmark: str = Field(..., description="Benchmark ticker present in prices_json data.")
+    portfolio_returns_json: Optional[str] = Field(
+        None, description="Output of build_portfolio_returns; computed from prices and weights when omitted.")
+    top_k: int = Field(5, description="How many top positions to return.")
+    var_conf: float = Field(0.95, description="Confidence level for parametric VaR (default 0.95).")
+
+class RiskSuiteTool(BaseTool):
+    name: str = "run_risk_suite"
+    description: str = (
+        "Run portfolio risk metrics, exposures vs target, concentration, beta/correlations and data quality "
+        "in one call. Independent analyses run concurrently. Returns JSON with one entry per analysis "
+        "under 'results' and per-analysis timings including the critical path."
+    )
+    args_schema: Type[BaseModel] = RiskSuiteInput
+    max_workers: int = 5
+
+    @traced
+    def _run(self, prices_json: str, weights_json: str, asset_map_json: str, target_weights_json: str,
+             benchmark: str, portfolio_returns_json: Optional[str] = None, top_k: int = 5,
+             var_conf: float = 0.95) -> str:
+        try:
+            handle = price_store.put(load_price_panel(prices_json))
+            nodes = [
+                Node("exposures", lambda: ExposuresVsTargetTool()._run(weights_json, asset_map_json,
+                                                                       target_weights_json)),
+                Node("concentration", lambda: ConcentrationMetricsTool()._run(weights_json, top_k)),
+                Node("beta", lambda: BetaCorrelationTool()._run(handle, weights_json, benchmark)),
+                Node("data_quality", lambda: DataQualityCheckTool()._run(handle, weights_json)),
+                Node("risk", lambda r: PortfolioRiskMetricsTool()._run(r, var_conf=var_conf), ("returns",)),
+            ]
+            if portfolio_returns_json is None:
+                nodes.append(Node("returns", lambda: BuildPortfolioReturnsTool()._run(handle, weights_json)))
+            inputs = {} if portfolio_returns_json is None else {"returns": portfolio_returns_json}
+            run = Dag(nodes).execute(inputs, mode="thread", max_workers=self.max_workers)
+
+            results = {name: json.loads(run.results[name])
+                       for name in ("risk", "exposures", "concentration", "beta", "data_quality")}
+            errors = {name: r["error"] for name, r in results.items() if not r.get("ok", False)}
+            return json.dumps({
+                "ok": not errors,
+                "results": results,
+                "errors": errors,
+                "timings": run.timing_report(),
+            })
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e:
+            return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
@@ -0,0 +1,81 @@
+from crewai.tools import BaseTool
+from typing import Type
+from pydantic import BaseModel, Field
+import json
+import numpy as np
+
+from app.finance_crew.analytics import normalize_weights, portfolio_returns, rolling_metrics, shard_pool, simple_returns
+from app.finance_crew.market_data import BINARY_FORMAT, PricesPayloadError, encode_array, load_aligned_panel
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
+
+class RollingRiskInput(BaseModel):
+    """Input schema for rolling volatility, drawdown and beta time series."""
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
+    weights_json: str = Field(
+        "", description="Optional JSON dict {ticker: weight}, or {portfolio_id: {ticker: weight}}; "
+                        "each portfolio gets its own series next to the tickers.")
+    benchmark: str = Field("", description="Optional benchmark ticker in prices_json; adds rolling betas.")
+    windows_json: str = Field("[21, 63, 252]", description="JSON array of window lengths in trading days.")
+    last_n: int = Field(0, description="Only return the last N dates (0 = all dates).")
+    output_format: str = Field("json", description="'json' for inline lists, 'binary' for base64 float64 buffers.")
+    fill: str = Field("none", description="Gap policy applied first by the shared alignment stage: 'ffill', "
+                                           "'interpolate', 'drop' or 'none' (raw prices).")
+
+def _rounded(values):
+    return [None if v != v else round(v, 6) for v in values.tolist()]
+
+class RollingRiskTool(BaseTool):
+    name: str = "compute_rolling_risk"
+    description: str = (
+        "Compute rolling annualized volatility, rolling drawdown and (with a benchmark) rolling beta over "
+        "21/63/252-day windows for every ticker and portfolio. Output is columnar: 'index' holds the dates "
+        "and 'columns' maps each metric_window to {series: values}."
+    )
+    args_schema: Type[BaseModel] = RollingRiskInput
+
+    @traced
+    @memoized
+    def _run(self, prices_json: str, weights_json: str = "", benchmark: str = "",
+             windows_json: str = "[21, 63, 252]", last_n: int = 0, output_format: str = "json",
+             fill: str = "none") -> str:
+        try:
+            if output_format not in ("json", "binary"):
+                return json.dumps({"ok": False, "error": f"Unknown output_format '{output_format}'."})
+            windows = json.loads(windows_json)
+            if not isinstance(windows, list) or not all(isinstance(w, int) and w >= 2 for w in windows):
+                return json.dumps({"ok": False, "error": "windows_json must be a JSON array of integers >= 2."})
+            panel = load_aligned_panel(prices_json, fill)
+            if benchmark and benchmark not in panel:
+                return json.dumps({"ok": False, "error": f"Benchmark '{benchmark}' not in prices data."})
+
+            rets = simple_returns(panel.values)
+            series = list(panel.tickers)
+            weights = json.loads(weights_json) if weights_json else {}
+            if weights:
+                nested = all(isinstance(v, dict) for v in weights.values())
+                books = weights if nested else {"portfolio": weights}
+                w = normalize_weights(np.array([[float(book.get(t) or 0.0) for t in panel.tickers]
+                                                for book in books.values()]))
+                if not np.isfinite(w).all():
+                    return json.dumps({"ok": False, "error": "Weights sum to zero."})
+                port, _ = portfolio_returns(rets, w, w != 0)
+                rets = np.hstack([rets, port])
+                series += [str(pid) for pid in books]
+
+            bench = rets[:, panel.position(benchmark)] if benchmark else None
+            columns = shard_pool.map(rolling_metrics, rets, windows, bench)
+            start = max(0, len(rets) - last_n) if last_n > 0 else 0
+            result = {"ok": True, "windows": windows, "index": list(panel.dates[1 + start:]), "series": series}
+            if output_format == "binary":
+                result["format"] = BINARY_FORMAT
+                result["shape"] = [len(rets) - start, len(series)]
+                result["columns"] = {name: encode_array(m[start:]) for name, m in columns.items()}
+            else:
+                result["columns"] = {name: {s: _rounded(m[start:, j]) for j, s in enumerate(series)}
+                                     for name, m in columns.items()}
+            return json.dumps(result)
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e:
+            return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
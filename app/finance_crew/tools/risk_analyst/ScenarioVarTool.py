@@ -0,0 +1,77 @@
+from crewai.tools import BaseTool
+from typing import Optional, Type
+from pydantic import BaseModel, Field
+import json
+import math
+import numpy as np
+
+from app.finance_crew.analytics import normalize_weights, scenario_var, simple_returns
+from app.finance_crew.market_data import PricesPayloadError, load_aligned_panel
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
+
+class ScenarioVarInput(BaseModel):
+    """Input schema for historical / Monte Carlo VaR and CVaR."""
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
+    weights_json: str = Field(
+        ..., description="JSON dict {ticker: weight}, or {portfolio_id: {ticker: weight}} for several portfolios.")
+    method: str = Field("historical", description="'historical', 'normal' (Monte Carlo) or 'bootstrap' (Monte Carlo).")
+    var_conf: float = Field(0.95, description="Confidence level (default 0.95).")
+    n_scenarios: int = Field(10000, description="Monte Carlo scenario count (ignored for 'historical').")
+    seed: Optional[int] = Field(42, description="RNG seed for reproducible Monte Carlo runs.")
+    fill: str = Field("none", description="Gap policy applied first by the shared alignment stage: 'ffill', "
+                                           "'interpolate', 'drop' or 'none' (raw prices).")
+
+class ScenarioVarTool(BaseTool):
+    name: str = "compute_scenario_var"
+    description: str = (
+        "Compute daily VaR and CVaR (expected shortfall) by historical simulation or Monte Carlo "
+        "(normal model fitted to returns, or bootstrap of historical dates) for one or several portfolios. "
+        "Returns JSON with var_daily, cvar_daily and var_annual per portfolio (losses are negative returns)."
+    )
+    args_schema: Type[BaseModel] = ScenarioVarInput
+    chunk_size: int = 10000
+
+    @traced
+    @memoized
+    def _run(self, prices_json: str, weights_json: str, method: str = "historical", var_conf: float = 0.95,
+             n_scenarios: int = 10000, seed: Optional[int] = 42,
+             fill: str = "none") -> str:
+        try:
+            panel = load_aligned_panel(prices_json, fill)
+            weights = json.loads(weights_json)
+            nested = bool(weights) and all(isinstance(v, dict) for v in weights.values())
+            books = weights if nested else {"portfolio": weights}
+
+            tickers = sorted({t for book in books.values() for t, w in book.items()
+                              if w is not None and t in panel})
+            if not tickers:
+                return json.dumps({"ok": False, "error": "No overlapping tickers between prices and weights."})
+            w = np.array([[float(book.get(t) or 0.0) for t in tickers] for book in books.values()])
+            w = normalize_weights(w)
+            if not np.isfinite(w).all():
+                return json.dumps({"ok": False, "error": "Weights sum to zero."})
+
+            rets = simple_returns(panel.select(tickers).values)
+            var, cvar, n = scenario_var(rets, w, conf=var_conf, method=method, n_scenarios=n_scenarios,
+                                        seed=seed, chunk_size=self.chunk_size)
+            metrics = {
+                pid: {
+                    "var_daily": round(float(v), 6),
+                    "cvar_daily": round(float(c), 6),
+                    "var_annual": round(float(v) * math.sqrt(252.0), 6),
+                }
+                for pid, v, c in zip(books, var, cvar)
+            }
+            return json.dumps({
+                "ok": True,
+                "method": method,
+                "conf_level": var_conf,
+                "n_scenarios": n,
+                "seed": seed if method != "historical" else None,
+                "metrics": metrics if nested else metrics["portfolio"],
+            })
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e:
+            return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
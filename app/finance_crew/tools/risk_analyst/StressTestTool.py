@@ -0,0 +1,138 @@
+from crewai.tools import BaseTool
+from typing import Type
+from pydantic import BaseModel, Field
+import json
+import numpy as np
+
+from app.finance_crew.analytics import (
+    EPISODES,
+    date_rows,
+    historical_shocks,
+    hypothetical_shocks,
+    scenario_pnl,
+    window_shocks,
+    worst_scenarios,
+)
+from app.finance_crew.market_data import PricesPayloadError, load_price_panel
+from app.finance_crew.portfolio import CASH_CLASS
+from app.finance_crew.profiling import traced
+from app.finance_crew.tools.tool_cache import memoized
+
+class StressTestInput(BaseModel):
+    """Input schema for historical and hypothetical stress scenarios."""
+    prices_json: str = Field(..., description="JSON with 'index' and 'data' (ticker->price list), or a price handle.")
+    weights_json: str = Field(
+        ..., description="JSON dict {ticker: weight}, or {portfolio_id: {ticker: weight}} for several portfolios.")
+    scenarios_json: str = Field(
+        "", description="JSON array of scenarios: {\"name\": \"covid_2020\"} for a built-in episode "
+                        f"({', '.join(EPISODES)}), {{\"name\", \"start\", \"end\"}} to replay a date range from "
+                        "the prices, or {\"name\", \"shocks\": {ticker: r}, \"asset_class_shocks\": {class: r}} "
+                        "for a hypothetical shock. Empty: every built-in episode the prices fully cover; "
+                        "episodes outside the prices are listed under 'skipped'.")
+    asset_map_json: str = Field("", description="Optional JSON dict {ticker: asset_class} for asset class shocks.")
+    window_days: int = Field(0, description="If > 0, also replay every window of this many trading days in the "
+                                            "prices and report each portfolio's worst ones.")
+    top_k: int = Field(5, description="Number of worst rolling windows to report per portfolio.")
+    portfolio_values_json: str = Field("", description="Optional JSON dict {portfolio_id: market value} to "
+                                                       "report P&L in money instead of returns.")
+
+def _round(x):
+    return None if x != x else round(float(x), 6)
+
+class StressTestTool(BaseTool):
+    name: str = "run_stress_test"
+    description: str = (
+        "Stress test one or several portfolios: replay historical episodes (e.g. 2008, 2020) or any date range "
+        "from the price history, apply hypothetical shocks by ticker or asset class, and optionally scan every "
+        "rolling window for the worst losses. Returns P&L per portfolio and scenario. Built-in episodes need "
+        "prices covering them (e.g. period='max'); the call fails when no scenario can be run."
+    )
+    args_schema: Type[BaseModel] = StressTestInput
+
+    @traced
+    @memoized
+    def _run(self, prices_json: str, weights_json: str, scenarios_json: str = "", asset_map_json: str = "",
+             window_days: int = 0, top_k: int = 5, portfolio_values_json: str = "") -> str:
+        try:
+            panel = load_price_panel(prices_json)
+            weights = json.loads(weights_json)
+            nested = bool(weights) and all(isinstance(v, dict) for v in weights.values())
+            books = weights if nested else {"portfolio": weights}
+            asset_map = json.loads(asset_map_json) if asset_map_json else {}
+            specs = json.loads(scenarios_json) if scenarios_json else [{"name": n} for n in EPISODES]
+            if not isinstance(specs, list) or not all(isinstance(s, dict) and s.get("name") for s in specs):
+                return json.dumps({"ok": False, "error": "scenarios_json must be a JSON array of objects with a 'name'."})
+
+            tickers = sorted({t for book in books.values() for t in book})
+            w = np.array([[float(book.get(t) or 0.0) for t in tickers] for book in books.values()])
+            values = None
+            if portfolio_values_json:
+                money = json.loads(portfolio_values_json)
+                values = np.array([float(money.get(pid, np.nan)) for pid in books])
+
+            # Replayed returns come from the prices; cash has none and holds its value.
+            cols = [panel.position(t) if t in panel else -1 for t in tickers]
+            prices = np.where(np.array(cols) >= 0, panel.values[:, np.maximum(cols, 0)], np.nan)
+            is_cash = np.array([asset_map.get(t) == CASH_CLASS and t not in panel for t in tickers], dtype=bool)
+
+            windows, hypothetical, skipped = {}, [], {}
+            for spec in specs:
+                name = spec["name"]
+                if "shocks" in spec or "asset_class_shocks" in spec:
+                    hypothetical.append(spec)
+                    continue
+                start, end = (spec.get("start"), spec.get("end")) if "start" in spec else \
+                    EPISODES.get(name, (None, None))
+                if not start or not end:
+                    skipped[name] = "Unknown episode; give 'start' and 'end' or shocks."
+                    continue
+                try:
+                    date_rows(panel.dates, start, end)
+                except ValueError as e:
+                    skipped[name] = str(e)
+                    continue
+                windows[name] = (start, end)
+
+            names = list(windows) + [s["name"] for s in hypothetical]
+            shocks = []
+            if windows:
+                shocks.append(np.where(is_cash, 0.0, historical_shocks(prices, panel.dates, list(windows.values()))))
+            if hypothetical:
+                shocks.append(hypothetical_shocks(tickers, hypothetical, asset_map))
+
+            scan = window_days > 0 and panel.n_dates > window_days
+            if not names and not scan:
+                covered = f"{panel.dates[0]} to {panel.dates[-1]}" if panel.dates else "no dates"
+                return json.dumps({
+                    "ok": False,
+                    "error": f"No stress scenario could be run: the prices ({covered}) cover none of the "
+                             "requested episodes. Fetch a longer history (e.g. period='max'), give 'start'/'end' "
+                             "ranges inside the prices or hypothetical shocks, or set window_days.",
+                    "skipped": skipped,
+                })
+
+            result = {"ok": True, "scenarios": names, "skipped": skipped}
+            if names:
+                pnl, coverage = scenario_pnl(w, np.vstack(shocks), values)
+                result["pnl"] = {pid: {n: _round(pnl[i, s]) for s, n in enumerate(names)}
+                                 for i, pid in enumerate(books)}
+                result["coverage"] = {pid: {n: _round(coverage[i, s]) for s, n in enumerate(names)
+                                            if coverage[i, s] < 1.0 - 1e-9}
+                                      for i, pid in enumerate(books)}
+            if scan:
+                rolled = np.where(is_cash, 0.0, window_shocks(prices, window_days))
+                pnl, _ = scenario_pnl(w, rolled, values)
+                worst = worst_scenarios(pnl, top_k)
+                result["worst_windows"] = {
+                    pid: [{"start": panel.dates[s], "end": panel.dates[s + window_days], "pnl": _round(pnl[i, s])}
+                          for s in worst[i]]
+                    for i, pid in enumerate(books)}
+            if not nested:
+                for key in ("pnl", "coverage", "worst_windows"):
+                    if key in result:
+                        result[key] = result[key]["portfolio"]
+            return json.dumps(result)
+        except PricesPayloadError as e:
+            return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e:
+            return json.dumps({"ok": False, "error": f"{type(e).__name__}: {e}"})
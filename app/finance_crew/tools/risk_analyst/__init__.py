@@ -1,9 +1,19 @@
-from .BuildPortfolioReturnsTool import BuildPortfolioReturnsTool
-from .PortfolioRiskMetricsTool import PortfolioRiskMetricsTool
-from .ExposuresVsTargetTool import ExposuresVsTargetTool
-from .ConcentrationMetricsTool import ConcentrationMetricsTool
-from .BetaCorrelationTool import BetaCorrelationTool
-from .DataQualityCheckTool import DataQualityCheckTool
+from typing import TYPE_CHECKING
+
+from app.finance_crew.tools.lazy import lazy_tools
+
+if TYPE_CHECKING:
+    from .BuildPortfolioReturnsTool import BuildPortfolioReturnsTool
+    from .PortfolioRiskMetricsTool import PortfolioRiskMetricsTool
+    from .ExposuresVsTargetTool import ExposuresVsTargetTool
+    from .ConcentrationMetricsTool import ConcentrationMetricsTool
+    from .BetaCorrelationTool import BetaCorrelationTool
+    from .DataQualityCheckTool import DataQualityCheckTool
+    from .ScenarioVarTool import ScenarioVarTool
+    from .CovarianceRiskTool import CovarianceRiskTool
+    from .RollingRiskTool import RollingRiskTool
+    from .StressTestTool import StressTestTool
+    from .RiskSuiteTool import RiskSuiteTool
 
 __all__ = [
     "BuildPortfolioReturnsTool",
@@ -12,4 +22,12 @@ __all__ = [
     "ConcentrationMetricsTool",
     "BetaCorrelationTool",
     "DataQualityCheckTool",
+    "ScenarioVarTool",
+    "CovarianceRiskTool",
+    "RollingRiskTool",
+    "StressTestTool",
+    "RiskSuiteTool",
 ]
+
+# Tools (and pandas, crewai, ... behind them) are imported on first access.
+__getattr__, __dir__ = lazy_tools(__name__, __all__)
@@ -0,0 +1,242 @@
+import functools
+import hashlib
+import inspect
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# Bump when the table layout changes; a disk tier with another version is emptied and rebuilt.
+_SCHEMA_VERSION = 2
+_SCHEMA = """
+DROP TABLE IF EXISTS tool_results;
+CREATE TABLE tool_results (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX tool_results_used ON tool_results (used);
+"""
+
+# Tools serialize {"ok": ...} first, so a successful result always starts with this.
+_OK_PREFIX = '{"ok": true'
+
+# The package whose source the cached results depend on: every tool and the analytics behind them.
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    """blake2b digest of every Python source file of the finance_crew package.
+
+    Part of every memoized key, so results computed by other code, whether an
+    edited tool or an edited analytics helper, are never served from the disk tier.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for root, dirs, files in os.walk(_PACKAGE_DIR):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(f for f in files if f.endswith(".py")):
+            path = os.path.join(root, name)
+            h.update(os.path.relpath(path, _PACKAGE_DIR).encode("utf-8"))
+            with open(path, "rb") as f:
+                h.update(hashlib.blake2b(f.read(), digest_size=16).digest())
+    return h.hexdigest()
+
+
+def content_key(tool: str, arguments: Iterable[Tuple[str, Any]]) -> str:
+    """blake2b digest of a tool name and its (name, value) arguments.
+
+    Every part is length-prefixed, so argument boundaries cannot collide.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in (tool, *(f"{name}:{type(value).__name__}:{value}" for name, value in arguments)):
+        data = part.encode("utf-8", "surrogatepass")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def _size(value: str) -> int:
+    return len(value.encode("utf-8", "surrogatepass"))
+
+
+class ToolCache:
+    """Results of pure tool calls keyed by a hash of their arguments.
+
+    The memory tier is an LRU capped at `max_bytes` of UTF-8 result text.
+    With a `path`, results are also written to a SQLite file and served from
+    there after an eviction or a restart; that tier is an LRU too, capped at
+    `disk_max_bytes`. Only successful ('ok': true) results are stored.
+    Hit/miss counters are kept overall and per tool.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2 ** 20, path: Optional[str] = None,
+                 disk_max_bytes: int = 2 ** 30):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        self.disk_evictions = 0
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with self._connect() as conn:
+                if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                    conn.executescript(_SCHEMA + f"PRAGMA user_version = {_SCHEMA_VERSION};")
+
+    @classmethod
+    def from_env(cls) -> "ToolCache":
+        """Memory cap from FINANCE_CREW_TOOL_CACHE_MB (default 256, 0 disables caching),
+        optional disk tier from FINANCE_CREW_TOOL_CACHE_PATH and its cap from
+        FINANCE_CREW_TOOL_CACHE_DISK_MB (default 1024)."""
+        max_mb = float(os.getenv("FINANCE_CREW_TOOL_CACHE_MB", "256"))
+        disk_mb = float(os.getenv("FINANCE_CREW_TOOL_CACHE_DISK_MB", "1024"))
+        return cls(max_bytes=int(max_mb * 2 ** 20), path=os.getenv("FINANCE_CREW_TOOL_CACHE_PATH") or None,
+                   disk_max_bytes=int(disk_mb * 2 ** 20))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 or bool(self.path)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _count(self, tool: str, counter: str) -> None:
+        counts = self._counters.setdefault(tool, {"hits": 0, "disk_hits": 0, "misses": 0})
+        counts[counter] += 1
+
+    def _remember(self, key: str, value: str, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, dropped) = self._entries.popitem(last=False)
+            self._bytes -= dropped
+            self.evictions += 1
+
+    def _trim_disk(self, conn: sqlite3.Connection) -> None:
+        """Delete the least recently used rows until the disk tier fits disk_max_bytes."""
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM tool_results").fetchone()[0] - self.disk_max_bytes
+        if excess <= 0:
+            return
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM tool_results ORDER BY used"):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM tool_results WHERE key = ?", stale)
+        with self._lock:
+            self.disk_evictions += len(stale)
+
+    def get(self, tool: str, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count(tool, "hits")
+                return entry[0]
+        if self.path:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value, size FROM tool_results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE tool_results SET used = ? WHERE key = ?", (time.time(), key))
+            if row is not None:
+                with self._lock:
+                    self._remember(key, row[0], row[1])
+                    self._count(tool, "disk_hits")
+                return row[0]
+        with self._lock:
+            self._count(tool, "misses")
+        return None
+
+    def put(self, tool: str, key: str, value: str) -> None:
+        size = _size(value)
+        with self._lock:
+            self._remember(key, value, size)
+        if self.path and size <= self.disk_max_bytes:
+            now = time.time()
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, tool, value, size, now, now))
+                self._trim_disk(conn)
+
+    def clear(self, disk: bool = False) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._counters.clear()
+            self.evictions = 0
+            self.disk_evictions = 0
+        if disk and self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM tool_results")
+
+    def stats(self) -> dict:
+        with self._lock:
+            per_tool = {tool: dict(counts) for tool, counts in self._counters.items()}
+            entries, size, evictions = len(self._entries), self._bytes, self.evictions
+            disk_evictions = self.disk_evictions
+        hits = sum(c["hits"] + c["disk_hits"] for c in per_tool.values())
+        misses = sum(c["misses"] for c in per_tool.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "entries": entries,
+            "bytes": size,
+            "evictions": evictions,
+            "disk_evictions": disk_evictions,
+            "tools": per_tool,
+        }
+
+
+tool_cache = ToolCache.from_env()
+
+
+def memoized(run: Callable[..., str]) -> Callable[..., str]:
+    """Decorator for the `_run` method of a tool whose result depends only on its arguments.
+
+    Arguments are bound to the signature with defaults applied, so positional,
+    keyword and omitted-default calls share one entry. Price handles are
+    content hashes, so a handle argument is as good a key as the prices themselves.
+    The key also holds code_version(), so a code change starts from a cold cache.
+    """
+    signature = inspect.signature(run)
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs) -> str:
+        if not tool_cache.enabled:
+            return run(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = list(bound.arguments.items())[1:]
+        key = content_key(f"{type(self).__module__}.{type(self).__qualname__}@{code_version()}", arguments)
+        cached = tool_cache.get(self.name, key)
+        if cached is not None:
+            return cached
+        result = run(self, *args, **kwargs)
+        if result.startswith(_OK_PREFIX):
+            tool_cache.put(self.name, key, result)
+        return result
+
+    return wrapper
@@ -0,0 +1,85 @@
+"""
+Memory-mapped panel files: build a synthetic universe on disk one ticker chunk
+at a time, then run the market metrics and beta tools on it and report peak
+resident memory against the size of the panel. With --check the results are
+compared with the same tools on the panel loaded into memory.
+
+Usage: python -m benchmarks.bench_panel_file [--tickers 20000] [--years 10] [--chunk 1000]
+       [--dir /tmp] [--check]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from app.finance_crew.market_data import PanelFileWriter, PricePanel, open_panel_file, price_store
+from app.finance_crew.tools.researcher_agent import ComputeMarketMetricsTool
+from app.finance_crew.tools.risk_analyst import BetaCorrelationTool
+from app.finance_crew.tools.tool_cache import tool_cache
+from benchmarks.synthetic import make_price_frame, make_tickers
+
+
+def peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build(path: str, tickers: int, years: float, chunk: int) -> PricePanel:
+    names = make_tickers(tickers)
+    with PanelFileWriter(path) as writer:
+        for i, start in enumerate(range(0, tickers, chunk)):
+            frame = make_price_frame(min(chunk, tickers - start), years=years, gap_rate=0.001,
+                                     late_rate=0.02, benchmark="SPY" if i == 0 else None, seed=i)
+            frame.columns = (["SPY"] if i == 0 else []) + names[start:start + chunk]
+            writer.add(frame)
+    return open_panel_file(path)
+
+
+TOOLS = {
+    "compute_market_metrics": lambda prices_json: ComputeMarketMetricsTool()._run(prices_json=prices_json),
+    "beta_correlation": lambda prices_json: BetaCorrelationTool()._run(
+        prices_json=prices_json, weights_json=json.dumps({"T0000": 1.0}), benchmark="SPY"),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=20_000)
+    parser.add_argument("--years", type=float, default=10.0)
+    parser.add_argument("--chunk", type=int, default=1000)
+    parser.add_argument("--dir", default=None, help="Where to write the panel file (default: a temp dir).")
+    parser.add_argument("--check", action="store_true", help="Compare with the panel loaded into memory.")
+    args = parser.parse_args()
+
+    tool_cache.max_bytes = 0
+    print(f"peak RSS after imports {peak_mb():.0f} MB")
+    directory = tempfile.mkdtemp(dir=args.dir)
+    try:
+        start = time.perf_counter()
+        panel = build(os.path.join(directory, "panel"), args.tickers, args.years, args.chunk)
+        size_mb = panel.values.nbytes / 2 ** 20
+        print(f"{panel.n_tickers} tickers x {panel.n_dates} dates: {size_mb:.0f} MB on disk, "
+              f"written in {time.perf_counter() - start:.2f} s, peak RSS {peak_mb():.0f} MB")
+
+        handle = price_store.put(panel)
+        results = {}
+        for name, run in TOOLS.items():
+            start = time.perf_counter()
+            results[name] = run(handle)
+            print(f"{name:<24} {time.perf_counter() - start:>8.2f} s  peak RSS {peak_mb():.0f} MB")
+
+        if args.check:
+            loaded = PricePanel(np.array(panel.values), panel.dates, panel.tickers)
+            loaded_handle = price_store.put(loaded)
+            for name, run in TOOLS.items():
+                print(f"{name:<24} matches in-memory panel: {run(loaded_handle) == results[name]}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark the vectorized portfolio returns engine against the original
+pure-Python loop used by build_portfolio_returns.
+
+Usage: python -m benchmarks.bench_portfolio_returns [--days 252] [--tickers 100 1000 5000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.finance_crew.analytics import normalize_weights, portfolio_returns, simple_returns
+
+
+def make_prices(n_days: int, n_tickers: int, gap_rate: float = 0.00002, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    rets = rng.normal(0.0003, 0.015, size=(n_days, n_tickers))
+    prices = 100.0 * np.cumprod(1.0 + rets, axis=0)
+    prices[rng.random(prices.shape) < gap_rate] = np.nan
+    return prices
+
+
+def legacy_portfolio_returns(prices: np.ndarray, weights: np.ndarray):
+    """The nested-loop implementation build_portfolio_returns used before vectorization."""
+    tickers = list(range(prices.shape[1]))
+    data = {t: [None if v != v else v for v in prices[:, t].tolist()] for t in tickers}
+    per_ticker_returns = {}
+    n = None
+    for t in tickers:
+        series = data[t]
+        rets = []
+        for i in range(1, len(series)):
+            p0, p1 = series[i-1], series[i]
+            if p0 is None or p1 is None or p0 == 0:
+                rets.append(None)
+            else:
+                rets.append((p1 - p0) / p0)
+        per_ticker_returns[t] = rets
+        n = len(rets)
+
+    w = {t: float(weights[t]) for t in tickers}
+    port_rets = []
+    for i in range(n):
+        valid = True
+        acc = 0.0
+        for t in tickers:
+            r = per_ticker_returns[t][i]
+            if r is None:
+                valid = False
+                break
+            acc += w[t] * r
+        port_rets.append(acc if valid else None)
+    port_rets = [0.0 if r is None else float(r) for r in port_rets]
+
+    curve = []
+    level = 1.0
+    for r in port_rets:
+        level *= (1.0 + r)
+        curve.append(level)
+    return port_rets, curve
+
+
+def vectorized_portfolio_returns(prices: np.ndarray, weights: np.ndarray):
+    return portfolio_returns(simple_returns(prices), weights)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=252)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tickers':>8} {'days':>6} {'legacy_s':>10} {'vector_s':>10} {'speedup':>9} {'max_abs_diff':>13}")
+    for n_tickers in args.tickers:
+        prices = make_prices(args.days, n_tickers)
+        weights = normalize_weights(np.full(n_tickers, 1.0 / n_tickers))
+
+        legacy_rets, legacy_curve = legacy_portfolio_returns(prices, weights)
+        vec_rets, vec_curve = vectorized_portfolio_returns(prices, weights)
+        diff = max(np.max(np.abs(np.asarray(legacy_rets) - vec_rets), initial=0.0),
+                   np.max(np.abs(np.asarray(legacy_curve) - vec_curve), initial=0.0))
+
+        legacy_s = best_of(lambda: legacy_portfolio_returns(prices, weights), args.repeat)
+        vector_s = best_of(lambda: vectorized_portfolio_returns(prices, weights), args.repeat)
+        print(f"{n_tickers:>8} {args.days:>6} {legacy_s:>10.4f} {vector_s:>10.4f} "
+              f"{legacy_s / vector_s:>8.1f}x {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
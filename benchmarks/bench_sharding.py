@@ -0,0 +1,67 @@
+"""
+Scaling of the per-ticker kernels on the shared-memory process pool: wall
+time and speedup per worker count on a synthetic universe, and a check that
+every sharded result matches the in-process one exactly.
+
+Usage: python -m benchmarks.bench_sharding [--tickers 10000] [--years 5] [--workers 1 2 4 8 16 32]
+       [--repeat 3]
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+from app.finance_crew.analytics import ShardPool, price_beta_correlation, price_moments, rolling_metrics, simple_returns
+from benchmarks.synthetic import make_price_frame
+
+
+def same(a: Any, b: Any) -> bool:
+    if isinstance(a, tuple):
+        return all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return all(same(a[k], b[k]) for k in a)
+    return np.array_equal(a, b, equal_nan=True)
+
+
+def kernels(prices: np.ndarray) -> Dict[str, Tuple[Callable, np.ndarray, tuple]]:
+    rets = simple_returns(prices)
+    bench = rets[:, 0].copy()
+    return {
+        "price_moments": (price_moments, prices, ()),
+        "price_beta_correlation[63]": (price_beta_correlation, prices, (bench, 63)),
+        "rolling_metrics": (rolling_metrics, rets, ((21, 63, 252), bench)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=10_000)
+    parser.add_argument("--years", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    prices = make_price_frame(args.tickers, years=args.years, gap_rate=0.001, late_rate=0.02).to_numpy()
+    print(f"{prices.shape[1]} tickers x {prices.shape[0]} dates ({prices.nbytes / 2 ** 20:.0f} MB)")
+    print(f"{'kernel':<30} {'workers':>7} {'seconds':>9} {'speedup':>8}  exact")
+    for name, (fn, values, extra) in kernels(prices).items():
+        serial = None
+        for workers in args.workers:
+            pool = ShardPool(workers=workers, min_cells=0)
+            try:
+                pool.map(fn, values, *extra)  # starts the workers
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    result = pool.map(fn, values, *extra)
+                    best = min(best, time.perf_counter() - start)
+            finally:
+                pool.shutdown()
+            if serial is None:
+                serial = (best, result)
+            print(f"{name:<30} {workers:>7} {best:>9.3f} {serial[0] / best:>8.2f}  {same(serial[1], result)}")
+
+
+if __name__ == "__main__":
+    main()
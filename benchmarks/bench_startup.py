@@ -0,0 +1,101 @@
+"""
+Measure cold import time of the finance_crew entry points, each in a fresh
+interpreter, and fail when one goes over its budget or pulls in a module it
+must not load (e.g. scipy, or pandas for the command module).
+
+Budgets live in startup_budget.json as {target: {"seconds", "forbid"}}; a
+target is a module name, or "module:*" to also load every name in its
+__all__. Over budget, the slowest imports (-X importtime) are printed.
+
+Usage: python -m benchmarks.bench_startup [--repeat 5] [--budget benchmarks/startup_budget.json]
+       [--targets app.finance_crew.main ...] [--scale 1.0]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_BUDGET = os.path.join(os.path.dirname(__file__), "startup_budget.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": sorted(sys.modules)}}))
+"""
+
+
+def import_statement(target: str) -> str:
+    module, _, star = target.partition(":")
+    return f"from {module} import *" if star == "*" else f"import {module}"
+
+
+def probe(target: str, importtime: bool = False) -> Tuple[dict, str]:
+    """(seconds and loaded modules, -X importtime report) of one import in a fresh interpreter."""
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else [])
+    cmd += ["-c", _PROBE.format(statement=import_statement(target))]
+    env = dict(os.environ, PYTHONPATH=ROOT, OPENROUTER_API_KEY=os.getenv("OPENROUTER_API_KEY", "unused"))
+    done = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT, env=env)
+    if done.returncode != 0:
+        raise RuntimeError(f"import of {target} failed:\n{done.stderr[-2000:]}")
+    return json.loads(done.stdout.strip().splitlines()[-1]), done.stderr
+
+
+def slowest_imports(report: str, top: int = 10) -> List[Tuple[float, str]]:
+    """(self seconds, module) of the slowest imports in an -X importtime report."""
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def forbidden(modules: List[str], forbid: List[str]) -> List[str]:
+    return sorted(f for f in forbid if any(m == f or m.startswith(f + ".") for m in modules))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", default=DEFAULT_BUDGET)
+    parser.add_argument("--targets", nargs="*", help="Only check these targets of the budget file.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, for slower machines.")
+    args = parser.parse_args()
+
+    with open(args.budget, encoding="utf-8") as f:
+        budgets: Dict[str, dict] = json.load(f)
+
+    failures = []
+    print(f"{'target':<48} {'ms':>9} {'budget':>9}  modules")
+    for target, budget in budgets.items():
+        if args.targets and target not in args.targets:
+            continue
+        runs = [probe(target)[0] for _ in range(args.repeat)]
+        seconds = min(r["seconds"] for r in runs)
+        limit = budget["seconds"] * args.scale
+        print(f"{target:<48} {seconds * 1e3:>9.1f} {limit * 1e3:>9.1f}  {len(runs[0]['modules'])}")
+
+        loaded = forbidden(runs[0]["modules"], budget.get("forbid", []))
+        if loaded:
+            failures.append(f"{target}: imports {', '.join(loaded)}")
+        if seconds > limit:
+            failures.append(f"{target}: {seconds * 1e3:.1f} ms over budget {limit * 1e3:.1f} ms")
+            for self_seconds, name in slowest_imports(probe(target, importtime=True)[1]):
+                failures.append(f"    {self_seconds * 1e3:8.1f} ms  {name}")
+
+    if failures:
+        print("\nOVER BUDGET:", file=sys.stderr)
+        for line in failures:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nAll imports within {args.budget}.")
+
+
+if __name__ == "__main__":
+    main()
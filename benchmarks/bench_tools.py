@@ -0,0 +1,222 @@
+"""
+Run every researcher and risk analyst tool on synthetic data, offline, and
+record wall time, throughput and peak memory; compare against a stored
+baseline and exit non-zero on a regression.
+
+Prices come from a StubDownloader over a generated panel, the tool result
+cache is off, and every result must be {"ok": true, ...}. Throughput is
+price cells (dates x tickers) per second. The baseline also keeps a digest of
+every result, so a speed-up that changes the numbers fails the comparison.
+
+Usage: python -m benchmarks.bench_tools [--tickers 50 500] [--years 2] [--gap-rate 0.001]
+       [--baseline benchmarks/baseline_tools.json] [--write-baseline] [--tolerance 0.5]
+"""
+import os
+
+os.environ["FINANCE_CREW_TOOL_CACHE_MB"] = "0"
+os.environ.pop("FINANCE_CREW_TOOL_CACHE_PATH", None)
+
+import argparse
+import base64
+import binascii
+import hashlib
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.finance_crew.analytics import covariance_cache
+from app.finance_crew.market_data import BINARY_FORMAT, StubDownloader, alignment_cache, decode_array
+from app.finance_crew.tools.researcher_agent import (
+    AlignPricePanelTool,
+    ComputeMarketMetricsTool,
+    FetchYFinancePricesTool,
+    HoldingsWeightsTool,
+    ReadPortfolioTickersTool,
+)
+from app.finance_crew.tools.risk_analyst import (
+    BetaCorrelationTool,
+    BuildPortfolioReturnsTool,
+    ConcentrationMetricsTool,
+    CovarianceRiskTool,
+    DataQualityCheckTool,
+    ExposuresVsTargetTool,
+    PortfolioRiskMetricsTool,
+    RiskSuiteTool,
+    RollingRiskTool,
+    ScenarioVarTool,
+    StressTestTool,
+)
+from benchmarks.synthetic import make_asset_map, make_holdings, make_price_frame, make_weights
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline_tools.json")
+BENCHMARK = "SPY"
+
+
+def tool_cases(n_tickers: int, years: float, gap_rate: float, workdir: str) -> Tuple[int, List[Tuple[str, Callable]]]:
+    """(price cells, [(tool name, zero-argument call)]) for one scale."""
+    frame = make_price_frame(n_tickers, years=years, gap_rate=gap_rate, late_rate=0.02, benchmark=BENCHMARK)
+    tickers = [t for t in frame.columns if t != BENCHMARK]
+    holdings_path = os.path.join(workdir, f"holdings_{n_tickers}.csv")
+    make_holdings(tickers, frame, n_rows=4 * n_tickers).to_csv(holdings_path, index=False)
+    weights = json.dumps(make_weights(tickers).iloc[0].round(8).to_dict())
+    books = json.dumps({pid: row.round(8).to_dict() for pid, row in make_weights(tickers, 20).iterrows()})
+    asset_map = json.dumps(make_asset_map(tickers))
+    targets = json.dumps({"equity": 0.4, "bond": 0.3, "commodity": 0.15, "real_estate": 0.15})
+
+    fetch = FetchYFinancePricesTool(downloader=StubDownloader(frame))
+    handle = json.loads(fetch._run(json.dumps(list(frame.columns)), period="max", output_format="handle"))["handle"]
+    returns = BuildPortfolioReturnsTool()._run(handle, weights)
+
+    def covariance():
+        covariance_cache.clear()
+        return CovarianceRiskTool()._run(handle, books, method="ledoit_wolf")
+
+    def align():
+        alignment_cache.clear()
+        return AlignPricePanelTool()._run(handle)
+
+    cases = [
+        ("read_portfolio_tickers", lambda: ReadPortfolioTickersTool()._run(holdings_path, aggregate=True)),
+        ("fetch_yfinance_prices", lambda: fetch._run(json.dumps(list(frame.columns)), period="max")),
+        ("fetch_yfinance_prices[binary]",
+         lambda: fetch._run(json.dumps(list(frame.columns)), period="max", output_format="binary")),
+        ("compute_market_metrics", lambda: ComputeMarketMetricsTool()._run(handle)),
+        ("align_price_panel", align),
+        ("compute_holdings_weights", lambda: HoldingsWeightsTool()._run(holdings_path, handle)),
+        ("build_portfolio_returns", lambda: BuildPortfolioReturnsTool()._run(handle, weights)),
+        ("compute_portfolio_risk_metrics", lambda: PortfolioRiskMetricsTool()._run(returns)),
+        ("compute_exposures_vs_target", lambda: ExposuresVsTargetTool()._run(weights, asset_map, targets)),
+        ("compute_concentration_metrics", lambda: ConcentrationMetricsTool()._run(weights)),
+        ("compute_beta_and_correlations",
+         lambda: BetaCorrelationTool()._run(handle, weights, BENCHMARK, rolling_window=63)),
+        ("validate_portfolio_data_quality", lambda: DataQualityCheckTool()._run(handle, weights)),
+        ("compute_scenario_var[historical]", lambda: ScenarioVarTool()._run(handle, books)),
+        ("compute_scenario_var[normal]",
+         lambda: ScenarioVarTool()._run(handle, books, method="normal", n_scenarios=10_000)),
+        ("compute_covariance_risk", covariance),
+        ("compute_rolling_risk",
+         lambda: RollingRiskTool()._run(handle, weights, BENCHMARK, last_n=1, output_format="binary")),
+        ("run_stress_test", lambda: StressTestTool()._run(handle, books, asset_map_json=asset_map, window_days=21)),
+        ("run_risk_suite",
+         lambda: RiskSuiteTool()._run(handle, weights, asset_map, targets, BENCHMARK)),
+    ]
+    return frame.shape[0] * frame.shape[1], cases
+
+
+def _canonical(value: Any, binary: bool = False) -> Any:
+    """A tool result with floats rounded to 8 significant digits and, inside binary payloads,
+    base64 buffers decoded first; last-bit noise (e.g. BLAS summation order) does not count."""
+    if isinstance(value, float):
+        return float(f"{value:.8g}") + 0.0  # + 0.0 folds -0.0 into 0.0
+    if isinstance(value, dict):
+        binary = binary or value.get("format") == BINARY_FORMAT
+        return {k: _canonical(v, binary) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_canonical(v, binary) for v in value]
+    if binary and isinstance(value, str) and len(value) >= 12:
+        try:
+            raw = base64.b64decode(value, validate=True)
+        except binascii.Error:
+            return value
+        if len(raw) % 8 == 0:
+            return _canonical(decode_array(value).tolist())
+    return value
+
+
+def digest(result: str) -> str:
+    """Short hash of a tool result in canonical form (see _canonical), without its wall-clock "timings"."""
+    obj = json.loads(result)
+    obj.pop("timings", None)
+    canonical = json.dumps(_canonical(obj), sort_keys=True)
+    return hashlib.blake2b(canonical.encode(), digest_size=8).hexdigest()
+
+
+def measure(call: Callable[[], str], repeat: int) -> Tuple[float, float, str]:
+    """(best wall seconds over `repeat` runs, peak traced MB of one more run, result digest);
+    fails on a non-ok result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        best = min(best, time.perf_counter() - start)
+        if not result.startswith('{"ok": true'):
+            raise RuntimeError(result[:300])
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2 ** 20, digest(result)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float,
+            memory_tolerance: float) -> List[str]:
+    """Regressions against the baseline: changed results, then time and memory. Differences under
+    10 ms or 1 MB are noise and never count; baselines without a digest only check speed."""
+    failures = []
+    for key, now in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if base.get("digest", now["digest"]) != now["digest"]:
+            failures.append(f"{key}: result digest {now['digest']} vs baseline {base['digest']}")
+        if now["seconds"] > base["seconds"] * (1 + tolerance) and now["seconds"] - base["seconds"] > 0.010:
+            failures.append(f"{key}: {now['seconds'] * 1e3:.1f} ms vs baseline {base['seconds'] * 1e3:.1f} ms")
+        if now["peak_mb"] > base["peak_mb"] * (1 + memory_tolerance) and now["peak_mb"] - base["peak_mb"] > 1.0:
+            failures.append(f"{key}: peak {now['peak_mb']:.1f} MB vs baseline {base['peak_mb']:.1f} MB")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--years", type=float, default=2.0)
+    parser.add_argument("--gap-rate", type=float, default=0.001)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tools", nargs="*", help="Only run tools whose name contains one of these strings.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--write-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown, as a fraction.")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="Allowed peak memory growth.")
+    args = parser.parse_args()
+
+    results: Dict[str, dict] = {}
+    print(f"{'tool':<36} {'tickers':>7} {'days':>5} {'ms':>9} {'Mcells/s':>9} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.tickers:
+            cells, cases = tool_cases(n, args.years, args.gap_rate, workdir)
+            days = cells // (n + 1)
+            for name, call in cases:
+                if args.tools and not any(s in name for s in args.tools):
+                    continue
+                seconds, peak, result_digest = measure(call, args.repeat)
+                results[f"{name}@{n}x{days}"] = {"seconds": round(seconds, 6), "peak_mb": round(peak, 3),
+                                                 "digest": result_digest}
+                print(f"{name:<36} {n:>7} {days:>5} {seconds * 1e3:>9.2f} {cells / seconds / 1e6:>9.2f} {peak:>8.1f}")
+
+    if args.write_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --write-baseline to create one.")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    failures = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    if failures:
+        print("\nREGRESSIONS:", file=sys.stderr)
+        for line in failures:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nNo regressions against {args.baseline} ({len(set(results) & set(baseline))} comparisons).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare the legacy JSON price/returns payloads with the binary ('npb64') wire
+format: payload size, encode time, and parse time up to the float64 matrix the
+tools compute on. Round trips are checked before anything is timed.
+
+Usage: python -m benchmarks.bench_wire_format [--days 252] [--tickers 100 1000 5000]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.finance_crew.market_data import PricePanel, load_price_panel, load_returns, returns_payload
+from benchmarks.bench_portfolio_returns import make_prices
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_round_trip(panel: PricePanel) -> None:
+    for payload in (panel.to_payload(), panel.to_binary_payload()):
+        back = load_price_panel(json.dumps(payload))
+        assert back.dates == panel.dates and back.tickers == panel.tickers
+        np.testing.assert_array_equal(back.values, panel.values)
+    rets = np.random.default_rng(0).normal(0, 0.01, panel.n_dates - 1)
+    curve = np.cumprod(1.0 + rets)
+    dates, r, c = load_returns(json.loads(json.dumps(returns_payload(panel.dates[1:], rets, curve, "binary"))))
+    assert list(dates) == list(panel.dates[1:])
+    np.testing.assert_array_equal(r, rets)
+    np.testing.assert_array_equal(c, curve)
+    _, r, c = load_returns(json.loads(json.dumps(returns_payload(panel.dates[1:], rets, curve, "json"))))
+    np.testing.assert_allclose(r, rets, atol=1e-10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=252)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    dates = pd.bdate_range("2020-01-01", periods=args.days)
+    print(f"{'tickers':>8} {'json MB':>9} {'binary MB':>10} {'json enc ms':>12} {'bin enc ms':>11} "
+          f"{'json parse ms':>14} {'bin parse ms':>13}")
+    for n in args.tickers:
+        values = make_prices(args.days, n, gap_rate=0.001)
+        panel = PricePanel(values, [d.strftime("%Y-%m-%d") for d in dates], [f"T{i:05d}" for i in range(n)])
+        check_round_trip(panel)
+
+        as_json = json.dumps(panel.to_payload())
+        as_binary = json.dumps(panel.to_binary_payload())
+        enc_json = best_of(lambda: json.dumps(panel.to_payload()))
+        enc_binary = best_of(lambda: json.dumps(panel.to_binary_payload()))
+        parse_json = best_of(lambda: load_price_panel(as_json))
+        parse_binary = best_of(lambda: load_price_panel(as_binary))
+        print(f"{n:>8} {len(as_json) / 1e6:>9.2f} {len(as_binary) / 1e6:>10.2f} {enc_json * 1e3:>12.1f} "
+              f"{enc_binary * 1e3:>11.1f} {parse_json * 1e3:>14.1f} {parse_binary * 1e3:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
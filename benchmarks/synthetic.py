@@ -0,0 +1,80 @@
+"""
+Seeded generators of synthetic market data and portfolios for the benchmarks:
+price frames shaped like a yfinance download (business days x tickers, NaN
+gaps, late listings), lot-level holdings files and weight books.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ASSET_CLASSES = ("equity", "bond", "commodity", "real_estate")
+CASH_TICKER = "CASH"
+TRADING_DAYS = 252
+
+
+def make_tickers(n: int, prefix: str = "T") -> List[str]:
+    width = max(4, len(str(n - 1)))
+    return [f"{prefix}{i:0{width}d}" for i in range(n)]
+
+
+def make_price_frame(n_tickers: int, years: float = 1.0, gap_rate: float = 0.0, late_rate: float = 0.0,
+                     benchmark: Optional[str] = "SPY", start: str = "2005-01-03", seed: int = 7) -> pd.DataFrame:
+    """Close prices for n_tickers (plus the benchmark) over `years` of business days.
+
+    Returns load a common market factor (so betas and correlations are
+    realistic), gap_rate of the cells are NaN, and late_rate of the tickers
+    only list partway through the history.
+    """
+    rng = np.random.default_rng(seed)
+    n_days = max(2, int(round(years * TRADING_DAYS)))
+    market = rng.normal(0.0003, 0.01, size=(n_days, 1))
+    beta = rng.uniform(0.5, 1.5, size=(1, n_tickers))
+    rets = market * beta + rng.normal(0.0, 0.012, size=(n_days, n_tickers))
+    prices = rng.uniform(10.0, 500.0, size=(1, n_tickers)) * np.cumprod(1.0 + rets, axis=0)
+    prices[rng.random(prices.shape) < gap_rate] = np.nan
+    late = np.flatnonzero(rng.random(n_tickers) < late_rate)
+    for col, first in zip(late, rng.integers(1, n_days, size=len(late))):
+        prices[:first, col] = np.nan
+    frame = pd.DataFrame(prices, index=pd.bdate_range(start, periods=n_days), columns=make_tickers(n_tickers))
+    if benchmark:
+        frame[benchmark] = 400.0 * np.cumprod(1.0 + market[:, 0])
+    return frame
+
+
+def make_asset_map(tickers: List[str], seed: int = 7) -> Dict[str, str]:
+    rng = np.random.default_rng(seed)
+    return {t: ASSET_CLASSES[i] for t, i in zip(tickers, rng.integers(0, len(ASSET_CLASSES), size=len(tickers)))}
+
+
+def make_weights(tickers: List[str], n_portfolios: int = 1, concentration: float = 1.0,
+                 seed: int = 7) -> pd.DataFrame:
+    """Long-only portfolios x tickers weights, each row a Dirichlet draw summing to 1."""
+    rng = np.random.default_rng(seed)
+    w = rng.dirichlet(np.full(len(tickers), concentration), size=n_portfolios)
+    return pd.DataFrame(w, index=[f"P{i:05d}" for i in range(n_portfolios)], columns=tickers)
+
+
+def make_holdings(tickers: List[str], prices: pd.DataFrame, n_rows: Optional[int] = None,
+                  cash_weight: float = 0.02, seed: int = 7) -> pd.DataFrame:
+    """Lot-level holdings (ticker, quantity, asset_class, target_weight) worth about 1M,
+    with n_rows lots (default: one per ticker) and a cash line."""
+    rng = np.random.default_rng(seed)
+    n_rows = n_rows or len(tickers)
+    lots = np.concatenate([np.arange(len(tickers)), rng.integers(0, len(tickers), size=n_rows - len(tickers))]) \
+        if n_rows > len(tickers) else np.arange(len(tickers))
+    last = prices[tickers].ffill().iloc[-1].to_numpy()
+    value = rng.dirichlet(np.ones(len(tickers))) * (1.0 - cash_weight) * 1e6
+    share = np.bincount(lots, minlength=len(tickers))
+    quantity = np.floor(value[lots] / share[lots] / np.where(np.isnan(last[lots]), 1.0, last[lots]))
+    target = rng.dirichlet(np.ones(len(tickers))) * (1.0 - cash_weight)
+    asset_map = make_asset_map(tickers, seed)
+    frame = pd.DataFrame({
+        "ticker": np.asarray(tickers, dtype=object)[lots],
+        "quantity": quantity,
+        "asset_class": [asset_map[tickers[i]] for i in lots],
+        "target_weight": target[lots] / share[lots],
+    })
+    cash = pd.DataFrame({"ticker": [CASH_TICKER], "quantity": [cash_weight * 1e6], "asset_class": ["cash"],
+                         "target_weight": [cash_weight]})
+    return pd.concat([frame, cash], ignore_index=True)
@@ -0,0 +1,27 @@
+import json
+
+from app.finance_crew.market_data import PricePanel, load_price_panel, price_store
+from app.finance_crew.tools.researcher_agent import AlignPricePanelTool
+from app.finance_crew.tools.tool_cache import tool_cache
+from benchmarks.synthetic import make_price_frame
+
+
+def test_handle_still_resolves_after_the_store_is_cleared():
+    frame = make_price_frame(3, years=0.5, gap_rate=0.05, seed=8)
+    prices_json = json.dumps(PricePanel.from_frame(frame).to_payload())
+    tool = AlignPricePanelTool()
+
+    first = json.loads(tool._run(prices_json=prices_json))
+    price_store.clear()
+    second = json.loads(tool._run(prices_json=prices_json))
+    assert second["handle"] == first["handle"]
+    assert list(load_price_panel(second["handle"]).tickers) == list(frame.columns)
+
+
+def test_inline_output_is_memoized():
+    prices_json = json.dumps(PricePanel.from_frame(make_price_frame(3, years=0.5, seed=9)).to_payload())
+    tool = AlignPricePanelTool()
+    first = tool._run(prices_json=prices_json, output_format="binary")
+    hits = tool_cache.stats()["tools"].get(tool.name, {}).get("hits", 0)
+    assert tool._run(prices_json=prices_json, output_format="binary") == first
+    assert tool_cache.stats()["tools"][tool.name]["hits"] == hits + 1
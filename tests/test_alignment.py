@@ -0,0 +1,112 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.finance_crew.market_data import AlignmentCache, AlignmentConfig, PricePanel, alignment, alignment_cache
+from app.finance_crew.market_data.alignment import align_panel, fill_gaps, quality_stats
+from app.finance_crew.tools.risk_analyst import BetaCorrelationTool, BuildPortfolioReturnsTool
+from benchmarks.synthetic import make_price_frame
+
+NAN = np.nan
+
+
+def panel(values, dates=None, tickers=None) -> PricePanel:
+    values = np.asarray(values, dtype=np.float64)
+    dates = dates or [d.strftime("%Y-%m-%d") for d in pd.bdate_range("2024-01-01", periods=len(values))]
+    return PricePanel(values, dates, tickers or [f"T{j}" for j in range(values.shape[1])])
+
+
+@pytest.mark.parametrize("limit", [0, 1, 2, 3])
+def test_ffill_matches_pandas_with_limit(limit):
+    values = np.array([[NAN, 1.0], [2.0, NAN], [NAN, NAN], [NAN, NAN], [5.0, 3.0], [NAN, NAN]])
+    expected = pd.DataFrame(values).ffill(limit=limit or None).to_numpy()
+    np.testing.assert_array_equal(fill_gaps(values, "ffill", limit), expected)
+
+
+@pytest.mark.parametrize("limit", [0, 1, 2])
+def test_interpolate_fills_only_inner_gaps_up_to_limit(limit):
+    values = np.array([[NAN], [1.0], [NAN], [NAN], [4.0], [NAN], [6.0], [NAN]])
+    out = fill_gaps(values, "interpolate", limit)[:, 0]
+    assert np.isnan(out[0]) and np.isnan(out[-1])
+    assert out[5] == 5.0
+    if limit == 1:
+        assert np.isnan(out[2]) and np.isnan(out[3])
+    else:
+        np.testing.assert_allclose(out[2:4], [2.0, 3.0])
+
+
+def test_calendars():
+    dates = ["2024-01-01", "2024-01-02", "2024-01-04", "2024-01-05"]  # no 2024-01-03
+    p = panel([[1.0, NAN], [2.0, 10.0], [NAN, 11.0], [4.0, 12.0]], dates, ["A", "B"])
+    none = dict(fill="none")
+    assert align_panel(p, AlignmentConfig(calendar="union", **none)).panel.dates == tuple(dates)
+    # B is not listed yet on 01-01, so only A's gap on 01-04 removes a date.
+    assert align_panel(p, AlignmentConfig(calendar="common", **none)).panel.dates == ("2024-01-01", "2024-01-02",
+                                                                                      "2024-01-05")
+    assert align_panel(p, AlignmentConfig(calendar="B", **none)).panel.dates == ("2024-01-02", "2024-01-04",
+                                                                                 "2024-01-05")
+    business = align_panel(p, AlignmentConfig(calendar="business", **none))
+    assert business.panel.dates[2] == "2024-01-03" and np.isnan(business.panel.values[2]).all()
+    assert business.quality.ticker("A")["missing"] == 2
+    with pytest.raises(ValueError):
+        align_panel(p, AlignmentConfig(calendar="XYZ"))
+
+
+def test_quality_stats():
+    col_a = [NAN, 1.0, NAN, NAN, 2.0, 2.0, 2.0, 2.0, 3.0, NAN]
+    col_b = [1.0, 1.01, 0.99, 1.0, 1.02, 5.0, 1.01, 1.0, 0.99, 1.0]
+    q = quality_stats(np.array([col_a, col_b]).T, ["A", "B"], stale_run=3, outlier_z=8.0)
+    a, b = q.ticker("A"), q.ticker("B")
+    assert (a["observations"], a["missing"], a["leading"], a["trailing"], a["max_gap"]) == (6, 2, 1, 1, 2)
+    assert (a["stale_runs"], a["max_stale"]) == (1, 4)
+    # The spike is two jumps: up into 5.0 and back down.
+    assert b["outliers"] == 2 and b["max_abs_return"] == pytest.approx(5.0 / 1.02 - 1.0, abs=1e-6)
+    assert q.flagged() == ["A", "B"]
+
+
+def test_drop_removes_dates_with_listed_gaps():
+    p = panel([[NAN, 1.0], [1.0, 2.0], [NAN, 3.0], [2.0, 4.0]])
+    aligned = align_panel(p, AlignmentConfig(fill="drop"))
+    assert aligned.panel.n_dates == 3 and aligned.quality.dropped_dates == 1
+
+
+def test_cache_keys_by_config_even_when_alignment_is_a_no_op():
+    # Gap-free: the aligned panel has the source's key, which must not leak one config's stats into another.
+    p = panel([[1.0], [2.0], [2.0], [2.0], [3.0]])
+    cache = AlignmentCache()
+    assert cache.get_or_align(p).quality.ticker("T0")["stale_runs"] == 0
+    stale3 = cache.get_or_align(p, AlignmentConfig(stale_run=3))
+    assert stale3.quality.ticker("T0")["stale_runs"] == 1
+    assert stale3.config == AlignmentConfig(stale_run=3)
+    assert len(cache) == 2
+
+
+def test_cache_finds_raw_stats_from_an_aligned_panel():
+    p = panel([[1.0], [NAN], [3.0]])
+    cache = AlignmentCache()
+    aligned = cache.get_or_align(p)
+    assert cache.get_or_align(aligned.panel) is aligned
+    # Another config on the aligned panel is a new alignment of the (filled) aligned data.
+    assert cache.get_or_align(aligned.panel, AlignmentConfig(fill="none")).quality.ticker("T0")["missing"] == 0
+
+
+def test_tools_share_one_alignment(monkeypatch):
+    frame = make_price_frame(4, years=0.5, gap_rate=0.05, seed=12)
+    raw = PricePanel.from_frame(frame)
+    prices_json = json.dumps(raw.to_payload())
+    aligned_json = json.dumps(align_panel(raw).panel.to_payload())
+    weights_json = json.dumps({t: 0.25 for t in frame.columns[:4]})
+
+    alignment_cache.clear()
+    calls = []
+    monkeypatch.setattr(alignment, "align_panel", lambda *a: calls.append(a) or align_panel(*a))
+
+    filled = BuildPortfolioReturnsTool()._run(prices_json=prices_json, weights_json=weights_json, fill="ffill")
+    beta = BetaCorrelationTool()._run(prices_json=prices_json, weights_json=weights_json, benchmark="SPY",
+                                      fill="ffill")
+    assert len(calls) == 1
+    assert filled == BuildPortfolioReturnsTool()._run(prices_json=aligned_json, weights_json=weights_json)
+    assert beta == BetaCorrelationTool()._run(prices_json=aligned_json, weights_json=weights_json, benchmark="SPY")
+    assert filled != BuildPortfolioReturnsTool()._run(prices_json=prices_json, weights_json=weights_json)
@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.finance_crew.market_data import PricePanel
+from app.finance_crew.pipeline import run_batch
+from app.finance_crew.tools.risk_analyst import (
+    BetaCorrelationTool,
+    BuildPortfolioReturnsTool,
+    ConcentrationMetricsTool,
+    ExposuresVsTargetTool,
+    PortfolioRiskMetricsTool,
+    ScenarioVarTool,
+)
+from benchmarks.synthetic import make_asset_map, make_price_frame, make_tickers, make_weights
+
+N_SCENARIOS = 2_000
+
+
+@pytest.fixture(scope="module")
+def book():
+    tickers = make_tickers(10)
+    frame = make_price_frame(10, years=1.0, gap_rate=0.03, late_rate=0.2, seed=31)
+    weights = make_weights(tickers, n_portfolios=5, concentration=0.5, seed=4)
+    weights.iloc[1, :4] = 0.0  # a portfolio that does not hold every ticker
+    weights.iloc[2] *= 0.9  # and one whose weights are rescaled for returns
+    targets = make_weights(tickers, n_portfolios=5, seed=5)
+    asset_map = make_asset_map(tickers, seed=4)
+    panel = PricePanel.from_frame(frame)
+    result = run_batch(weights, panel, asset_map=asset_map, targets=targets, benchmark="SPY",
+                       mc_method="bootstrap", n_scenarios=N_SCENARIOS, seed=0, chunk_size=2)
+    return weights, targets, asset_map, json.dumps(panel.to_payload()), result
+
+
+def portfolios(book):
+    weights, targets, asset_map, prices_json, result = book
+    for pid in weights.index:
+        held = {t: float(w) for t, w in weights.loc[pid].items() if w != 0}
+        yield pid, held, targets.loc[pid].to_dict(), asset_map, prices_json, result.loc[pid]
+
+
+def call(tool, **kwargs) -> dict:
+    out = json.loads(tool._run(**kwargs))
+    assert out["ok"], out
+    return out
+
+
+def test_risk_metrics_match_the_single_portfolio_tools(book):
+    for pid, held, _, _, prices_json, row in portfolios(book):
+        returns_json = BuildPortfolioReturnsTool()._run(prices_json=prices_json, weights_json=json.dumps(held))
+        metrics = call(PortfolioRiskMetricsTool(), portfolio_returns_json=returns_json)["metrics"]
+        assert row["ann_vol"] == pytest.approx(metrics["ann_vol"], abs=1e-6), pid
+        assert row["max_drawdown"] == pytest.approx(metrics["max_drawdown"], abs=1e-6), pid
+        assert row["var_daily"] == pytest.approx(metrics["var95_daily"], abs=1e-6), pid
+        assert row["var_annual"] == pytest.approx(metrics["var_annual"], abs=1e-6), pid
+
+
+@pytest.mark.parametrize("method", ["historical", "bootstrap"])
+def test_var_matches_the_scenario_tool(book, method):
+    prefix = "hist" if method == "historical" else "mc"
+    for pid, held, _, _, prices_json, row in portfolios(book):
+        metrics = call(ScenarioVarTool(), prices_json=prices_json, weights_json=json.dumps(held), method=method,
+                       n_scenarios=N_SCENARIOS, seed=0)["metrics"]
+        assert row[f"{prefix}_var_daily"] == pytest.approx(metrics["var_daily"], abs=1e-6), pid
+        assert row[f"{prefix}_cvar_daily"] == pytest.approx(metrics["cvar_daily"], abs=1e-6), pid
+
+
+def test_concentration_beta_and_exposures_match_the_tools(book):
+    for pid, held, targets, asset_map, prices_json, row in portfolios(book):
+        hhi = call(ConcentrationMetricsTool(), weights_json=json.dumps(held))["hhi"]
+        assert row["hhi"] == pytest.approx(hhi, abs=1e-6), pid
+        beta = call(BetaCorrelationTool(), prices_json=prices_json, weights_json=json.dumps(held),
+                    benchmark="SPY")["portfolio_beta"]
+        assert row["beta"] == pytest.approx(beta, abs=1e-6), pid
+        exposures = call(ExposuresVsTargetTool(), weights_json=json.dumps(held),
+                         asset_map_json=json.dumps(asset_map), target_weights_json=json.dumps(targets))
+        for cls, current in exposures["current_exposures"].items():
+            assert row[f"exposure_{cls}"] == pytest.approx(current, abs=1e-6), (pid, cls)
+            assert row[f"target_{cls}"] == pytest.approx(exposures["target_exposures"][cls], abs=1e-6)
+            assert row[f"delta_{cls}"] == pytest.approx(exposures["deltas"][cls], abs=1e-6)
+
+
+def test_chunk_size_does_not_change_results(book):
+    weights, targets, asset_map, _, result = book
+    panel = PricePanel.from_frame(make_price_frame(10, years=1.0, gap_rate=0.03, late_rate=0.2, seed=31))
+    whole = run_batch(weights, panel, asset_map=asset_map, targets=targets, benchmark="SPY",
+                      mc_method="bootstrap", n_scenarios=N_SCENARIOS, seed=0, chunk_size=1_000)
+    np.testing.assert_allclose(whole.to_numpy(dtype=float), result.to_numpy(dtype=float), rtol=1e-12)
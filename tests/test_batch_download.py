@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.finance_crew.market_data import BatchDownloader, StubDownloader, TokenBucket
+
+
+def price_frame(tickers, days: int = 20) -> pd.DataFrame:
+    index = pd.bdate_range("2024-01-01", periods=days)
+    return pd.DataFrame({t: 10.0 + j + np.arange(days, dtype=np.float64) for j, t in enumerate(tickers)},
+                        index=index)
+
+
+class FakeTime:
+    """Clock and sleep for TokenBucket/BatchDownloader: sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+TICKERS = [f"T{i:02d}" for i in range(10)]
+
+
+def test_chunks_are_merged_in_requested_order():
+    stub = StubDownloader(price_frame(TICKERS))
+    fake = FakeTime()
+    batch = BatchDownloader(stub, chunk_size=3, max_workers=4, sleep=fake.sleep)
+    requested = TICKERS[::-1] + ["T00"]
+
+    result = batch.download_batch(requested, period="1mo")
+    assert sorted(len(c["tickers"]) for c in stub.calls) == [1, 3, 3, 3]
+    assert list(result.prices.columns) == TICKERS[::-1]
+    pd.testing.assert_frame_equal(result.prices, stub.frame[TICKERS[::-1]], check_freq=False)
+    assert result.failed == {} and result.attempts == 4 and fake.sleeps == []
+
+
+def test_retries_with_exponential_backoff():
+    stub = StubDownloader(price_frame(TICKERS[:2]), flaky={"T00": 2})
+    fake = FakeTime()
+    batch = BatchDownloader(stub, chunk_size=5, max_workers=1, max_retries=3, backoff=1.0, sleep=fake.sleep)
+
+    result = batch.download_batch(TICKERS[:2], period="1mo")
+    assert fake.sleeps == [1.0, 2.0]
+    assert result.attempts == 3 and result.failed == {}
+    assert list(result.prices.columns) == TICKERS[:2]
+
+
+def test_only_missing_tickers_are_retried_and_reported_failed():
+    stub = StubDownloader(price_frame(TICKERS[:3]), dead=["T01"])
+    fake = FakeTime()
+    batch = BatchDownloader(stub, chunk_size=5, max_workers=1, max_retries=3, backoff=1.0, max_backoff=3.0,
+                            sleep=fake.sleep)
+
+    result = batch.download_batch(TICKERS[:3] + ["NOPE"], period="1mo")
+    assert stub.calls[0]["tickers"] == TICKERS[:3] + ["NOPE"]
+    assert all(c["tickers"] == ["T01", "NOPE"] for c in stub.calls[1:])
+    assert fake.sleeps == [1.0, 2.0, 3.0]
+    assert result.failed == {"T01": "No data returned.", "NOPE": "No data returned."}
+    assert list(result.prices.columns) == ["T00", "T02"]
+
+
+def test_exhausted_retries_report_the_last_error():
+    stub = StubDownloader(price_frame(TICKERS[:2]), fail_rate=1.0)
+    batch = BatchDownloader(stub, chunk_size=5, max_workers=1, max_retries=2, sleep=FakeTime().sleep)
+
+    prices = batch.download(TICKERS[:2], period="1mo")
+    assert prices.empty
+    assert set(prices.attrs["failed"]) == set(TICKERS[:2])
+    assert prices.attrs["failed"]["T00"].startswith("ConnectionError")
+    assert len(stub.calls) == 0  # StubDownloader raises before recording the call
+
+
+def test_token_bucket_waits_for_refill():
+    fake = FakeTime()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=fake.clock, sleep=fake.sleep)
+    for _ in range(3):
+        bucket.acquire()
+    assert fake.sleeps == [pytest.approx(0.5)]
+
+
+def test_token_bucket_rejects_impossible_requests():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1.0, capacity=0.0)
+    bucket = TokenBucket(rate=1.0, capacity=0.5)
+    with pytest.raises(ValueError):
+        bucket.acquire()
+    with pytest.raises(ValueError):
+        BatchDownloader(StubDownloader(price_frame(TICKERS)), rate_limit=5.0, burst=0.5)
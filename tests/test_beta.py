@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from app.finance_crew.analytics import (
+    beta_correlation,
+    correlation_matrix,
+    price_beta_correlation,
+    rolling_beta,
+    simple_returns,
+)
+from benchmarks.synthetic import make_price_frame
+
+
+@pytest.fixture(scope="module")
+def prices():
+    return make_price_frame(6, years=1.0, gap_rate=0.05, late_rate=0.3, seed=17)
+
+
+@pytest.fixture(scope="module")
+def rets(prices):
+    out = simple_returns(prices.drop(columns="SPY").to_numpy())
+    out[:, 0] = np.where(np.isnan(out[:, 0]), np.nan, 0.001)  # a constant series: beta 0, no correlation
+    return out
+
+
+@pytest.fixture(scope="module")
+def bench(prices):
+    out = simple_returns(prices[["SPY"]].to_numpy())[:, 0]
+    out[::11] = np.nan  # benchmark gaps the tickers do not share
+    return out
+
+
+def pairs(x: np.ndarray, y: np.ndarray):
+    both = ~np.isnan(x) & ~np.isnan(y)
+    return x[both], y[both]
+
+
+def test_beta_and_correlation_match_np_cov_on_aligned_dates(rets, bench):
+    beta, corr, n = beta_correlation(rets, bench)
+    for j in range(rets.shape[1]):
+        x, y = pairs(rets[:, j], bench)
+        assert n[j] == len(x) and len(x) < len(bench)
+        cov = np.cov(x, y, bias=True)
+        assert beta[j] == pytest.approx(cov[0, 1] / cov[1, 1], rel=1e-9, abs=1e-12)
+        if j == 0:
+            assert np.isnan(corr[j])
+        else:
+            assert corr[j] == pytest.approx(np.corrcoef(x, y)[0, 1], rel=1e-9)
+
+
+def test_too_few_pairs_are_nan(rets, bench):
+    sparse = rets.copy()
+    sparse[2:, 1] = np.nan
+    beta, corr, n = beta_correlation(sparse, bench, min_obs=3)
+    assert n[1] < 3 and np.isnan(beta[1]) and np.isnan(corr[1])
+    assert np.isfinite(beta[2:]).all()
+
+
+@pytest.mark.parametrize("window", [5, 21, 63])
+def test_rolling_beta_matches_np_cov_per_window(rets, bench, window):
+    got = rolling_beta(rets, bench, window)
+    min_obs = max(2, window // 2)
+    assert np.isnan(got[:window - 1]).all()
+    for i in range(window - 1, len(bench)):
+        for j in range(rets.shape[1]):
+            x, y = pairs(rets[i - window + 1:i + 1, j], bench[i - window + 1:i + 1])
+            if len(x) < min_obs:
+                assert np.isnan(got[i, j]), (i, j)
+                continue
+            cov = np.cov(x, y, bias=True)
+            assert got[i, j] == pytest.approx(cov[0, 1] / cov[1, 1], rel=1e-7, abs=1e-9), (i, j)
+
+
+def test_correlation_matrix_uses_pairwise_complete_dates(rets):
+    got = correlation_matrix(rets[:, 1:])
+    for a in range(got.shape[0]):
+        for b in range(got.shape[1]):
+            x, y = pairs(rets[:, 1 + a], rets[:, 1 + b])
+            assert got[a, b] == pytest.approx(np.corrcoef(x, y)[0, 1], rel=1e-9), (a, b)
+
+
+def test_price_kernel_is_returns_then_beta(prices, bench):
+    values = prices.drop(columns="SPY").to_numpy()
+    beta, corr, n, rolling = price_beta_correlation(values, bench, rolling_window=21)
+    expected = beta_correlation(simple_returns(values), bench)
+    for got, want in zip((beta, corr, n), expected):
+        np.testing.assert_array_equal(got, want)
+    np.testing.assert_array_equal(rolling, rolling_beta(simple_returns(values), bench, 21))
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.finance_crew.market_data import PricePanel
+from app.finance_crew.tools.risk_analyst import BetaCorrelationTool
+from app.finance_crew.tools.risk_analyst.BetaCorrelationTool import BetaCorrelationInput
+from benchmarks.synthetic import make_price_frame
+
+
+@pytest.fixture(scope="module")
+def prices_json():
+    return json.dumps(PricePanel.from_frame(make_price_frame(4, years=0.5, seed=3)).to_payload())
+
+
+def run(prices_json: str, **kwargs) -> dict:
+    return json.loads(BetaCorrelationTool()._run(prices_json=prices_json, weights_json='{"T0000": 1.0}',
+                                                 benchmark="SPY", **kwargs))
+
+
+@pytest.mark.parametrize("window", [1, -5])
+def test_too_short_rolling_window_is_rejected_up_front(prices_json, window):
+    out = run(prices_json, rolling_window=window)
+    assert out == {"ok": False, "error": "rolling_window must be 0 (off) or >= 2 trading days."}
+
+
+def test_schema_rejects_negative_window():
+    with pytest.raises(ValidationError):
+        BetaCorrelationInput(prices_json="{}", weights_json="{}", benchmark="SPY", rolling_window=-1)
+
+
+def test_static_and_rolling_betas(prices_json):
+    static = run(prices_json)
+    rolling = run(prices_json, rolling_window=2)
+    assert static["ok"] and rolling["ok"]
+    assert rolling["betas"] == static["betas"]
+    assert "rolling_betas" in rolling and "rolling_betas" not in static
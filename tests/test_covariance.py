@@ -0,0 +1,36 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.finance_crew.analytics import CovarianceModel, portfolio_returns, simple_returns
+from app.finance_crew.market_data import PricePanel
+from app.finance_crew.tools.risk_analyst import (
+    BuildPortfolioReturnsTool,
+    CovarianceRiskTool,
+    PortfolioRiskMetricsTool,
+)
+from benchmarks.synthetic import make_price_frame
+
+
+def test_sample_volatility_matches_portfolio_risk_without_gaps():
+    frame = make_price_frame(5, years=1.0, benchmark=None, seed=4)
+    prices_json = json.dumps(PricePanel.from_frame(frame).to_payload())
+    weights_json = json.dumps({t: w for t, w in zip(frame.columns, [0.3, 0.25, 0.2, 0.15, 0.1])})
+
+    cov = json.loads(CovarianceRiskTool()._run(prices_json=prices_json, weights_json=weights_json))
+    returns = BuildPortfolioReturnsTool()._run(prices_json=prices_json, weights_json=weights_json,
+                                               output_format="binary")
+    risk = json.loads(PortfolioRiskMetricsTool()._run(portfolio_returns_json=returns))
+    assert cov["metrics"]["ann_vol"] == pytest.approx(risk["metrics"]["ann_vol"], abs=2e-6)
+
+
+def test_gaps_count_as_zero_per_ticker():
+    rets = simple_returns(make_price_frame(3, years=0.5, gap_rate=0.1, benchmark=None, seed=2).to_numpy())
+    w = np.array([0.5, 0.3, 0.2])
+    model = CovarianceModel.fit(rets)
+    per_ticker = np.nan_to_num(rets) @ w
+    assert float(model.volatility(w)) == pytest.approx(per_ticker.std(ddof=1))
+    # build_portfolio_returns zeroes the whole day instead, so the two differ on gappy panels.
+    port, _ = portfolio_returns(rets, w)
+    assert port.std(ddof=1) != pytest.approx(per_ticker.std(ddof=1))
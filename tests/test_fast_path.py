@@ -0,0 +1,43 @@
+import pickle
+
+import pytest
+
+from app.finance_crew.market_data import InMemoryDownloader
+from app.finance_crew.pipeline import build_quant_dag, execute_quant_pipeline, run_quant_pipeline
+from app.finance_crew.pipeline.fast_path import summarize
+from benchmarks.synthetic import make_holdings, make_price_frame, make_tickers
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return make_price_frame(8, years=1.0, gap_rate=0.01, seed=5)
+
+
+@pytest.fixture
+def dataset(tmp_path, frame):
+    path = tmp_path / "portfolio.csv"
+    make_holdings(make_tickers(8), frame).to_csv(path, index=False)
+    return str(path)
+
+
+def test_summary_reports_stage_timings(dataset, frame):
+    metrics = run_quant_pipeline(dataset, downloader=InMemoryDownloader(frame))
+    timings = metrics["timings"]
+    assert set(timings["nodes"]) == {"holdings", "prices", "aligned", "market_metrics", "weights", "returns", "risk",
+                                     "exposures", "concentration", "beta", "rebalance", "data_quality"}
+    assert timings["critical_path"][0] == "holdings" and timings["critical_path_ms"] <= timings["wall_ms"]
+
+
+def test_dag_is_picklable():
+    dag = build_quant_dag(downloader=InMemoryDownloader(make_price_frame(2)))
+    for node in dag.nodes.values():
+        pickle.dumps(node.fn)
+
+
+def test_process_mode_matches_threads(dataset, frame, tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCE_CREW_PANEL_DIR", str(tmp_path / "panels"))
+    threaded = execute_quant_pipeline(dataset, downloader=InMemoryDownloader(frame), mode="thread")
+    processes = execute_quant_pipeline(dataset, downloader=InMemoryDownloader(frame), mode="process",
+                                       max_workers=2)
+    assert "path" in processes.results["prices"]
+    assert summarize(processes.results) == summarize(threaded.results)
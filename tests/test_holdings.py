@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.finance_crew.portfolio import aggregate_holdings, scan_holdings
+from app.finance_crew.tools.researcher_agent import ReadPortfolioTickersTool
+from benchmarks.synthetic import make_holdings, make_price_frame, make_tickers
+
+
+@pytest.fixture(scope="module")
+def lots():
+    tickers = make_tickers(15)
+    frame = make_holdings(tickers, make_price_frame(15, years=0.2, seed=2), n_rows=200, seed=6)
+    rng = np.random.default_rng(8)
+    # Same tickers spelled with stray whitespace, a relabelled late lot and a row without a ticker.
+    pad = rng.random(len(frame)) < 0.2
+    frame.loc[pad, "ticker"] = [f" {t}  " if i % 2 else f"{t} " for i, t in enumerate(frame.loc[pad, "ticker"])]
+    frame.loc[len(frame) - 2, "asset_class"] = "relabelled"
+    frame.loc[len(frame)] = [np.nan, 5.0, "equity", 0.0]
+    return frame
+
+
+def reference(frame: pd.DataFrame) -> pd.DataFrame:
+    rows = frame.dropna(subset=["ticker"]).assign(ticker=lambda f: f["ticker"].str.strip())
+    out = rows.groupby("ticker").agg(quantity=("quantity", "sum"), asset_class=("asset_class", "first"),
+                                     target_weight=("target_weight", "sum"))
+    return out.astype({"asset_class": object})
+
+
+def assert_holdings_equal(got: pd.DataFrame, expected: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(got[expected.columns], expected, check_exact=False, rtol=1e-12,
+                                  check_index_type=False)
+
+
+@pytest.fixture
+def csv_path(tmp_path, lots):
+    path = tmp_path / "holdings.csv"
+    lots.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 64, 10_000])
+def test_chunk_boundaries_do_not_change_the_aggregates(csv_path, lots, chunk_rows):
+    scan = scan_holdings(csv_path, chunk_rows=chunk_rows)
+    expected = reference(lots)
+    assert scan.row_count == len(lots)
+    assert scan.tickers == list(expected.index)
+    assert_holdings_equal(scan.holdings, expected)
+
+
+def test_whitespace_variants_are_one_ticker(csv_path, lots):
+    scan = scan_holdings(csv_path, chunk_rows=13)
+    assert all(t == t.strip() for t in scan.tickers)
+    assert len(scan.tickers) == lots["ticker"].dropna().str.strip().nunique()
+
+
+def test_first_seen_asset_class_wins_across_chunks(csv_path, lots):
+    relabelled = lots.loc[len(lots) - 3, "ticker"].strip()
+    scan = scan_holdings(csv_path, chunk_rows=5)
+    assert scan.holdings.loc[relabelled, "asset_class"] != "relabelled"
+
+
+def test_in_memory_aggregation_matches_the_scan(lots):
+    assert_holdings_equal(aggregate_holdings(lots), reference(lots))
+
+
+def test_tickers_only_scan(csv_path, lots):
+    scan = scan_holdings(csv_path, aggregate=False, chunk_rows=9)
+    assert scan.tickers == list(reference(lots).index)
+    assert list(scan.holdings.columns) == []
+
+
+def test_parquet_matches_csv(tmp_path, csv_path, lots):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "holdings.parquet"
+    lots.to_parquet(path, index=False)
+    scan = scan_holdings(str(path), chunk_rows=11)
+    assert scan.row_count == len(lots)
+    assert_holdings_equal(scan.holdings, reference(lots))
+    assert scan.tickers == scan_holdings(csv_path).tickers
+
+
+def test_tool_returns_aggregated_holdings(csv_path, lots):
+    out = json.loads(ReadPortfolioTickersTool(chunk_rows=17)._run(dataset_path=csv_path, aggregate=True))
+    expected = reference(lots)
+    assert out["ok"] and out["row_count"] == len(lots) and out["tickers"] == list(expected.index)
+    for ticker, row in expected.iterrows():
+        got = out["holdings"][ticker]
+        assert got["quantity"] == pytest.approx(row["quantity"])
+        assert got["target_weight"] == pytest.approx(row["target_weight"])
+        assert got["asset_class"] == row["asset_class"]
+
+
+def test_tool_reports_a_missing_ticker_column(csv_path):
+    out = json.loads(ReadPortfolioTickersTool()._run(dataset_path=csv_path, ticker_column="symbol"))
+    assert out == {"ok": False, "error": "Missing column 'symbol' in CSV."}
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from crewai.events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+
+from app.finance_crew.profiling import tracer
+from app.finance_crew.profiling.listener import LLMTraceListener
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeBus:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event_type):
+        def register(fn):
+            self.handlers[event_type] = fn
+            return fn
+        return register
+
+
+class TokenProcess:
+    prompt_tokens = completion_tokens = total_tokens = 0
+
+
+@pytest.fixture
+def bus():
+    bus = FakeBus()
+    LLMTraceListener().setup_listeners(bus)
+    tracer.start(track_memory=False)
+    yield bus.handlers
+    tracer.stop()
+
+
+def event(ms: int, **fields):
+    # The fields crewai 0.186 events carry: no call_id, no usage, no model on failures.
+    return SimpleNamespace(timestamp=T0 + timedelta(milliseconds=ms), agent_id="a1", task_id="t1",
+                           agent_role="Analyst", **fields)
+
+
+def test_pinned_crewai_events_become_spans_with_token_usage(bus):
+    llm, counter = object(), TokenProcess()
+    callbacks = [SimpleNamespace(token_cost_process=counter)]
+    bus[LLMCallStartedEvent](llm, event(0, model="gpt", messages="hello", callbacks=callbacks))
+    counter.prompt_tokens, counter.completion_tokens, counter.total_tokens = 7, 3, 10
+    bus[LLMCallCompletedEvent](llm, event(250, model="gpt", response="done"))
+
+    bus[LLMCallStartedEvent](llm, event(300, model="gpt", messages="again", callbacks=callbacks))
+    bus[LLMCallFailedEvent](llm, event(400, error="boom"))
+
+    ok, failed = [e for e in tracer.events if e["cat"] == "llm"]
+    assert ok["name"] == "gpt" and ok["dur"] == 250_000 and ok["bytes_in"] == 5 and ok["bytes_out"] == 4
+    assert (ok["prompt_tokens"], ok["completion_tokens"], ok["total_tokens"]) == (7, 3, 10)
+    assert ok["args"] == {"agent": "Analyst"}
+    assert failed["name"] == "gpt" and failed["error"] == "boom" and "total_tokens" not in failed
+
+
+def test_reported_usage_and_call_id_are_used_when_present(bus):
+    llm = object()
+    bus[LLMCallStartedEvent](llm, event(0, call_id="c1", model="gpt", messages=""))
+    bus[LLMCallStartedEvent](llm, event(10, call_id="c2", model="gpt", messages=""))
+    bus[LLMCallCompletedEvent](llm, event(50, call_id="c1", model="gpt", response="",
+                                          usage={"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3}))
+    (span,) = [e for e in tracer.events if e["cat"] == "llm"]
+    assert span["dur"] == 50_000 and span["total_tokens"] == 3
@@ -0,0 +1,68 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.finance_crew.market_data import PanelFileWriter, open_panel_file, panel_paths
+from app.finance_crew.market_data import panel_file
+from benchmarks.synthetic import make_price_frame
+
+
+def write(path, frame):
+    with PanelFileWriter(path) as writer:
+        for start in range(0, frame.shape[1], 2):
+            writer.add(frame.iloc[:, start:start + 2])
+    return open_panel_file(path)
+
+
+def disk_full(*args, **kwargs):
+    raise OSError("disk full")
+
+
+def test_round_trip_in_chunks(tmp_path):
+    frame = make_price_frame(5, years=0.5, gap_rate=0.05, seed=1)
+    panel = write(str(tmp_path / "panel"), frame)
+    assert list(panel.tickers) == list(frame.columns)
+    np.testing.assert_array_equal(panel.values, frame.dropna(how="all").to_numpy())
+
+
+def test_rewrite_commits_through_the_index(tmp_path):
+    path = str(tmp_path / "panel")
+    old = write(path, make_price_frame(3, years=0.5, seed=1))
+    old_data, index_path = panel_paths(path)
+    old_values = np.array(old.values)
+
+    new = write(path, make_price_frame(4, years=0.5, seed=2))
+    new_data, _ = panel_paths(path)
+    assert new_data != old_data and not os.path.exists(old_data)
+    assert os.path.basename(new_data) == json.load(open(index_path))["data"]
+    assert new.key != old.key and len(new.tickers) == 5
+    # A panel opened before the rewrite keeps reading its own data.
+    np.testing.assert_array_equal(old.values, old_values)
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(new_data), "panel.json"])
+
+
+def test_failure_before_the_index_swap_keeps_the_old_panel(tmp_path, monkeypatch):
+    path = str(tmp_path / "panel")
+    old = write(path, make_price_frame(3, years=0.5, seed=1))
+
+    monkeypatch.setattr(panel_file.json, "dump", disk_full)
+    with pytest.raises(OSError):
+        write(path, make_price_frame(4, years=0.5, seed=2))
+    monkeypatch.undo()
+
+    assert open_panel_file(path).key == old.key
+    # Neither the new data file nor the writer's scratch directory is left behind.
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(panel_paths(path)[0]), "panel.json"])
+
+
+def test_failed_rewrite_of_identical_data_keeps_the_data_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "panel")
+    frame = make_price_frame(3, years=0.5, seed=1)
+    old = write(path, frame)
+    monkeypatch.setattr(panel_file.json, "dump", disk_full)
+    with pytest.raises(OSError):
+        write(path, frame)
+    monkeypatch.undo()
+    np.testing.assert_array_equal(open_panel_file(path).values, old.values)
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.finance_crew.market_data import InMemoryDownloader, PriceCache
+
+
+def price_frame(start: str, end: str, tickers=("AAA", "BBB")) -> pd.DataFrame:
+    index = pd.bdate_range(start, end)
+    data = {t: 100.0 + i + np.arange(len(index), dtype=np.float64) for i, t in enumerate(tickers)}
+    return pd.DataFrame(data, index=index)
+
+
+class Clock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class FailingDownloader(InMemoryDownloader):
+    def download(self, tickers, interval="1d", period=None, start=None, end=None):
+        self.calls.append({"tickers": list(tickers), "start": start, "end": end, "period": period})
+        raise ConnectionError("offline")
+
+
+@pytest.fixture
+def clock():
+    return Clock(datetime(2025, 1, 1, 9, 0))
+
+
+@pytest.fixture
+def downloader():
+    return InMemoryDownloader(price_frame("2024-01-01", "2024-12-31"))
+
+
+def make_cache(tmp_path, downloader, clock, **kwargs) -> PriceCache:
+    return PriceCache(str(tmp_path / "prices.sqlite"), downloader=downloader, clock=clock,
+                      ttl=timedelta(hours=12), **kwargs)
+
+
+def test_first_fetch_then_hit_within_ttl(tmp_path, downloader, clock):
+    cache = make_cache(tmp_path, downloader, clock)
+    first = cache.get_prices(["AAA", "BBB"], period="1y")
+    assert first.status == {"AAA": "fetched", "BBB": "fetched"}
+    assert len(downloader.calls) == 1
+    expected = downloader.frame.loc["2024-01-01":]
+    np.testing.assert_array_equal(first.prices.to_numpy(), expected.to_numpy())
+
+    clock.now += timedelta(hours=1)
+    second = cache.get_prices(["AAA", "BBB"], period="1y")
+    assert second.status == {"AAA": "hit", "BBB": "hit"}
+    assert len(downloader.calls) == 1
+    pd.testing.assert_frame_equal(second.prices, first.prices, check_freq=False)
+
+
+def test_tail_refresh_after_ttl_expiry(tmp_path, downloader, clock):
+    cache = make_cache(tmp_path, downloader, clock)
+    cache.get_prices(["AAA"], period="1y")
+    downloader.frame = price_frame("2024-01-01", "2025-01-14")
+
+    clock.now += timedelta(hours=13)
+    result = cache.get_prices(["AAA"], period="1y")
+    assert result.status == {"AAA": "refreshed"}
+    tail = downloader.calls[-1]
+    # From the bar before the last cached one (2024-12-31), which anchors the adjustment basis.
+    assert tail["start"] == "2024-12-30" and tail["end"] is None
+    assert result.prices.index[-1] == pd.Timestamp("2025-01-14")
+    assert result.prices["AAA"].iloc[-1] == downloader.frame["AAA"].iloc[-1]
+
+
+def test_changed_last_bar_is_overwritten_without_a_full_refetch(tmp_path, downloader, clock):
+    cache = make_cache(tmp_path, downloader, clock)
+    cache.get_prices(["AAA"], period="1y")
+    downloader.frame = downloader.frame.copy()
+    downloader.frame.loc["2024-12-31", "AAA"] += 0.5  # the cached last bar was partial
+
+    clock.now += timedelta(hours=13)
+    result = cache.get_prices(["AAA"], period="1y")
+    assert len(downloader.calls) == 2
+    assert result.prices.loc["2024-12-31", "AAA"] == downloader.frame.loc["2024-12-31", "AAA"]
+
+
+def test_readjusted_history_is_refetched_in_full(tmp_path, downloader, clock):
+    cache = make_cache(tmp_path, downloader, clock)
+    cache.get_prices(["AAA", "BBB"], period="1y")
+    # A 2:1 split of AAA in January: it now trades at half its old price and the
+    # provider serves its whole adjusted history halved to match.
+    split = price_frame("2024-01-01", "2025-01-14")
+    split["AAA"] /= 2.0
+    downloader.frame = split
+
+    clock.now += timedelta(days=14)
+    result = cache.get_prices(["AAA", "BBB"], period="1y")
+    assert result.status == {"AAA": "refreshed", "BBB": "refreshed"}
+    refetch = downloader.calls[-1]
+    assert refetch["tickers"] == ["AAA"] and refetch["start"] == "2024-01-01"
+    expected = split.loc["2024-01-15":]  # one year back from the clock
+    np.testing.assert_array_equal(result.prices.to_numpy(), expected.to_numpy())
+    returns = result.prices["AAA"].pct_change().dropna()
+    assert returns.abs().max() < 0.05  # no fake jump where the bases would have met
+
+
+def test_head_refresh_for_longer_period(tmp_path, downloader, clock):
+    cache = make_cache(tmp_path, downloader, clock)
+    cache.get_prices(["AAA"], period="6mo")
+    result = cache.get_prices(["AAA"], period="1y")
+    assert result.status == {"AAA": "refreshed"}
+    head = downloader.calls[-1]
+    assert (head["start"], head["end"]) == ("2024-01-01", "2024-07-01")
+    assert result.prices.index[0] == pd.Timestamp("2024-01-01")
+    assert len(result.prices) == len(downloader.frame)
+
+
+def test_offline_serves_disk_and_never_downloads(tmp_path, downloader, clock):
+    make_cache(tmp_path, downloader, clock).get_prices(["AAA"], period="1y")
+    offline_downloader = FailingDownloader(downloader.frame)
+    offline = make_cache(tmp_path, offline_downloader, clock, offline=True)
+
+    result = offline.get_prices(["AAA", "BBB"], period="1y")
+    assert result.status == {"AAA": "hit", "BBB": "missing"}
+    assert offline_downloader.calls == []
+    assert result.prices["AAA"].notna().all() and result.prices["BBB"].isna().all()
+
+    clock.now += timedelta(days=2)
+    assert offline.get_prices(["AAA"], period="1y").status == {"AAA": "stale"}
+    assert offline_downloader.calls == []
+
+
+def test_failed_downloads_are_reported(tmp_path, downloader, clock):
+    make_cache(tmp_path, downloader, clock).get_prices(["AAA"], period="1y")
+    failing = make_cache(tmp_path, FailingDownloader(downloader.frame), clock)
+
+    clock.now += timedelta(hours=13)
+    result = failing.get_prices(["AAA", "BBB"], period="1y")
+    assert result.status == {"AAA": "stale", "BBB": "missing"}
+    assert set(result.failed) == {"AAA", "BBB"}
+    assert result.failed["BBB"].startswith("ConnectionError")
+    assert result.prices["AAA"].notna().all()
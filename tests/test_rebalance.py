@@ -0,0 +1,130 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+
+from app.finance_crew.market_data import PricePanel
+from app.finance_crew.portfolio import (
+    RebalanceConstraints,
+    project_weights,
+    rebalance_accounts,
+    rebalance_holdings,
+    round_shares,
+)
+from app.finance_crew.tools.rebalancer import RebalancePortfolioTool
+from benchmarks.synthetic import make_holdings, make_price_frame, make_tickers
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return make_price_frame(8, years=0.5, seed=5)
+
+
+def slsqp(target, lower, upper):
+    res = minimize(lambda w: ((w - target) ** 2).sum(), np.clip(target, lower, upper),
+                   jac=lambda w: 2.0 * (w - target), bounds=list(zip(lower, upper)), method="SLSQP",
+                   constraints=[{"type": "eq", "fun": lambda w: w.sum() - 1.0}],
+                   options={"ftol": 1e-14, "maxiter": 500})
+    assert res.success
+    return res.x
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_projection_matches_slsqp(seed):
+    rng = np.random.default_rng(seed)
+    n = 9
+    target = rng.dirichlet(np.full(n, 0.4)) * rng.uniform(0.7, 1.3)
+    is_cash = np.arange(n) == 0
+    lower, upper = RebalanceConstraints().bounds(is_cash)
+    w = project_weights(target, lower, upper)
+    assert w.sum() == pytest.approx(1.0, abs=1e-12)
+    np.testing.assert_allclose(w, slsqp(target, lower, upper), atol=1e-6)
+
+
+def test_projection_rows_are_independent():
+    rng = np.random.default_rng(9)
+    targets = rng.dirichlet(np.full(6, 0.5), size=4)
+    lower, upper = np.zeros(6), np.full(6, 0.35)
+    batch = project_weights(targets, lower, upper)
+    for row, t in zip(batch, targets):
+        np.testing.assert_allclose(row, project_weights(t, lower, upper), atol=1e-15)
+
+
+def test_infeasible_bounds_raise():
+    with pytest.raises(ValueError, match="infeasible"):
+        project_weights(np.full(2, 0.5), np.zeros(2), np.full(2, 0.35))
+
+
+def test_round_shares_respects_bounds():
+    rng = np.random.default_rng(3)
+    n = 7
+    is_cash = np.arange(n) == n - 1
+    constraints = RebalanceConstraints()
+    lower, upper = constraints.bounds(is_cash)
+    prices = np.where(is_cash, 1.0, rng.uniform(5.0, 400.0, size=n))
+    values = np.array([2_000.0, 25_000.0, 1e6])
+    weights = project_weights(rng.dirichlet(np.ones(n), size=len(values)), lower, upper)
+    shares = round_shares(weights, prices, values, is_cash, upper)
+    proposed = shares * prices / values[:, None]
+    assert (shares[:, ~is_cash] == np.floor(shares[:, ~is_cash])).all()
+    assert (shares >= 0).all()
+    np.testing.assert_allclose(proposed.sum(axis=1), 1.0)
+    assert (proposed <= upper + 1e-9).all()
+    assert (proposed[:, is_cash] >= constraints.min_cash - 1e-9).all()
+
+
+def test_small_account_skips_shares_above_the_cap():
+    # One share of BIG is worth 60% of the account: never buy it, whatever its target.
+    is_cash = np.array([False, False, True])
+    prices = np.array([600.0, 10.0, 1.0])
+    upper = RebalanceConstraints().bounds(is_cash)[1]
+    weights = np.array([0.35, 0.35, 0.30])
+    shares = round_shares(weights, prices, np.array([1_000.0]), is_cash, upper)[0]
+    assert shares[0] == 0
+    assert shares[1] * prices[1] <= 0.35 * 1_000.0
+    assert shares[2] == pytest.approx(1_000.0 - shares[1] * prices[1])
+
+
+def test_accounts_match_single_portfolio(frame):
+    tickers = make_tickers(8)
+    panel = PricePanel.from_frame(frame)
+    books = {f"A{i}": make_holdings(tickers, frame, seed=20 + i) for i in range(3)}
+    book = pd.concat([h.assign(account=a) for a, h in books.items()], ignore_index=True)
+    result = rebalance_accounts(book, panel)
+    for account, holdings in books.items():
+        plan = rebalance_holdings(holdings, panel)
+        rows = result[result["account"] == account].set_index("ticker")
+        expected = pd.Series(plan.proposed_shares, index=plan.tickers)
+        np.testing.assert_allclose(rows["proposed_shares"].to_numpy(), expected[rows.index].to_numpy())
+        np.testing.assert_allclose(rows["proposed_weight"].to_numpy(),
+                                   pd.Series(plan.proposed_weights, index=plan.tickers)[rows.index].to_numpy())
+
+
+def run_tool(tmp_path, holdings, frame, **kwargs) -> dict:
+    path = tmp_path / "holdings.csv"
+    holdings.to_csv(path, index=False)
+    prices_json = json.dumps(PricePanel.from_frame(frame).to_payload())
+    return json.loads(RebalancePortfolioTool()._run(dataset_path=str(path), prices_json=prices_json, **kwargs))
+
+
+def test_tool_proposes_weights_within_bounds(tmp_path, frame):
+    holdings = make_holdings(make_tickers(8), frame, seed=4)
+    result = run_tool(tmp_path, holdings, frame, max_weight=0.2)
+    assert result["ok"], result
+    cash = holdings.loc[holdings["asset_class"] == "cash", "ticker"].item()
+    proposed = result["proposed_weights"]
+    assert sum(proposed.values()) == pytest.approx(1.0, abs=1e-5)
+    assert all(w <= 0.2 + 1e-6 for t, w in proposed.items() if t != cash)
+    assert proposed[cash] >= 0.02 - 1e-6
+    assert result["tracking_error_after"] <= result["tracking_error_before"]
+
+
+def test_tool_reports_infeasible_constraints(tmp_path, frame):
+    # Two tickers and no cash cannot reach 100% under a 35% cap.
+    holdings = pd.DataFrame({"ticker": make_tickers(2), "quantity": [10.0, 10.0],
+                             "asset_class": ["equity", "equity"], "target_weight": [0.5, 0.5]})
+    result = run_tool(tmp_path, holdings, frame)
+    assert not result["ok"]
+    assert result["error"].startswith("ValueError: Constraints are infeasible")
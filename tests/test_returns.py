@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.finance_crew.market_data import PricePanel, load_returns
+from app.finance_crew.tools.risk_analyst import BuildPortfolioReturnsTool
+from benchmarks.synthetic import make_price_frame
+
+
+@pytest.fixture(scope="module")
+def prices_json():
+    frame = make_price_frame(8, years=1.0, gap_rate=0.05, late_rate=0.3, seed=21)
+    frame.iloc[40, 2] = 0.0  # a zero price: no return into or out of it
+    return json.dumps(PricePanel.from_frame(frame).to_payload())
+
+
+def baseline(prices_json: str, weights_json: str) -> dict:
+    """The nested-loop algorithm build_portfolio_returns used before vectorization."""
+    obj = json.loads(prices_json)
+    dates, data = obj["index"], obj["data"]
+    weights = json.loads(weights_json)
+    tickers = [t for t in data if t in weights and weights[t] is not None]
+    per_ticker_returns = {}
+    for t in tickers:
+        series = data[t]
+        per_ticker_returns[t] = [None if p0 is None or p1 is None or p0 == 0 else (p1 - p0) / p0
+                                 for p0, p1 in zip(series[:-1], series[1:])]
+    wsum = sum(float(weights[t]) for t in tickers)
+    scale = 1.0 if 0.98 <= wsum <= 1.02 else wsum
+    weights = {t: float(weights[t]) / scale for t in tickers}
+
+    port_rets, curve, level = [], [], 1.0
+    for i in range(len(dates) - 1):
+        legs = [per_ticker_returns[t][i] for t in tickers]
+        r = 0.0 if any(x is None for x in legs) else sum(weights[t] * x for t, x in zip(tickers, legs))
+        level *= 1.0 + r
+        port_rets.append(r)
+        curve.append(level)
+    return {"ok": True, "index": dates[1:], "portfolio_returns": port_rets, "portfolio_curve": curve}
+
+
+WEIGHTS = {
+    "all_tickers": {f"T{i:04d}": 1.0 / 7 for i in range(7)},
+    "partial_with_unknown": {"T0001": 0.3, "T0002": 0.3, "T0005": 0.39, "NOPE": 0.5, "T0006": None},
+    "rescaled": {"T0000": 0.2, "T0003": 0.2, "SPY": 0.1},
+}
+
+
+@pytest.mark.parametrize("case", list(WEIGHTS))
+def test_matches_the_baseline_loop_on_a_gappy_panel(prices_json, case):
+    weights_json = json.dumps(WEIGHTS[case])
+    expected = baseline(prices_json, weights_json)
+    got = json.loads(BuildPortfolioReturnsTool()._run(prices_json=prices_json, weights_json=weights_json))
+    assert got["ok"] and got["index"] == expected["index"]
+    np.testing.assert_allclose(got["portfolio_returns"], expected["portfolio_returns"], rtol=0, atol=1e-10)
+    np.testing.assert_allclose(got["portfolio_curve"], expected["portfolio_curve"], rtol=1e-9, atol=1e-10)
+    # Gaps leave days at a flat 0.0 return rather than dropping them.
+    assert 0.0 in got["portfolio_returns"]
+
+
+def test_binary_output_carries_the_same_returns(prices_json):
+    weights_json = json.dumps(WEIGHTS["partial_with_unknown"])
+    expected = baseline(prices_json, weights_json)
+    out = json.loads(BuildPortfolioReturnsTool()._run(prices_json=prices_json, weights_json=weights_json,
+                                                      output_format="binary"))
+    dates, rets, curve = load_returns(out)
+    assert dates == expected["index"]
+    np.testing.assert_allclose(rets, expected["portfolio_returns"], rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(curve, expected["portfolio_curve"], rtol=1e-12)
+
+
+@pytest.mark.parametrize("weights, error", [
+    ({"NOPE": 1.0}, "No overlapping tickers between prices and weights."),
+    ({"T0000": 0.5, "T0001": -0.5}, "Weights sum to zero."),
+])
+def test_errors(prices_json, weights, error):
+    out = json.loads(BuildPortfolioReturnsTool()._run(prices_json=prices_json, weights_json=json.dumps(weights)))
+    assert out == {"ok": False, "error": error}
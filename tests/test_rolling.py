@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.finance_crew.analytics import (
+    rolling_beta,
+    rolling_drawdown,
+    rolling_max,
+    rolling_metrics,
+    rolling_volatility,
+    simple_returns,
+)
+from benchmarks.synthetic import make_price_frame
+
+
+@pytest.fixture(scope="module")
+def prices():
+    return make_price_frame(6, years=1.5, gap_rate=0.05, late_rate=0.3, seed=13)
+
+
+@pytest.fixture(scope="module")
+def rets(prices):
+    return pd.DataFrame(simple_returns(prices.to_numpy()), columns=prices.columns)
+
+
+def full_windows(expected: pd.DataFrame, window: int) -> np.ndarray:
+    """pandas reports partial windows once min_periods is met; rolling.py starts at the first full one."""
+    out = expected.to_numpy().copy()
+    out[:window - 1] = np.nan
+    return out
+
+
+@pytest.mark.parametrize("window", [2, 5, 21, 63, 1_000])
+def test_rolling_volatility_matches_pandas(rets, window):
+    expected = rets.rolling(window, min_periods=max(2, window // 2)).std() * np.sqrt(252.0)
+    np.testing.assert_allclose(rolling_volatility(rets.to_numpy(), window), full_windows(expected, window),
+                               rtol=1e-8, atol=1e-12)
+
+
+@pytest.mark.parametrize("window", [1, 3, 21, 64, 1_000])
+def test_rolling_max_matches_pandas(prices, window):
+    levels = prices.to_numpy()
+    expected = prices.rolling(window, min_periods=1).max().to_numpy()
+    np.testing.assert_array_equal(rolling_max(levels, window), expected)
+
+
+@pytest.mark.parametrize("window", [5, 21, 1_000])
+def test_rolling_drawdown_matches_pandas(prices, window):
+    expected = (prices / prices.rolling(window, min_periods=1).max() - 1.0).clip(upper=0.0).to_numpy()
+    np.testing.assert_allclose(rolling_drawdown(prices.to_numpy(), window), expected, rtol=1e-12, atol=1e-15)
+
+
+@pytest.mark.parametrize("window", [10, 21, 63, 1_000])
+def test_rolling_beta_matches_pandas(rets, window):
+    bench = rets["SPY"].copy()
+    bench.iloc[::17] = np.nan
+    min_obs = max(2, window // 2)
+    for ticker in rets.columns.drop("SPY"):
+        x = rets[ticker].where(bench.notna())
+        y = bench.where(x.notna())
+        expected = x.rolling(window, min_periods=min_obs).cov(y) / y.rolling(window, min_periods=min_obs).var()
+        got = rolling_beta(rets[[ticker]].to_numpy(), bench.to_numpy(), window)[:, 0]
+        np.testing.assert_allclose(got, full_windows(expected.to_frame(), window)[:, 0], rtol=1e-7, atol=1e-10)
+
+
+def test_rolling_metrics_share_one_pass(rets):
+    values = rets.drop(columns="SPY").to_numpy()
+    bench = rets["SPY"].to_numpy()
+    out = rolling_metrics(values, (21, 63), bench)
+    levels = np.cumprod(1.0 + np.nan_to_num(values), axis=0)
+    for w in (21, 63):
+        np.testing.assert_allclose(out[f"vol_{w}"], rolling_volatility(values, w))
+        np.testing.assert_allclose(out[f"drawdown_{w}"], rolling_drawdown(levels, w))
+        np.testing.assert_allclose(out[f"beta_{w}"], rolling_beta(values, bench, w))
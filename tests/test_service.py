@@ -0,0 +1,149 @@
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from app.finance_crew.market_data import InMemoryDownloader
+from app.finance_crew.service import (
+    RemoteTool,
+    ToolWorker,
+    WorkerClient,
+    WorkerServer,
+    default_tools,
+    schema_model,
+)
+from app.finance_crew.tools.researcher_agent import ComputeMarketMetricsTool
+from app.finance_crew.tools.risk_analyst import BetaCorrelationTool
+from benchmarks.synthetic import make_price_frame, make_tickers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return make_price_frame(5, years=1.0, seed=21)
+
+
+@pytest.fixture(scope="module")
+def server(frame):
+    worker = ToolWorker(downloader=InMemoryDownloader(frame), price_cache=None)
+    with WorkerServer("127.0.0.1", 0, worker=worker) as server:
+        server.start_background()
+        yield server
+        server.shutdown()
+
+
+@pytest.fixture
+def client(server):
+    client = WorkerClient(server.url)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="module")
+def handle(server, frame):
+    client = WorkerClient(server.url)
+    result = json.loads(client.call("fetch_yfinance_prices", {"tickers_json": json.dumps(list(frame.columns)),
+                                                               "output_format": "handle"}))
+    client.close()
+    assert result["ok"], result
+    return result["handle"]
+
+
+def status(server, method: str, path: str, body: str = "") -> tuple:
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    conn.request(method, path, body=body.encode("utf-8") or None)
+    response = conn.getresponse()
+    text = response.read().decode("utf-8")
+    conn.close()
+    return response.status, json.loads(text)
+
+
+def test_remote_call_matches_local_tool(client, handle):
+    tool = RemoteTool.from_worker("compute_market_metrics", client)
+    local = ComputeMarketMetricsTool()
+    assert tool.description == local.description
+    assert json.loads(tool._run(prices_json=handle)) == json.loads(local._run(prices_json=handle))
+
+
+def test_handles_are_reused_across_calls(client, server, handle, frame):
+    before = client.health()["price_panels"]
+    weights = json.dumps({t: 0.25 for t in make_tickers(4)})
+    for _ in range(3):
+        result = json.loads(client.call("compute_beta_and_correlations",
+                                        {"prices_json": handle, "weights_json": weights, "benchmark": "SPY"}))
+        assert result["ok"], result
+    assert result == json.loads(BetaCorrelationTool()._run(prices_json=handle, weights_json=weights,
+                                                           benchmark="SPY"))
+    assert client.health()["price_panels"] == before
+
+
+def test_published_schemas_rebuild_every_tool_schema(client):
+    specs = client.tools()
+    local = default_tools()
+    assert sorted(specs) == sorted(local)
+    for name, tool in local.items():
+        assert specs[name]["description"] == tool.description
+        assert schema_model(specs[name]["schema"]).model_json_schema() == tool.args_schema.model_json_schema(), name
+
+
+def test_arguments_are_validated(client):
+    result = json.loads(client.call("compute_portfolio_risk_metrics", {"annualize_var": "not a bool"}))
+    assert not result["ok"]
+    assert result["error"].startswith("Invalid arguments for compute_portfolio_risk_metrics")
+
+    tool = RemoteTool.from_worker("compute_portfolio_risk_metrics", client)
+    with pytest.raises(Exception):
+        tool.args_schema(annualize_var=True)
+
+
+def test_unknown_paths_and_tools_are_404(server, client):
+    assert status(server, "POST", "/tools/no_such_tool", "{}") == \
+        (404, {"ok": False, "error": "Unknown tool: no_such_tool"})
+    assert status(server, "GET", "/nowhere")[0] == 404
+    assert status(server, "POST", "/nowhere", "{}")[0] == 404
+    assert status(server, "POST", "/tools/compute_market_metrics", "[1, 2]")[0] == 400
+    with pytest.raises(KeyError):
+        RemoteTool.from_worker("no_such_tool", client)
+
+
+def test_concurrent_calls_share_one_worker(server, handle):
+    client = WorkerClient(server.url)
+    calls = client.health()["calls"].get("compute_market_metrics", {}).get("calls", 0)
+    results, connections = [None] * 8, [None] * 8
+
+    def run(i):
+        for _ in range(3):
+            results[i] = client.call("compute_market_metrics", {"prices_json": handle})
+        connections[i] = client._connection()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(results)) == 1 and json.loads(results[0])["ok"]
+    # One persistent connection per thread, kept across that thread's calls.
+    assert len({id(c) for c in connections}) == 8
+    assert client.health()["calls"]["compute_market_metrics"]["calls"] == calls + 24
+
+
+def test_crew_on_a_worker_builds_remote_tools_without_pandas(server):
+    script = (
+        "import sys\n"
+        "from app.finance_crew.crew import FinAssistCrew\n"
+        "from app.finance_crew.service import RemoteTool\n"
+        "crew = FinAssistCrew()\n"
+        "tools = [crew.fetch_yfinance_prices_tool(), crew.rebalance_portfolio_tool(), crew.risk_suite_tool()]\n"
+        "assert all(isinstance(t, RemoteTool) for t in tools), tools\n"
+        "print('pandas' in sys.modules)\n"
+    )
+    env = dict(os.environ, FINANCE_CREW_WORKER_URL=server.url, OPENROUTER_API_KEY="x")
+    out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True,
+                         timeout=120)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,56 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.finance_crew.analytics import ShardPool, file_source
+from app.finance_crew.market_data import PricePanel, load_price_panel
+from app.finance_crew.tools.researcher_agent import ComputeMarketMetricsTool
+from app.finance_crew.tools.risk_analyst import BetaCorrelationTool
+from benchmarks.synthetic import make_price_frame
+
+
+def big_or_fail(block: np.ndarray) -> np.ndarray:
+    # The first shard returns a shared memory result; the last one fails.
+    if np.isnan(block).any():
+        raise ValueError("bad shard")
+    return np.repeat(block, 4, axis=0)
+
+
+def shm_segments() -> set:
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def test_sharding_is_opt_in(monkeypatch):
+    monkeypatch.delenv("FINANCE_CREW_SHARD_WORKERS", raising=False)
+    assert ShardPool().workers == 1 and ShardPool.from_env().workers == 1
+    monkeypatch.setenv("FINANCE_CREW_SHARD_WORKERS", "3")
+    assert ShardPool.from_env().workers == 3
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm to list shared memory blocks")
+def test_failed_shard_leaves_no_shared_memory():
+    values = np.ones((2_000, 200))
+    values[0, -1] = np.nan
+    pool = ShardPool(workers=2, min_cells=0)
+    try:
+        np.testing.assert_array_equal(pool.map(big_or_fail, values[:, :100]), np.ones((8_000, 100)))
+        before = shm_segments()
+        with pytest.raises(ValueError, match="bad shard"):
+            pool.map(big_or_fail, values)
+        assert shm_segments() == before
+    finally:
+        pool.shutdown()
+
+
+def test_binary_payload_prices_run_through_the_sharded_tools():
+    panel = PricePanel.from_frame(make_price_frame(4, years=0.5, seed=6))
+    binary, inline = json.dumps(panel.to_binary_payload()), json.dumps(panel.to_payload())
+    assert file_source(load_price_panel(binary).values) is None
+
+    for run in (lambda p: ComputeMarketMetricsTool()._run(prices_json=p),
+                lambda p: BetaCorrelationTool()._run(prices_json=p, weights_json='{"T0000": 1.0}', benchmark="SPY")):
+        from_binary, from_json = json.loads(run(binary)), json.loads(run(inline))
+        assert from_binary["ok"], from_binary
+        assert from_binary == from_json
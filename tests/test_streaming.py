@@ -0,0 +1,166 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.finance_crew.analytics import (
+    MarketMetricsState,
+    PortfolioRiskState,
+    RollingDrawdown,
+    RollingMoments,
+    RunningDrawdown,
+    RunningMoments,
+    rolling_drawdown,
+    rolling_volatility,
+)
+from app.finance_crew.market_data import PricePanel, load_returns
+from app.finance_crew.tools.researcher_agent import ComputeMarketMetricsTool
+from app.finance_crew.tools.risk_analyst import BuildPortfolioReturnsTool, PortfolioRiskMetricsTool
+from benchmarks.synthetic import make_price_frame
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return make_price_frame(6, years=1.0, gap_rate=0.03, late_rate=0.3, seed=11)
+
+
+def payload(frame) -> str:
+    return json.dumps(PricePanel.from_frame(frame).to_payload())
+
+
+def assert_metrics_close(a: dict, b: dict) -> None:
+    assert a.keys() == b.keys()
+    for key in a:
+        assert a[key] == pytest.approx(b[key], abs=1e-6), key
+
+
+def test_running_moments_blocks_match_batch():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(200, 4))
+    x[rng.random(x.shape) < 0.1] = np.nan
+    state = RunningMoments(4)
+    for block in np.array_split(x, 7):
+        state = RunningMoments.from_dict(state.to_dict())
+        state.update_block(block)
+    np.testing.assert_allclose(state.mean, np.nanmean(x, axis=0), rtol=1e-12)
+    np.testing.assert_allclose(state.variance(), np.nanvar(x, axis=0, ddof=1), rtol=1e-10)
+
+
+def test_running_drawdown_matches_batch():
+    levels = np.cumprod(1.0 + np.random.default_rng(1).normal(0, 0.02, size=(300, 2)), axis=0)
+    state = RunningDrawdown(2)
+    for block in np.array_split(levels, 5):
+        state.update_levels(block)
+    expected = (levels / np.maximum.accumulate(levels, axis=0) - 1.0).min(axis=0)
+    np.testing.assert_allclose(state.max_drawdown, expected)
+
+
+def test_market_metrics_checkpoint_resume_equals_batch(frame):
+    tool = ComputeMarketMetricsTool()
+    batch = json.loads(tool._run(prices_json=payload(frame)))["metrics"]
+
+    first = json.loads(tool._run(prices_json=payload(frame.iloc[:120]), checkpoint_json="{}"))
+    checkpoint = json.dumps(first["checkpoint"])
+    resumed = json.loads(tool._run(prices_json=payload(frame), checkpoint_json=checkpoint))
+
+    assert resumed["ok"] and resumed["checkpoint"]["last_date"] == frame.index[-1].strftime("%Y-%m-%d")
+    assert_metrics_close(resumed["metrics"], batch)
+
+
+def test_market_metrics_state_handles_new_tickers(frame):
+    state = MarketMetricsState(list(frame.columns[:3]))
+    panel = PricePanel.from_frame(frame)
+    state.update(panel.select(list(frame.columns[:3])).values[:100], panel.dates[:100])
+    state = state.align(panel.tickers)
+    state.update(panel.values[100:], panel.dates[100:])
+    late = json.loads(ComputeMarketMetricsTool()._run(prices_json=payload(frame.iloc[100:])))["metrics"]
+    assert_metrics_close(state.metrics()[frame.columns[-1]], late[frame.columns[-1]])
+
+
+def returns_payload(frame, weights) -> str:
+    return BuildPortfolioReturnsTool()._run(prices_json=payload(frame), weights_json=json.dumps(weights))
+
+
+def risk(returns_json: str, checkpoint_json=None) -> dict:
+    return json.loads(PortfolioRiskMetricsTool()._run(portfolio_returns_json=returns_json,
+                                                      checkpoint_json=checkpoint_json))
+
+
+def test_portfolio_risk_checkpoint_resume_equals_batch(frame):
+    weights = {t: 1.0 / 4 for t in frame.columns[:4]}
+    batch = risk(returns_payload(frame, weights))
+
+    first = risk(returns_payload(frame.iloc[:150], weights), "{}")
+    resumed = risk(returns_payload(frame, weights), json.dumps(first["checkpoint"]))
+    assert resumed["ok"]
+    assert_metrics_close(resumed["metrics"], batch["metrics"])
+
+
+def test_portfolio_risk_resume_rebases_a_moved_window():
+    # Doubles over 150 days, then falls 10%: the drawdown is measured from the peak of the first payload.
+    index = pd.bdate_range("2024-01-01", periods=200)
+    prices = np.concatenate([np.linspace(100.0, 200.0, 150), np.linspace(199.0, 180.0, 50)])
+    frame = pd.DataFrame({"AAA": prices}, index=index)
+    weights = {"AAA": 1.0}
+    batch = risk(returns_payload(frame, weights))
+
+    first = risk(returns_payload(frame.iloc[:150], weights), "{}")
+    # A refetched rolling window: starts later, so its curve is 1.0 at a different date.
+    moved = risk(returns_payload(frame.iloc[100:], weights), json.dumps(first["checkpoint"]))
+    assert batch["metrics"]["max_drawdown"] == pytest.approx(-0.1, abs=1e-6)
+    assert moved["metrics"]["max_drawdown"] == pytest.approx(batch["metrics"]["max_drawdown"], abs=1e-6)
+
+
+def test_portfolio_risk_state_round_trip():
+    rets = np.random.default_rng(2).normal(0, 0.01, size=50)
+    state = PortfolioRiskState()
+    state.update(rets[:20], dates=[f"d{i:02d}" for i in range(20)])
+    state = PortfolioRiskState.from_dict(json.loads(json.dumps(state.to_dict())))
+    state.update(rets[20:], dates=[f"d{i:02d}" for i in range(20, 50)])
+    curve = np.cumprod(1.0 + rets)
+    assert state.mean() == pytest.approx(rets.mean())
+    assert state.std() == pytest.approx(rets.std(ddof=1))
+    assert state.max_drawdown() == pytest.approx((curve / np.maximum.accumulate(curve) - 1.0).min())
+
+
+def test_rolling_moments_resume_matches_rolling_volatility():
+    rng = np.random.default_rng(3)
+    x = rng.normal(0, 0.01, size=(120, 3))
+    x[rng.random(x.shape) < 0.1] = np.nan
+    state = RollingMoments(3, 21)
+    for i, row in enumerate(x):
+        if i % 25 == 0:
+            state = RollingMoments.from_dict(json.loads(json.dumps(state.to_dict())))
+        state.update(row)
+        if i >= 20:
+            expected = rolling_volatility(x[:i + 1], 21, min_obs=2, annualize=False)[-1]
+            np.testing.assert_allclose(state.std(), expected, rtol=1e-8)
+
+
+def test_rolling_drawdown_resume_matches_batch():
+    levels = np.cumprod(1.0 + np.random.default_rng(4).normal(0, 0.02, size=(150, 2)), axis=0)
+    levels[40, 1] = np.nan
+    expected = rolling_drawdown(levels, 10)
+    state = RollingDrawdown(2, 10)
+    for i, level in enumerate(levels):
+        if i % 30 == 0:
+            state = RollingDrawdown.from_dict(json.loads(json.dumps(state.to_dict())))
+        state.update_level(level)
+        np.testing.assert_allclose(state.drawdown, expected[i], atol=1e-12)
+
+
+def test_portfolio_risk_checkpoint_rolling_matches_rolling_analytics(frame):
+    weights = {t: 1.0 / 4 for t in frame.columns[:4]}
+    full = json.loads(BuildPortfolioReturnsTool()._run(prices_json=payload(frame), weights_json=json.dumps(weights),
+                                                       output_format="binary"))
+    _, rets, curve = load_returns(full)
+
+    first = risk(returns_payload(frame.iloc[:150], weights), "{}")
+    assert first["checkpoint"]["rolling_moments"][0]["window"] == 21
+    resumed = risk(json.dumps(full), json.dumps(first["checkpoint"]))
+    for w in (21, 63, 252):
+        vol = rolling_volatility(rets[:, None], w)[-1, 0]
+        dd = rolling_drawdown(curve[:, None], w)[-1, 0]
+        assert resumed["rolling"][f"vol_{w}"] == (None if np.isnan(vol) else pytest.approx(vol, abs=1e-6))
+        assert resumed["rolling"][f"drawdown_{w}"] == pytest.approx(dd, abs=1e-6)
@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.finance_crew.analytics import EPISODES, date_rows
+from app.finance_crew.market_data import PricePanel
+from app.finance_crew.tools.risk_analyst import StressTestTool
+from benchmarks.synthetic import make_price_frame
+
+
+def run(frame, **kwargs) -> dict:
+    prices_json = json.dumps(PricePanel.from_frame(frame).to_payload())
+    return json.loads(StressTestTool()._run(prices_json=prices_json, weights_json='{"T0000": 1.0}', **kwargs))
+
+
+def test_no_covered_episode_is_an_error():
+    frame = make_price_frame(2, years=1.0, benchmark=None, seed=1)
+    out = run(frame)
+    assert not out["ok"] and "cover none" in out["error"]
+    assert set(out["skipped"]) == set(EPISODES)
+
+
+def test_rolling_windows_run_without_episodes():
+    frame = make_price_frame(2, years=1.0, benchmark=None, seed=1)
+    out = run(frame, window_days=21)
+    assert out["ok"] and out["scenarios"] == [] and "worst_windows" in out
+    assert set(out["skipped"]) == set(EPISODES)
+
+
+def book_frame():
+    index = pd.bdate_range("2020-01-01", "2020-06-30")
+    n = len(index)
+    a = np.linspace(100.0, 50.0, n)
+    b = np.linspace(20.0, 30.0, n)
+    c = np.where(index >= "2020-03-02", 10.0, np.nan)  # lists after the covid window starts
+    frame = pd.DataFrame({"A": a, "B": b, "C": c}, index=index)
+    frame.loc["2020-03-23", "B"] = np.nan  # no quote on the window's last day: the 03-20 price is used
+    return frame
+
+
+def expected_return(frame, ticker, start, end):
+    col = frame[ticker].ffill()
+    return col[col.index >= start].iloc[0], col[col.index <= end].iloc[-1]
+
+
+def test_episode_cut_short_at_the_end_is_skipped():
+    dates = [d.strftime("%Y-%m-%d") for d in pd.bdate_range("2008-08-01", "2008-12-31")]
+    with pytest.raises(ValueError, match="before the window end"):
+        date_rows(dates, *EPISODES["gfc_2008"])
+    frame = pd.DataFrame({"T0000": np.linspace(100, 80, len(dates))}, index=pd.to_datetime(dates))
+    out = run(frame, scenarios_json='[{"name": "gfc_2008"}]')
+    assert not out["ok"] and "before the window end" in out["skipped"]["gfc_2008"]
+
+
+def test_historical_pnl_and_coverage():
+    frame = book_frame()
+    weights = {"A": 0.5, "B": 0.3, "C": 0.2}
+    out = json.loads(StressTestTool()._run(prices_json=json.dumps(PricePanel.from_frame(frame).to_payload()),
+                                           weights_json=json.dumps(weights),
+                                           scenarios_json='[{"name": "covid_2020"}, '
+                                                          '{"name": "march", "start": "2020-03-02", "end": "2020-03-31"}]'))
+    start, end = EPISODES["covid_2020"]
+    a0, a1 = expected_return(frame, "A", start, end)
+    b0, b1 = expected_return(frame, "B", start, end)
+    assert out["pnl"]["covid_2020"] == pytest.approx(0.5 * (a1 / a0 - 1) + 0.3 * (b1 / b0 - 1), abs=1e-6)
+    # C has no price at the covid start: it counts as 0.0 and the scenario covers 80% of the gross weight.
+    assert out["coverage"] == {"covid_2020": pytest.approx(0.8)}
+    m = {t: expected_return(frame, t, "2020-03-02", "2020-03-31") for t in weights}
+    assert out["pnl"]["march"] == pytest.approx(sum(w * (m[t][1] / m[t][0] - 1) for t, w in weights.items()), abs=1e-6)
+
+
+def test_hypothetical_shocks_with_asset_class_override_and_money():
+    frame = book_frame()
+    weights = {"p1": {"A": 0.5, "B": 0.3, "CASH": 0.2}, "p2": {"A": 1.0}}
+    scenarios = [{"name": "equity_crash", "asset_class_shocks": {"equity": -0.2}, "shocks": {"B": -0.5}},
+                 {"name": "single", "shocks": {"A": 0.1}}]
+    out = json.loads(StressTestTool()._run(
+        prices_json=json.dumps(PricePanel.from_frame(frame).to_payload()), weights_json=json.dumps(weights),
+        scenarios_json=json.dumps(scenarios), asset_map_json='{"A": "equity", "B": "equity", "CASH": "cash"}',
+        portfolio_values_json='{"p1": 1000, "p2": 500}'))
+    assert out["scenarios"] == ["equity_crash", "single"]
+    assert out["pnl"]["p1"] == {"equity_crash": pytest.approx(1000 * (0.5 * -0.2 + 0.3 * -0.5)),
+                                "single": pytest.approx(1000 * 0.05)}
+    assert out["pnl"]["p2"] == {"equity_crash": pytest.approx(500 * -0.2), "single": pytest.approx(500 * 0.1)}
+    assert out["coverage"] == {"p1": {}, "p2": {}}
@@ -0,0 +1,126 @@
+import json
+import sqlite3
+from types import SimpleNamespace
+
+from app.finance_crew.tools import tool_cache as tool_cache_module
+from app.finance_crew.tools.tool_cache import ToolCache, code_version, memoized
+
+
+def ok(payload: str) -> str:
+    return json.dumps({"ok": True, "value": payload})
+
+
+class CountingTool:
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    @memoized
+    def _run(self, x: int, scale: float = 1.0) -> str:
+        self.calls += 1
+        return ok(str(x * scale))
+
+
+def test_memory_tier_is_an_lru_capped_in_bytes():
+    values = {k: ok(k * 40) for k in "abc"}
+    size = len(values["a"].encode("utf-8"))
+    cache = ToolCache(max_bytes=2 * size)
+    cache.put("t", "a", values["a"])
+    cache.put("t", "b", values["b"])
+    assert cache.get("t", "a") == values["a"]  # a is now the most recently used
+    cache.put("t", "c", values["c"])
+    assert cache.get("t", "b") is None
+    assert cache.get("t", "a") == values["a"] and cache.get("t", "c") == values["c"]
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 2 * size
+
+
+def test_sizes_count_utf8_bytes_not_characters():
+    value = '{"ok": true, "name": "' + "é" * 100 + '"}'
+    cache = ToolCache(max_bytes=len(value) + 50)
+    cache.put("t", "k", value)
+    assert cache.get("t", "k") is None  # over the cap once encoded
+    cache = ToolCache(max_bytes=10_000)
+    cache.put("t", "k", value)
+    assert cache.stats()["bytes"] == len(value.encode("utf-8"))
+
+
+def test_hit_and_miss_counters():
+    cache = ToolCache()
+    assert cache.get("t", "k") is None
+    cache.put("t", "k", ok("1"))
+    cache.get("t", "k")
+    cache.get("t", "k")
+    assert cache.get("u", "k2") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 2, 0.5)
+    assert stats["tools"] == {"t": {"hits": 2, "disk_hits": 0, "misses": 1},
+                              "u": {"hits": 0, "disk_hits": 0, "misses": 1}}
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ToolCache(path=path).put("t", "k", ok("disk"))
+    cache = ToolCache(path=path)
+    assert cache.get("t", "k") == ok("disk")
+    assert cache.get("t", "k") == ok("disk")
+    assert cache.stats()["tools"]["t"] == {"hits": 1, "disk_hits": 1, "misses": 0}
+
+
+def test_disk_tier_is_an_lru_capped_in_bytes(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    size = len(ok("x" * 100).encode("utf-8"))
+    clock = iter(range(100))
+    monkeypatch.setattr(tool_cache_module, "time", SimpleNamespace(time=lambda: float(next(clock))))
+    cache = ToolCache(max_bytes=0, path=path, disk_max_bytes=2 * size)
+    cache.put("t", "a", ok("a" * 100))
+    cache.put("t", "b", ok("b" * 100))
+    assert cache.get("t", "a") is not None  # refreshes a on disk
+    cache.put("t", "c", ok("c" * 100))
+    assert cache.get("t", "b") is None
+    assert cache.get("t", "a") is not None and cache.get("t", "c") is not None
+    assert cache.stats()["disk_evictions"] == 1
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT SUM(size) FROM tool_results").fetchone()[0] == 2 * size
+
+
+def test_old_disk_layout_is_rebuilt(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE tool_results (key TEXT PRIMARY KEY, tool TEXT, value TEXT, created REAL)")
+        conn.execute("INSERT INTO tool_results VALUES ('k', 't', 'stale', 0)")
+    cache = ToolCache(path=path)
+    assert cache.get("t", "k") is None
+    cache.put("t", "k", ok("fresh"))
+    assert ToolCache(path=path).get("t", "k") == ok("fresh")
+
+
+def test_memoized_keys_bind_defaults_and_include_the_code_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(tool_cache_module, "tool_cache", ToolCache(path=str(tmp_path / "cache.sqlite")))
+    tool = CountingTool()
+    assert tool._run(2) == tool._run(2, 1.0) == tool._run(x=2, scale=1.0)
+    assert tool.calls == 1
+
+    # Same arguments after a code change: recomputed, not served from the disk tier.
+    monkeypatch.setattr(tool_cache_module, "code_version", lambda: "edited")
+    monkeypatch.setattr(tool_cache_module, "tool_cache", ToolCache(path=str(tmp_path / "cache.sqlite")))
+    tool._run(2)
+    assert tool.calls == 2
+
+
+def test_code_version_tracks_the_package_source(tmp_path, monkeypatch):
+    (tmp_path / "tools").mkdir()
+    (tmp_path / "tools" / "tool.py").write_text("x = 1\n")
+    monkeypatch.setattr(tool_cache_module, "_PACKAGE_DIR", str(tmp_path))
+    code_version.cache_clear()
+    try:
+        before = code_version()
+        (tmp_path / "notes.txt").write_text("not source")
+        code_version.cache_clear()
+        assert code_version() == before
+        (tmp_path / "tools" / "tool.py").write_text("x = 2\n")
+        code_version.cache_clear()
+        assert code_version() != before
+    finally:
+        monkeypatch.undo()
+        code_version.cache_clear()
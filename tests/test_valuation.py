@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.finance_crew.market_data import PricePanel
+from app.finance_crew.portfolio import last_prices, value_accounts, value_holdings
+from app.finance_crew.tools.researcher_agent import HoldingsWeightsTool
+from benchmarks.synthetic import make_holdings, make_price_frame, make_tickers
+
+
+@pytest.fixture
+def panel():
+    index = pd.bdate_range("2024-03-01", periods=4)
+    frame = pd.DataFrame({"AAA": [9.0, 9.5, 10.0, np.nan], "BBB": [18.0, 19.0, 19.5, 20.0],
+                          "CCC": [np.nan] * 4}, index=index)
+    return PricePanel.from_frame(frame)
+
+
+@pytest.fixture
+def lots():
+    return pd.DataFrame({
+        "ticker": ["AAA", " AAA", "BBB", "USD", "ZZZ", "CCC"],
+        "quantity": [4.0, 6.0, 5.0, 100.0, 3.0, 1.0],
+        "asset_class": ["equity", "equity", "bond", "cash", "equity", "equity"],
+        "target_weight": [0.2, 0.2, 0.3, 0.1, 0.1, 0.1],
+    })
+
+
+def test_last_prices_skip_missing_bars(panel):
+    prices, dates = last_prices(panel)
+    np.testing.assert_array_equal(prices[:2], [10.0, 20.0])
+    assert np.isnan(prices[2])
+    assert dates == ["2024-03-05", "2024-03-06", None]
+
+
+def test_value_holdings_cash_and_unpriced(panel, lots):
+    valuation = value_holdings(lots, panel)
+    assert valuation.total_value == pytest.approx(300.0)
+    assert valuation.weights.to_dict() == pytest.approx({"AAA": 1 / 3, "BBB": 1 / 3, "USD": 1 / 3})
+    assert valuation.unpriced == ["CCC", "ZZZ"]
+    assert valuation.as_of == "2024-03-06"
+    assert valuation.target_weights.to_dict() == pytest.approx(
+        {"AAA": 0.4, "BBB": 0.3, "CCC": 0.1, "USD": 0.1, "ZZZ": 0.1})
+    assert valuation.asset_map.to_dict() == {"AAA": "equity", "BBB": "bond", "CCC": "equity", "USD": "cash",
+                                             "ZZZ": "equity"}
+
+
+def test_cash_class_and_price_are_configurable(panel, lots):
+    valuation = value_holdings(lots.assign(asset_class=lots["asset_class"].replace("cash", "money")), panel,
+                               cash_class="money", cash_price=2.0)
+    assert valuation.market_values["USD"] == pytest.approx(200.0)
+    assert valuation.total_value == pytest.approx(400.0)
+
+
+def test_nothing_priced_is_an_error(panel):
+    with pytest.raises(ValueError, match="zero"):
+        value_holdings(pd.DataFrame({"ticker": ["ZZZ"], "quantity": [1.0]}), panel)
+
+
+def test_value_accounts_match_single_portfolios():
+    tickers = make_tickers(10)
+    prices = make_price_frame(10, years=0.3, gap_rate=0.05, seed=12)
+    panel = PricePanel.from_frame(prices)
+    books = {f"A{i}": make_holdings(tickers[i:], prices, n_rows=30, seed=40 + i) for i in range(3)}
+    books["A1"] = pd.concat([books["A1"], pd.DataFrame({"ticker": ["NOPE"], "quantity": [7.0],
+                                                        "asset_class": ["equity"], "target_weight": [0.0]})])
+    frame = pd.concat([b.assign(account=a) for a, b in books.items()], ignore_index=True)
+
+    weights, totals = value_accounts(frame, panel)
+    assert list(weights.index) == list(books)
+    assert "NOPE" not in weights.columns
+    for account, book in books.items():
+        valuation = value_holdings(book, panel)
+        assert totals[account] == pytest.approx(valuation.total_value, rel=1e-12)
+        expected = valuation.weights.reindex(weights.columns, fill_value=0.0)
+        np.testing.assert_allclose(weights.loc[account].to_numpy(), expected.to_numpy(), rtol=1e-12, atol=1e-15)
+
+
+def test_tool_emits_the_valuation_maps(tmp_path, panel, lots):
+    path = tmp_path / "holdings.csv"
+    lots.to_csv(path, index=False)
+    out = json.loads(HoldingsWeightsTool()._run(dataset_path=str(path),
+                                                prices_json=json.dumps(panel.to_payload())))
+    assert out == {"ok": True, **value_holdings(lots, panel).to_dict()}
+    assert out["market_values"] == {"AAA": 100.0, "BBB": 100.0, "USD": 100.0}
+    assert set(out["weights"]) == {"AAA", "BBB", "USD"}
@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.finance_crew.analytics import portfolio_returns, scenario_var, simple_returns, var_cvar
+from app.finance_crew.market_data import PricePanel
+from app.finance_crew.tools.risk_analyst import ScenarioVarTool
+from app.finance_crew.tools.tool_cache import tool_cache
+from benchmarks.synthetic import make_price_frame, make_weights
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return make_price_frame(12, years=2.0, gap_rate=0.02, seed=17)
+
+
+@pytest.fixture(scope="module")
+def rets(frame):
+    return simple_returns(frame.drop(columns="SPY").to_numpy())
+
+
+@pytest.fixture(scope="module")
+def weights(frame):
+    return make_weights(list(frame.columns[:-1]), n_portfolios=4, seed=3).to_numpy()
+
+
+@pytest.mark.parametrize("conf", [0.9, 0.95, 0.99])
+def test_var_cvar_match_quantile_and_tail_mean(conf):
+    pnl = np.random.default_rng(5).standard_t(4, size=(1_001, 3)) * 0.01
+    var, cvar = var_cvar(pnl, conf)
+    for j in range(pnl.shape[1]):
+        col = np.sort(pnl[:, j])
+        assert var[j] == np.quantile(col, 1.0 - conf, method="inverted_cdf")
+        assert cvar[j] == pytest.approx(col[col <= var[j]].mean(), rel=1e-12)
+
+
+def test_historical_var_uses_portfolio_returns(rets, weights):
+    var, cvar, n = scenario_var(rets, weights, conf=0.95)
+    hist, _ = portfolio_returns(rets, weights, weights != 0)
+    assert n == len(hist)
+    np.testing.assert_array_equal(var, np.quantile(hist, 0.05, axis=0, method="inverted_cdf"))
+    k = int(np.ceil(0.05 * n))
+    np.testing.assert_allclose(cvar, np.sort(hist, axis=0)[:k].mean(axis=0), rtol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["normal", "bootstrap"])
+def test_monte_carlo_is_seeded(rets, weights, method):
+    a = scenario_var(rets, weights, method=method, n_scenarios=5_000, seed=1)
+    b = scenario_var(rets, weights, method=method, n_scenarios=5_000, seed=1)
+    c = scenario_var(rets, weights, method=method, n_scenarios=5_000, seed=2)
+    np.testing.assert_array_equal(a[0], b[0])
+    np.testing.assert_array_equal(a[1], b[1])
+    assert not np.array_equal(a[0], c[0])
+
+
+@pytest.mark.parametrize("method", ["normal", "bootstrap"])
+@pytest.mark.parametrize("chunk_size", [1, 37, 1_000, 20_000])
+def test_monte_carlo_does_not_depend_on_chunk_size(rets, weights, method, chunk_size):
+    var, cvar, _ = scenario_var(rets, weights, method=method, n_scenarios=3_000, seed=9, chunk_size=3_000)
+    v, c, _ = scenario_var(rets, weights, method=method, n_scenarios=3_000, seed=9, chunk_size=chunk_size)
+    np.testing.assert_allclose(v, var, rtol=1e-12)
+    np.testing.assert_allclose(c, cvar, rtol=1e-12)
+
+
+def test_normal_var_converges_to_the_parametric_value(rets, weights):
+    var, _, _ = scenario_var(rets, weights[0], method="normal", n_scenarios=200_000, seed=4)
+    port, _ = portfolio_returns(np.nan_to_num(rets), weights[:1])
+    assert var == pytest.approx(port.mean() - 1.6448536 * port.std(ddof=1), rel=0.03)
+
+
+def test_tool_results_do_not_depend_on_chunk_size(frame, weights):
+    prices_json = json.dumps(PricePanel.from_frame(frame).to_payload())
+    books = {f"P{i}": dict(zip(frame.columns[:-1], map(float, w))) for i, w in enumerate(weights)}
+    args = dict(prices_json=prices_json, weights_json=json.dumps(books), method="bootstrap", n_scenarios=4_000,
+                seed=7)
+    whole = json.loads(ScenarioVarTool(chunk_size=10_000)._run(**args))
+    tool_cache.clear()
+    chunked = json.loads(ScenarioVarTool(chunk_size=333)._run(**args))
+    assert whole["ok"] and whole["n_scenarios"] == 4_000 and whole["seed"] == 7
+    assert chunked["metrics"] == whole["metrics"]
@@ -0,0 +1,94 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.finance_crew.market_data import (
+    BINARY_FORMAT,
+    PricePanel,
+    decode_array,
+    encode_array,
+    load_price_panel,
+    load_returns,
+    returns_payload,
+)
+from app.finance_crew.market_data.wire import panel_from_binary, panel_to_binary
+
+
+def assert_same_panel(a: PricePanel, b: PricePanel) -> None:
+    assert a.dates == b.dates and a.tickers == b.tickers
+    assert a.values.shape == b.values.shape
+    np.testing.assert_array_equal(a.values, b.values)
+
+
+def panel(n_dates: int, n_tickers: int, nan_rate: float = 0.0, seed: int = 0) -> PricePanel:
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(1.0, 500.0, size=(n_dates, n_tickers))
+    values[rng.random(values.shape) < nan_rate] = np.nan
+    dates = [f"2024-01-{d + 1:02d}" for d in range(n_dates)]
+    return PricePanel(values, dates, [f"T{j}" for j in range(n_tickers)])
+
+
+@pytest.mark.parametrize("values", [
+    np.array([1.5, -2.25, 1e-300, 1e300, 0.0, -0.0]),
+    np.array([np.nan, 1.0, np.inf, -np.inf, np.nan]),
+    np.array([], dtype=np.float64),
+    np.arange(12, dtype=np.float64).reshape(3, 4),
+])
+def test_encode_decode_round_trip(values):
+    text = encode_array(values)
+    decoded = decode_array(text, values.shape if values.ndim > 1 else None)
+    assert decoded.dtype == np.float64 and decoded.shape == values.shape
+    np.testing.assert_array_equal(decoded, values)
+    assert np.signbit(decoded).tolist() == np.signbit(values).tolist()
+
+
+def test_encode_uses_c_order():
+    values = np.asfortranarray(np.arange(6, dtype=np.float64).reshape(2, 3))
+    np.testing.assert_array_equal(decode_array(encode_array(values), (2, 3)), values)
+
+
+def test_decode_rejects_wrong_shape():
+    with pytest.raises(ValueError):
+        decode_array(encode_array(np.arange(5.0)), (2, 3))
+
+
+@pytest.mark.parametrize("shape, nan_rate", [((30, 5), 0.0), ((30, 5), 0.2), ((0, 0), 0.0), ((0, 3), 0.0),
+                                             ((25, 1), 0.1), ((1, 4), 0.0)])
+def test_panel_binary_round_trip(shape, nan_rate):
+    original = panel(*shape, nan_rate=nan_rate)
+    payload = json.loads(json.dumps(panel_to_binary(original.dates, original.tickers, original.values)))
+    assert payload["format"] == BINARY_FORMAT and payload["shape"] == list(shape)
+
+    dates, tickers, values = panel_from_binary(payload)
+    assert_same_panel(PricePanel(values, dates, tickers), original)
+    assert_same_panel(load_price_panel(json.dumps(payload)), original)
+
+
+@pytest.mark.parametrize("nan_rate", [0.0, 0.3])
+def test_binary_and_json_payloads_load_the_same_panel(nan_rate):
+    original = panel(40, 3, nan_rate=nan_rate, seed=1)
+    from_json = load_price_panel(json.dumps(original.to_payload()))
+    from_binary = load_price_panel(json.dumps(original.to_binary_payload()))
+    assert_same_panel(from_json, original)
+    assert_same_panel(from_binary, original)
+
+
+@pytest.mark.parametrize("n", [0, 1, 50])
+def test_returns_payload_round_trip(n):
+    rng = np.random.default_rng(n)
+    rets = rng.normal(0, 0.01, size=n)
+    curve = np.cumprod(1.0 + rets)
+    dates = [f"d{i}" for i in range(n)]
+
+    binary = json.loads(json.dumps(returns_payload(dates, rets, curve, "binary")))
+    got_dates, got_rets, got_curve = load_returns(binary)
+    assert got_dates == dates
+    np.testing.assert_array_equal(got_rets, rets)
+    np.testing.assert_array_equal(got_curve if got_curve is not None else np.empty(0), curve)
+
+    inline = json.loads(json.dumps(returns_payload(dates, rets, curve, "json")))
+    got_dates, got_rets, got_curve = load_returns(inline)
+    assert got_dates == dates
+    np.testing.assert_allclose(got_rets, rets, atol=1e-10, rtol=0)
+    np.testing.assert_allclose(got_curve if got_curve is not None else np.empty(0), curve, atol=1e-10, rtol=0)